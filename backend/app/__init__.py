@@ -0,0 +1,4 @@
+from time import perf_counter
+
+# Start of the application imports, for the startup profile
+IMPORTS_STARTED_AT = perf_counter()
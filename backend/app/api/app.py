@@ -1,6 +1,7 @@
 # Description: This file initializes the FastAPI application and sets up
 # configurations.
 from contextlib import asynccontextmanager
+from importlib import import_module
 from time import perf_counter
 
 from fastapi import FastAPI, status, Request
@@ -11,23 +12,40 @@ from starlette.middleware.cors import CORSMiddleware
 from slowapi.errors import RateLimitExceeded
 
 
+from backend.app import IMPORTS_STARTED_AT
 from backend.app.setup.config import settings
+from backend.app.api.constants import NEXT_CURSOR_HEADER, REQUEST_ID_HEADER
 from backend.app.api.routes.router_bundler import api_router
 from backend.app.api.exceptions import (
     not_found_handler,
     general_exception_handler,
     custom_rate_limit_handler,
 )
-from backend.app.api.middlewares.logs import AsyncRequestLoggingMiddleware
-from backend.app.api.utils.misc import print_execution_time
-from backend.app.api.middlewares.misc import TimingMiddleware
+from backend.app.api.middlewares.logs import (
+    RequestTrackingMiddleware,
+    start_request_log_writer,
+    stop_request_log_writer,
+)
+from backend.app.api.utils.misc import ExecutionProfile
 from backend.app.api.dependencies.logs import log_app_start
 from backend.app.api.dependencies.cnpj import initialize_CNPJRepository_on_startup
 from backend.app.database.base import init_database, multi_database
-from backend.app.api.utils.ml import init_nltk
 from backend.app.scheduler.bundler import task_orchestrator, add_tasks
+from backend.app.scheduler.tasks.logs import maintain_audit_partitions
+from backend.app.scheduler.tasks.release import init_data_release
 from backend.app.rate_limiter import rate_limit
-from backend.app.setup.logging import setup_logger
+from backend.app.setup.logging import setup_logger, shutdown_logger, logger
+
+IMPORTS_DURATION = perf_counter() - IMPORTS_STARTED_AT
+
+# Heavy modules imported on first use, preloaded on startup in eager mode
+DEFERRED_MODULES = ["bs4", "lxml", "ipwhois"]
+
+
+def preload_deferred_modules():
+    """Imports the modules otherwise deferred to their first use."""
+    for module_name in DEFERRED_MODULES:
+        import_module(module_name)
 
 
 @asynccontextmanager
@@ -41,42 +59,69 @@ async def lifespan(app_: FastAPI):
     initialization and cleanup tasks related to the application's lifespan
     :type app: FastAPI
     """
-    t0 = perf_counter()
+    # The profile starts with the application imports
+    profile = ExecutionProfile("startup", started_at=IMPORTS_STARTED_AT)
+    profile.record("imports", IMPORTS_DURATION)
 
     # Data related entities
-    print_execution_time(init_database)()
+    profile.timed(init_database)()
+
+    # Partitions for the audit logs written from now on
+    profile.timed(maintain_audit_partitions)()
+
+    # Data release keying the CNPJ cache entries, fetched in the background
+    profile.timed(init_data_release)()
 
     # Logging
-    await print_execution_time(setup_logger)()
+    await profile.timed(setup_logger)()
+
+    # Write the request logs in batches
+    profile.timed(start_request_log_writer)()
 
     # Initialize CNPJ repository
-    print_execution_time(initialize_CNPJRepository_on_startup)()
+    profile.timed(initialize_CNPJRepository_on_startup)()
 
     # Log app startup
-    print_execution_time(log_app_start)()
+    profile.timed(log_app_start)()
 
     # Start task orchestrator
-    await print_execution_time(task_orchestrator.start)()
+    await profile.timed(task_orchestrator.start)()
 
     # Add tasks to orchestrator
-    await print_execution_time(add_tasks)()
+    await profile.timed(add_tasks)()
 
-    # Initialize NLTK
-    print_execution_time(init_nltk)()
+    # Import the deferred modules ahead of the first requests
+    if settings.STARTUP_MODE == "eager":
+        profile.timed(preload_deferred_modules)()
 
-    print(f"Start up took {perf_counter()-t0} seconds")
+    app_.state.startup_profile = profile.to_dict()
+    logger.info(
+        f"Start up took {app_.state.startup_profile['total_ms']} ms",
+        extra={"startup_profile": app_.state.startup_profile},
+    )
 
     yield
 
-    t0 = perf_counter()
+    profile = ExecutionProfile("shutdown")
 
     # Cleanup tasks
-    await print_execution_time(task_orchestrator.shutdown)()
+    await profile.timed(task_orchestrator.shutdown)()
+
+    # Write the pending request logs
+    profile.timed(stop_request_log_writer)()
 
     # Disconnect from databases
-    print_execution_time(multi_database.disconnect)()
+    await profile.timed(multi_database.disconnect_async)()
+    profile.timed(multi_database.disconnect)()
+
+    shutdown_profile = profile.to_dict()
+    logger.info(
+        f"Shutdown took {shutdown_profile['total_ms']} ms",
+        extra={"shutdown_profile": shutdown_profile},
+    )
 
-    print(f"Shutdown took {perf_counter()-t0} seconds")
+    # Write the pending debug logs, the last ones included
+    shutdown_logger()
 
 
 def create_app():
@@ -105,14 +150,15 @@ def setup_cors(app: FastAPI) -> None:
             allow_credentials=True,
             allow_methods=["*"],
             allow_headers=["*"],
+            expose_headers=[NEXT_CURSOR_HEADER, REQUEST_ID_HEADER],
         )
 
 
 def setup_middlewares(app: FastAPI) -> None:
     """Adds middleware to the FastAPI application."""
-    app.add_middleware(AsyncRequestLoggingMiddleware)
     app.add_middleware(GZipMiddleware, minimum_size=1000)
-    app.add_middleware(TimingMiddleware)
+    # Outermost, so that it times and counts the bytes actually sent
+    app.add_middleware(RequestTrackingMiddleware)
 
 
 def setup_static_files(app: FastAPI) -> None:
@@ -47,3 +47,9 @@ STATES_BRAZIL = [
     "BR",
     "EX",
 ]
+
+# Response header carrying the keyset cursor of the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Request and response header carrying the request identifier
+REQUEST_ID_HEADER = "X-Request-ID"
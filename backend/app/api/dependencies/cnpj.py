@@ -1,25 +1,27 @@
+from typing import AsyncIterator
+
 from fastapi import Depends
 
-from backend.app.database.base import get_session
-from backend.app.api.repositories.cnpj import CNPJRepository
+from backend.app.database.base import get_session, get_request_connection
+from backend.app.api.repositories.cnpj import CNPJRepository, AsyncCNPJRepository
 from backend.app.setup.logging import logger
 from backend.app.setup.config import settings
 
 # Define a dependency to create a CNPJRepository instance
 
 
-def get_cnpj_repository() -> CNPJRepository:
+async def get_cnpj_repository() -> AsyncIterator[AsyncCNPJRepository]:
     """
-    Create a CNPJRepository instance.
+    Create a CNPJRepository instance, with lookups on the asyncio engine.
 
-    Args:
-        db (Database): Database instance
+    The repository lookups of a request share one connection, checked out on
+    the first of them and returned to the pool once the response is sent.
 
-    Returns:
-        CNPJRepository: CNPJRepository instance
+    Yields:
+        AsyncCNPJRepository: AsyncCNPJRepository instance
     """
-    with get_session(settings.POSTGRES_DBNAME_RFB) as session:
-        return CNPJRepository(session)
+    async with get_request_connection(settings.POSTGRES_DBNAME_RFB) as connection:
+        yield AsyncCNPJRepository(connection)
 
 
 def initialize_CNPJRepository_on_startup():
@@ -10,15 +10,15 @@ from backend.app.api.repositories.logs import (
     AppStartLogRepository,
 )
 from backend.app.api.repositories.logs import DebuggingDatabaseHandler
-from backend.app.database.base import multi_database
 
 
 def get_debug_logs_handler():
-    audit_database = multi_database.databases[settings.POSTGRES_DBNAME_AUDIT]
-    session = audit_database.session_maker()
-
-    # Create the database handler
-    return DebuggingDatabaseHandler(db_session=session)
+    # Create the database handler, writing on its own sessions
+    return DebuggingDatabaseHandler(
+        batch_size=settings.DEBUG_LOG_BATCH_SIZE,
+        flush_interval=settings.DEBUG_LOG_FLUSH_INTERVAL,
+        max_queue_size=settings.DEBUG_LOG_QUEUE_SIZE,
+    )
 
 
 def get_request_logs_repository():
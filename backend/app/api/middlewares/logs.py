@@ -1,128 +1,171 @@
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response, StreamingResponse
-from time import strftime, localtime, perf_counter
+import re
+from starlette.datastructures import URL, Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from time import perf_counter
+from typing import List
 from uuid import uuid4
-from datetime import datetime, timedelta
 
+from backend.app.api.constants import REQUEST_ID_HEADER
 from backend.app.api.models.logs import RequestLogCreate
 from backend.app.api.repositories.logs import RequestLogRepository
+from backend.app.api.utils.batching import BatchWriter
+from backend.app.api.utils.metrics import request_latencies
 from backend.app.database.base import get_session
-from backend.app.api.models.tasks import TaskConfig
-from backend.app.scheduler.bundler import task_orchestrator
-from backend.app.scheduler.base import ScheduledTask
 from backend.app.setup.config import settings
+from backend.app.setup.logging import logger
 
-background_scheduler = task_orchestrator.schedulers["background"]
-
-
-async def capture_request_body(request: Request):
-    if not hasattr(request.state, "body"):
-        # Only read body if required (skip for GET, etc.)
-        if request.method not in ("POST", "PUT", "PATCH"):
-            request.state.body = b""
-        else:
-            request.state.body = await request.body()
-
-    return request.state.body.decode() if request.state.body else ""
-
-
-async def log_request(
-    request_data, response_data, process_time: float, start_time: float
-):
-    # Define log_request as a standalone function
-    log_data = {
-        "relo_method": request_data["method"],
-        "relo_url": str(
-            request_data["url"]),
-        "relo_headers": request_data["headers"],
-        "relo_status_code": response_data["status_code"],
-        "relo_ip_address": request_data["client_host"],
-        "relo_absolute_path": request_data["request_url"],
-        "relo_device_info": request_data["user_agent"],
-        "relo_request_duration_seconds": f"{process_time:.6f}",
-        "relo_response_size": response_data["response_size"],
-        "relo_inserted_at": strftime(
-            "%Y-%m-%d %H:%M:%S",
-            localtime(start_time)),
-    }
+# Route of the requests matching none, so that their paths are not keys
+UNMATCHED_ROUTE = "<unmatched>"
 
+# Request identifiers accepted from clients, others are replaced
+REQUEST_ID_PATTERN = re.compile(r"[A-Za-z0-9._:-]{1,128}")
+
+
+def get_request_id(headers: Headers) -> str:
+    """
+    Gets the identifier of a request, from its header if well-formed.
+
+    Args:
+        headers (Headers): The request headers.
+
+    Returns:
+        str: The request identifier, new unless given by the client.
+    """
+    request_id = headers.get(REQUEST_ID_HEADER)
+    if request_id and REQUEST_ID_PATTERN.fullmatch(request_id):
+        return request_id
+
+    return uuid4().hex
+
+
+def build_request_log(
+    request_data, response_data, process_time: float
+) -> RequestLogCreate:
+    """
+    Builds the request log of a request and its response.
+
+    Args:
+        request_data (dict): The serializable request data.
+        response_data (dict): The serializable response data.
+        process_time (float): The time until the response started, in seconds.
+
+    Returns:
+        RequestLogCreate: The request log.
+    """
+    return RequestLogCreate(
+        relo_method=request_data["method"],
+        relo_url=str(request_data["url"]),
+        relo_headers=request_data["headers"],
+        relo_status_code=response_data["status_code"],
+        relo_ip_address=request_data["client_host"],
+        relo_absolute_path=request_data["request_url"],
+        relo_device_info=request_data["user_agent"],
+        relo_request_duration_seconds=round(process_time, 6),
+        relo_response_size=response_data["response_size"],
+    )
+
+
+def write_request_logs(logs: List[RequestLogCreate]):
     with get_session(settings.POSTGRES_DBNAME_AUDIT) as db_session:
-        log = RequestLogCreate(**log_data)
-        log_repository = RequestLogRepository(db_session)
-        log_repository.create(log)
+        RequestLogRepository(db_session).create_many(logs)
 
 
-class AsyncRequestLoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        start_time = perf_counter()
+# Request logs wait in memory and are written in batches, off the event loop
+request_log_writer = BatchWriter(
+    "request_logs",
+    write_request_logs,
+    batch_size=settings.REQUEST_LOG_BATCH_SIZE,
+    flush_interval=settings.REQUEST_LOG_FLUSH_INTERVAL,
+    max_queue_size=settings.REQUEST_LOG_QUEUE_SIZE,
+)
+
 
-        # Proceed to the next middleware or the actual request handler
-        original_response = await call_next(request)
-
-        response_t = perf_counter()
-        process_time = response_t - start_time
-
-        # For StreamingResponse, do not capture body, avoid recursive calls
-        if isinstance(original_response, StreamingResponse):
-            wrapped_response = original_response
-        else:
-            # Capture the response body (non-streaming responses)
-            body_bytes = [chunk async for chunk in original_response.body_iterator]
-            wrapped_response = Response(
-                b"".join(body_bytes),
-                status_code=original_response.status_code,
-                headers=original_response.headers,
-            )
-            wrapped_response.body_bytes = b"".join(
-                body_bytes)  # Store full body
-
-        # Extract serializable data from request and response
-        request_data = {
-            "method": request.method,
-            "url": str(request.url),
-            "headers": dict(request.headers),
-            "client_host": request.client.host,
-            "user_agent": request.headers.get("user-agent", "Unknown"),
-            "request_url": str(request.url),
-        }
-
-        response_data = {
-            "status_code": original_response.status_code,
-            "headers": dict(original_response.headers),
-            "response_size": len(
-                wrapped_response.body_bytes
-                if hasattr(wrapped_response, "body_bytes")
-                else b""
-            ),
-        }
-
-        # Create the task configuration with a future delay
-        task_id = uuid4()
-        # Create the task configuration with a future delay
-        task_config = TaskConfig(
-            task_id=task_id,
-            schedule_type="background",
-            task_name=f"log_request_{task_id}",
-            task_type="date",  # Use 'date' type for future execution
-            task_callable=log_request,
-            # The log_request function should now only take serializable
-            # arguments
-            task_args=[request_data, response_data, process_time, start_time],
-            schedule_params={
-                "run_time": datetime.now() +
-                timedelta(
-                    seconds=5)},
-            # Delay execution by 5 seconds
-            task_details={},  # No additional details required for this task
-        )
-
-        # Schedule the logging task using TaskOrchestrator and ScheduledTask
-        scheduled_task = ScheduledTask(task_config)
-
-        perf_counter()
-
-        scheduled_task.schedule(background_scheduler)
-
-        # Return the response without waiting for logging
-        return wrapped_response
+def start_request_log_writer():
+    request_log_writer.start()
+
+
+def stop_request_log_writer(timeout: float = 10):
+    """Stops the request log writer once the pending logs are written."""
+    request_log_writer.stop(timeout)
+    logger.info(
+        "Request log writer stopped.",
+        extra={"request_log_writer": request_log_writer.stats()},
+    )
+
+
+def submit_request_log(request_data, response_data, process_time: float):
+    """
+    Queues the request log to be written in the background.
+
+    Args:
+        request_data (dict): The serializable request data.
+        response_data (dict): The serializable response data.
+        process_time (float): The time until the response started, in seconds.
+    """
+    request_log_writer.submit(
+        build_request_log(request_data, response_data, process_time))
+
+
+class RequestTrackingMiddleware:
+    """
+    Identifies, times and logs every HTTP request.
+
+    A single pure ASGI middleware: the response messages pass through as they
+    stream, with the request identifier added to the response headers and only
+    their body sizes added up, and no task is spawned per request. Latencies
+    go to the in-memory histograms of the route and logs to the batch writer.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = perf_counter()
+        headers = Headers(scope=scope)
+        request_id = get_request_id(headers)
+        scope.setdefault("state", {})["request_id"] = request_id
+
+        response_data = {"status_code": 500, "response_size": 0}
+        response_t = None
+
+        async def send_tracking(message: Message):
+            nonlocal response_t
+
+            if message["type"] == "http.response.start":
+                response_t = perf_counter()
+                message.setdefault("headers", [])
+                response_headers = MutableHeaders(scope=message)
+                response_headers.append(REQUEST_ID_HEADER, request_id)
+                response_data["status_code"] = message["status"]
+            elif message["type"] == "http.response.body":
+                response_data["response_size"] += len(message.get("body", b""))
+
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_tracking)
+        finally:
+            process_time = (response_t or perf_counter()) - start_time
+
+            # The router sets the matched route on the shared scope
+            route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            request_latencies.record(scope["method"], route, process_time)
+
+            # Extract serializable data from the request scope
+            client = scope.get("client")
+            url = str(URL(scope=scope))
+            request_data = {
+                "method": scope["method"],
+                "url": url,
+                "headers": dict(headers),
+                "client_host": client[0] if client else None,
+                "user_agent": headers.get("user-agent", "Unknown"),
+                "request_url": url,
+            }
+
+            # Log in the background, the response is already sent
+            submit_request_log(request_data, response_data, process_time)
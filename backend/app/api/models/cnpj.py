@@ -5,14 +5,14 @@ from fastapi import HTTPException
 
 from backend.app.api.utils.cnpj import is_cnpj_str_valid
 from .base import BatchModel
-from .misc import LimitOffsetParams
+from .misc import CursorLimitOffsetParams
 
 
 class CNPJBatch(BatchModel):
     pass
 
 
-class CNPJQueryParams(LimitOffsetParams):
+class CNPJQueryParams(CursorLimitOffsetParams):
     """Query parameters for filtering CNPJ data."""
 
     zipcode: Optional[str] = Field(
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic import BaseModel, Field
 from backend.app.setup.config import settings
 from backend.app.api.constants import MAX_LIMIT
@@ -20,3 +22,15 @@ class PaginatedLimitOffsetParams(LimitOffsetParams):
 
     enable_pagination: bool = Field(
         True, description="Enable or disable pagination")
+
+
+class CursorLimitOffsetParams(LimitOffsetParams):
+    """Limit-offset parameters with an optional keyset cursor."""
+
+    cursor: Optional[str] = Field(
+        None,
+        description=(
+            "Opaque cursor returned on header X-Next-Cursor of the previous "
+            "page. When provided, offset is ignored"
+        ),
+    )
@@ -1,13 +1,29 @@
 from typing import List, Dict, Callable, Optional, Any
-from uuid import uuid4
+from uuid import UUID, NAMESPACE_URL, uuid4, uuid5
 
-from pydantic import BaseModel, Field, UUID4
+from pydantic import BaseModel, Field, model_validator
+
+# Namespace of the task identifiers derived from the task names
+TASK_ID_NAMESPACE = uuid5(NAMESPACE_URL, "cnpj-api/scheduled-tasks")
+
+
+def get_task_id(task_name: str) -> UUID:
+    """
+    Gets the identifier of a task from its name, the same on every replica.
+
+    Args:
+        task_name (str): The task name.
+
+    Returns:
+        UUID: The task identifier.
+    """
+    return uuid5(TASK_ID_NAMESPACE, task_name)
 
 
 class TaskBase(BaseModel):
     """Base model for a task."""
 
-    task_id: UUID4 = Field(
+    task_id: UUID = Field(
         default_factory=uuid4,
         title="Task ID",
         description="The unique identifier of the task",
@@ -58,7 +74,9 @@ class TaskResponse(TaskBase):
 class TaskConfig(BaseModel):
     """Configuration for a task."""
 
-    task_id: UUID4 = Field(default_factory=uuid4)
+    task_id: Optional[UUID] = Field(
+        None, description="Identifier of the task, derived from its name by default"
+    )
     schedule_type: str = Field(..., description="Type of the schedule")
     schedule_params: Dict[str, Any] = Field(
         default_factory=dict, description="Parameters for the schedule"
@@ -73,6 +91,20 @@ class TaskConfig(BaseModel):
     task_details: Dict[str, Any] = Field(
         default_factory=dict, description="Additional details about the task"
     )
+    exclusive: bool = Field(
+        False,
+        description="Whether each run is done by a single replica of the cluster",
+    )
+    max_concurrency: int = Field(
+        1, ge=1, description="Maximum runs of the task at once, per process"
+    )
+
+    @model_validator(mode="after")
+    def set_task_id(self) -> "TaskConfig":
+        if self.task_id is None:
+            self.task_id = get_task_id(self.task_name)
+
+        return self
 
     def __eq__(self, other):
         if not isinstance(other, TaskConfig):
@@ -87,6 +119,8 @@ class TaskConfig(BaseModel):
                 self.task_callable == other.task_callable,
                 self.task_args == other.task_args,
                 self.task_details == other.task_details,
+                self.exclusive == other.exclusive,
+                self.max_concurrency == other.max_concurrency,
             )
         )
 
@@ -102,5 +136,7 @@ class TaskConfig(BaseModel):
                 tuple(self.task_args),
                 # Using frozenset for hashability
                 frozenset(self.task_details.items()),
+                self.exclusive,
+                self.max_concurrency,
             )
         )
@@ -0,0 +1,248 @@
+from collections import OrderedDict
+from threading import RLock
+from typing import Any, Dict, Hashable, Iterable, Optional, Tuple
+
+from backend.app.setup.config import settings
+from backend.app.setup.logging import logger
+
+
+class SharedCache:
+    """
+    A cache tier shared between processes, such as a key-value store.
+
+    Implementations own the (de)serialization of values and may drop entries
+    at will. Keys already carry the data release, so stale entries are never
+    read and simply age out of the backing store.
+    """
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """
+        Get the cached values of the keys.
+
+        Parameters:
+        keys (Iterable[str]): The keys to look up.
+
+        Returns:
+        Dict[str, Any]: The values of the keys found.
+        """
+        raise NotImplementedError
+
+    def set_many(self, items: Dict[str, Any]) -> None:
+        """
+        Cache the values of the keys.
+
+        Parameters:
+        items (Dict[str, Any]): The values, keyed by cache key.
+        """
+        raise NotImplementedError
+
+
+class InMemorySharedCache(SharedCache):
+    """A process-local stand-in for the shared tier, for tests and development."""
+
+    def __init__(self):
+        self.items: Dict[str, Any] = {}
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        return {key: self.items[key] for key in keys if key in self.items}
+
+    def set_many(self, items: Dict[str, Any]) -> None:
+        self.items.update(items)
+
+
+class LRUCache:
+    """A size-bounded in-process cache, evicting the least recently used keys."""
+
+    def __init__(self, max_size: int):
+        """
+        Parameters:
+        max_size (int): The maximum number of entries.
+        """
+        self.max_size = max_size
+        self.items: OrderedDict = OrderedDict()
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        if key not in self.items:
+            return default
+
+        self.items.move_to_end(key)
+        return self.items[key]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self.items[key] = value
+        self.items.move_to_end(key)
+
+        while len(self.items) > self.max_size:
+            self.items.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self.items.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.items
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+
+class ReleaseCache:
+    """
+    A read-through cache keyed by data release, with an in-process LRU tier in
+    front of an optional shared tier.
+
+    The RFB data only changes with a new monthly release, so entries have no
+    TTL: setting a new release makes every previous entry unreachable at once.
+    Until a release is set the cache is bypassed, as entries could not be told
+    apart from those of the next release.
+    """
+
+    def __init__(
+        self, name: str, max_size: int, shared: Optional[SharedCache] = None
+    ):
+        """
+        Parameters:
+        name (str): The cache name, prefixed to the shared tier keys.
+        max_size (int): The maximum number of entries of the in-process tier.
+        shared (SharedCache): The shared tier, if any.
+        """
+        self.name = name
+        self.local = LRUCache(max_size)
+        self.shared = shared
+        self.release: Optional[str] = None
+        self.lock = RLock()
+
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.releases = 0
+
+    def set_release(self, release: str) -> bool:
+        """
+        Set the current data release, invalidating the entries of other releases.
+
+        Parameters:
+        release (str): The data release version.
+
+        Returns:
+        bool: Whether the release changed.
+        """
+        with self.lock:
+            if release == self.release:
+                return False
+
+            logger.info(
+                f"Cache {self.name}: data release {self.release} -> {release}.")
+            self.release = release
+            self.local.clear()
+            self.releases += 1
+
+            return True
+
+    def shared_key(self, release: Optional[str], key: str) -> str:
+        return f"{self.name}:{release}:{key}"
+
+    def get_many(self, keys: Iterable[str]) -> Tuple[Dict[str, Any], list]:
+        """
+        Look the keys up on the in-process tier, then on the shared tier.
+
+        Parameters:
+        keys (Iterable[str]): The keys to look up.
+
+        Returns:
+        Tuple[Dict[str, Any], list]: The cached values and the missing keys.
+        """
+        found, local_missing = {}, []
+
+        with self.lock:
+            release = self.release
+            if release is None:
+                keys = list(keys)
+                self.misses += len(keys)
+                return found, keys
+
+            for key in keys:
+                if (release, key) in self.local:
+                    found[key] = self.local.get((release, key))
+                    self.local_hits += 1
+                else:
+                    local_missing.append(key)
+
+        missing = local_missing
+        if local_missing and self.shared is not None:
+            shared_found = self.get_shared(release, local_missing)
+            missing = [key for key in local_missing if key not in shared_found]
+            found.update(shared_found)
+
+            with self.lock:
+                self.shared_hits += len(shared_found)
+                if release == self.release:
+                    for key, value in shared_found.items():
+                        self.local.set((release, key), value)
+
+        with self.lock:
+            self.misses += len(missing)
+
+        return found, missing
+
+    def set_many(self, items: Dict[str, Any]) -> None:
+        """
+        Cache the values on both tiers, under the current release, if any.
+
+        Parameters:
+        items (Dict[str, Any]): The values, keyed by cache key.
+        """
+        with self.lock:
+            release = self.release
+            if release is None:
+                return
+
+            for key, value in items.items():
+                self.local.set((release, key), value)
+
+        if items and self.shared is not None:
+            self.set_shared(release, items)
+
+    def get_shared(self, release: Optional[str], keys: list) -> Dict[str, Any]:
+        shared_keys = {self.shared_key(release, key): key for key in keys}
+
+        try:
+            shared_found = self.shared.get_many(list(shared_keys))
+        except Exception as e:
+            logger.error(f"Cache {self.name}: error reading shared tier: {e}")
+            return {}
+
+        return {shared_keys[shared_key]: value for shared_key, value in shared_found.items()}
+
+    def set_shared(self, release: Optional[str], items: Dict[str, Any]) -> None:
+        try:
+            self.shared.set_many({
+                self.shared_key(release, key): value for key, value in items.items()
+            })
+        except Exception as e:
+            logger.error(f"Cache {self.name}: error writing shared tier: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the cache counters.
+
+        Returns:
+        Dict[str, Any]: The release, size and hit, miss and eviction counters.
+        """
+        with self.lock:
+            return {
+                "name": self.name,
+                "release": self.release,
+                "size": len(self.local),
+                "max_size": self.local.max_size,
+                "local_hits": self.local_hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "evictions": self.local.evictions,
+                "releases": self.releases,
+            }
+
+
+# CNPJ information, keyed by raw CNPJ
+cnpj_info_cache = ReleaseCache("cnpj_info", settings.CNPJ_CACHE_MAX_SIZE)
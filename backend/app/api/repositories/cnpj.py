@@ -1,17 +1,18 @@
-from typing import Tuple, Dict, List, Any, Optional
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Tuple, Dict, List, Any, Optional, Iterable, Mapping, Union
 from json import loads
 
-import pandas as pd
-from sqlalchemy import text, Result
+from sqlalchemy import Result, text
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
 
 from backend.app.utils.misc import string_to_json
-from backend.app.api.utils.cnpj import format_cnpj_list
 from backend.app.api.utils.misc import paginate_dict
 from backend.app.api.models.cnpj import CNPJ, CNPJQueryParams
-from backend.app.api.models.misc import PaginatedLimitOffsetParams
-from backend.app.database.models.cnpj import CNAE
+from backend.app.api.models.misc import (
+    PaginatedLimitOffsetParams,
+    CursorLimitOffsetParams,
+)
 
 from backend.app.utils.repositories import (
     format_database_date,
@@ -20,8 +21,8 @@ from backend.app.utils.repositories import (
 )
 from backend.app.utils.misc import (
     replace_invalid_fields_on_list_tuple,
-    replace_invalid_fields_on_list_dict,
     replace_spaces_on_list_tuple,
+    clean_columns,
     format_decimal,
     replace_spaces,
     is_field_valid,
@@ -34,18 +35,35 @@ from backend.app.api.utils.misc import (
     zfill_factory,
     normalize_json,
     commify_list,
-    comma_stringify_list,
+    encode_cursor,
+    decode_cursor,
+)
+from backend.app.api.utils.fuzzy import FuzzyMatcher
+from backend.app.api.utils.search import PrefixSearchIndex
+from backend.app.utils.rows import (
+    rows_to_dicts,
+    rows_to_nested_dict,
+    rows_to_columns,
+    columns_to_dicts,
+    map_column,
 )
-from backend.app.api.utils.ml import find_most_possible_tokens
-from backend.app.utils.dataframe import dataframe_to_nested_dict
-from backend.app.api.utils.cnpj import format_cnpj
 from backend.app.api.repositories.constants import (
     get_company_size_dict,
     get_company_situation_dict,
     get_establishment_type_dict,
 )
-from backend.app.database.base import get_session
+from backend.app.api.repositories.statements import (
+    get_statement,
+    execute_statement,
+)
+from backend.app.api.repositories.cache import cnpj_info_cache
+from backend.app.api.repositories.snapshot import LookupSnapshot
+from backend.app.database.base import (
+    RequestConnection,
+    execute_pipeline,
+)
 from backend.app.setup.config import settings
+from backend.app.setup.logging import logger
 from backend.app.api.repositories.types import (
     CNPJList,
     JSON,
@@ -54,94 +72,662 @@ from backend.app.api.repositories.types import (
     PayloadType,
 )
 
+ESTABLISHMENT_COLUMNS = [
+    "cnpj_basico",
+    "cnpj_ordem",
+    "cnpj_dv",
+    "correio_eletronico",
+    "data_inicio_atividade",
+    "data_situacao_cadastral",
+    "situacao_cadastral",
+    "motivo_situacao_cadastral",
+    "nome_fantasia",
+    "tipo_logradouro",
+    "logradouro",
+    "numero",
+    "complemento",
+    "bairro",
+    "municipio",
+    "cep",
+    "uf",
+    "cnae_fiscal_principal",
+    "cnae_fiscal_secundaria",
+    "identificador_matriz_filial",
+    "situacao_especial",
+    "data_situacao_especial",
+    "ddd_1",
+    "telefone_1",
+    "ddd_2",
+    "telefone_2",
+]
+
+COMPANY_COLUMNS = [
+    "cnpj_basico",
+    "razao_social",
+    "ente_federativo_responsavel",
+    "porte_empresa",
+    "capital_social",
+    "natureza_juridica",
+]
+
+PARTNERS_COLUMNS = ["cnpj_basico", "qsa"]
+
+SIMPLES_SIMEI_COLUMNS = ["cnpj_basico", "simples", "simei"]
+
+CNPJ_INFO_COLUMNS = [
+    "cnpj",
+    "cnpj_raw",
+    "abertura",
+    "tipo",
+    "nome",
+    "fantasia",
+    "capital_social",
+    "porte",
+    "logradouro",
+    "numero",
+    "complemento",
+    "bairro",
+    "municipio",
+    "uf",
+    "cep",
+    "email",
+    "telefone",
+    "situacao",
+    "data_situacao",
+    "motivo_situacao",
+    "situacao_especial",
+    "data_situacao_especial",
+    "atividade_principal",
+    "atividades_secundarias",
+    "efr",
+    "qsa",
+    "simples",
+    "simei",
+]
+
+# Sections of a CNPJ profile: (CTE alias, section columns)
+PROFILE_SECTIONS = {
+    "establishment": ("est", ESTABLISHMENT_COLUMNS),
+    "company": ("emp", COMPANY_COLUMNS),
+    "partners": ("soc", PARTNERS_COLUMNS),
+    "simples_simei": ("sim", SIMPLES_SIMEI_COLUMNS),
+}
+
+PROFILE_SECTION_CTES = {
+    "establishment": f"""
+        establishment_ as (
+            select
+                {commify_list([f"est.{column}" for column in ESTABLISHMENT_COLUMNS])}
+            from
+                requested req
+            inner join
+                estabelecimento est
+            on
+                (est.cnpj_basico, est.cnpj_ordem, est.cnpj_dv) =
+                (req.cnpj_basico, req.cnpj_ordem, req.cnpj_dv)
+        )
+    """,
+    "company": """
+        company_ as (
+            select
+                distinct on (emp.cnpj_basico)
+                emp.cnpj_basico,
+                emp.razao_social,
+                emp.ente_federativo_responsavel,
+                emp.porte_empresa,
+                emp.capital_social,
+                concat(natju.codigo, '-', natju.descricao) as natureza_juridica
+            from
+                empresa emp
+            left join natju on natju.codigo::text = emp.natureza_juridica::text
+            where
+                emp.cnpj_basico in (select cnpj_basico from requested)
+        )
+    """,
+    "partners": """
+        socios_ as (
+            select
+                cnpj_basico,
+                qualificacao_socio,
+                nome_socio_razao_social
+            from
+                socios
+            where
+                cnpj_basico in (select cnpj_basico from requested)
+            group by
+                1, 2, 3
+        ),
+        partners_ as (
+            select
+                cnpj_basico,
+                json_agg(
+                    json_build_object(
+                        'nome', nome_socio_razao_social,
+                        'qual', concat(qualificacao_socio,'-', qual_socio.descricao)
+                    )
+                ) as qsa
+            from
+                socios_ soc
+            left join
+                quals qual_socio
+            on
+                qual_socio.codigo::text = soc.qualificacao_socio::text
+            group by
+                cnpj_basico
+        )
+    """,
+    "simples_simei": """
+        simples_simei_ as (
+            select
+                cnpj_basico,
+                json_build_object(
+                    'optante',
+                    case when opcao_pelo_simples ilike 'S' then 'true' else 'false' end,
+                    'data_opcao', COALESCE(
+                        TO_CHAR(
+                            TO_DATE(
+                                NULLIF(data_opcao_simples, '0'),  -- Replace '0' with NULL
+                                'YYYYMMDD'
+                            ),
+                            'DD/MM/YYYY'
+                        ),
+                        'null'  -- Default value if the date is invalid or NULL
+                    ),
+                    'data_exclusao', COALESCE(
+                        TO_CHAR(
+                            TO_DATE(
+                                NULLIF(data_exclusao_simples, '0'),  -- Replace '0' with NULL
+                                'YYYYMMDD'
+                            ),
+                            'DD/MM/YYYY'
+                        ),
+                        'null'  -- Default value if the date is invalid or NULL
+                    )
+                ) as simples,
+                json_build_object(
+                    'optante', case when opcao_mei ilike 'S' then 'true' else 'false' end,
+                    'data_opcao', COALESCE(
+                        TO_CHAR(
+                            TO_DATE(
+                                NULLIF(data_opcao_mei, '0'),  -- Replace '0' with NULL
+                                'YYYYMMDD'
+                            ),
+                            'DD/MM/YYYY'
+                        ),
+                        'null'  -- Default value if the date is invalid or NULL
+                    ),
+                    'data_exclusao', COALESCE(
+                        TO_CHAR(
+                            TO_DATE(
+                                NULLIF(data_exclusao_mei, '0'),
+                                'YYYYMMDD'
+                            ),
+                            'DD/MM/YYYY'
+                        ),
+                        'null'
+                    )
+                ) as simei
+            from
+                simples
+            where
+                cnpj_basico in (select cnpj_basico from requested)
+        )
+    """,
+}
+
+CITY_BY_NAME_QUERY = """
+    select
+        codigo, descricao
+    from
+        munic
+    where
+        descricao ilike :city_name
+"""
+
+CNPJ_ESTABLISHMENTS_QUERY = f"""
+    select distinct {commify_list(ESTABLISHMENT_COLUMNS)}
+    from estabelecimento est
+    where est.cnpj_basico = :cnpj_basico
+    order by 1, 2
+"""
+
+# Secondary CNAE codes as int[]: the generated column added by
+# data/migrations/0001, or the same expression on the raw text column for
+# tables (re)loaded without it
+CNAE_SIDE_CODES_COLUMN = "cnae_fiscal_secundaria_array"
+CNAE_SIDE_CODES_EXPRESSION = """
+    coalesce(
+        string_to_array(
+            nullif(nullif(trim(cnae_fiscal_secundaria), ''), 'nan'), ','
+        )::int[],
+        '{}'::int[]
+    )
+"""
+
+# SQLSTATE undefined_column
+UNDEFINED_COLUMN = "42703"
+
+CNPJ_ACTIVITIES_QUERY = """
+    with cnae_unnest as (
+        select
+            cnpj_basico,
+            unnest(
+                {cnae_side_codes}
+            ) AS codigo_cnae
+        FROM estabelecimento est
+        where cnpj_basico = :cnpj_basico
+    ),
+    nosso_cnae as (
+        select
+            cnpj_basico,
+            codigo,
+            descricao
+        from
+            cnae_unnest
+        inner join
+            cnae
+        on cnae.codigo::text = cnae_unnest.codigo_cnae::text
+        group by cnpj_basico, codigo, descricao
+        order by cnpj_basico, codigo, descricao
+    ),
+    atividade_principal as (
+        select
+            cnpj_basico,
+            json_build_object(
+                'code', cnae.codigo::integer,
+                'text', cnae.descricao
+            ) as atividade_principal
+        from estabelecimento est
+        inner join cnae
+            on est.cnae_fiscal_principal::text = cnae.codigo::text
+        where cnpj_basico = :cnpj_basico
+    ),
+    atividades_secundarias as (
+        select
+            cnpj_basico,
+            json_agg(
+                json_build_object(
+                    'code', codigo,
+                    'text', descricao
+                )
+            ) as atividades_secundarias
+        from nosso_cnae
+        group by cnpj_basico
+    )
+    select
+        a_s.cnpj_basico as cnpj_basico,
+        a_p.atividade_principal as atividade_principal,
+        a_s.atividades_secundarias as atividades_secundarias
+    from
+        atividades_secundarias a_s
+    inner join
+        atividade_principal a_p
+    on
+        a_s.cnpj_basico::text = a_p.cnpj_basico::text
+"""
+
+# Postgres types of the bound query parameters, by bind name
+QUERY_PARAM_TYPES = {
+    "cnpj_basico": "text",
+    "cnpj_basicos": "text[]",
+    "cnpj_ordens": "text[]",
+    "cnpj_dvs": "text[]",
+    "cursor_basico": "text",
+    "cursor_ordem": "text",
+    "cursor_dv": "text",
+    "cnae_main_codes": "text[]",
+    "cnae_side_codes": "int[]",
+    "states": "text[]",
+    "state_abbrev": "text",
+    "city_name": "text",
+    "zipcode": "text",
+    "activity_start_date": "text",
+    "limit": "int",
+    "offset": "int",
+}
+
+PROFILE_SECTION_JOINS = {
+    "establishment": """
+        left join establishment_ est on
+            est.cnpj_basico = req.cnpj_basico and
+            est.cnpj_ordem = req.cnpj_ordem and
+            est.cnpj_dv = req.cnpj_dv
+    """,
+    "company": "left join company_ emp on emp.cnpj_basico = req.cnpj_basico",
+    "partners": "left join partners_ soc on soc.cnpj_basico = req.cnpj_basico",
+    "simples_simei": "left join simples_simei_ sim on sim.cnpj_basico = req.cnpj_basico",
+}
+
 
 class CNPJRepository:
+    # Secondary CNAE codes as int[], see use_cnae_side_codes_column
+    cnae_side_codes_sql: str = CNAE_SIDE_CODES_COLUMN
+
     def __init__(self, session: Session):
         self.session: Session = session
 
     @classmethod
-    def initialize_static_properties(cls, session: Session):
-        # Run the tasks sequentially to avoid concurrent session operations
-        cnaes = cls.get_cnaes(session)
-        legal_natures = cls.get_legal_natures(session)
-        registration_statuses = cls.get_registration_statuses(session)
-        cities = cls.get_cities(session)
+    def get_lookup_tables(cls, session: Session) -> Dict[str, Mapping]:
+        """
+        Get the code-description lookup tables, keyed by code.
 
-        # Assign the results to the class properties
-        cls.cnaes_dict = {str(cnae_info["code"])
-                              : cnae_info for cnae_info in cnaes}
-        cls.legal_nature_dict = {
-            str(legal_nature_info["code"]): legal_nature_info
-            for legal_nature_info in legal_natures
+        The tables come from the snapshot file shared by the workers of the
+        host, and from the database only when the snapshot is missing or stale,
+        in which case a fresh snapshot is written for the next workers.
+
+        Parameters:
+        session (Session): The database session.
+
+        Returns:
+        Dict[str, Mapping]: The entries of each table, keyed by code.
+        """
+        snapshot_enabled = settings.LOOKUP_SNAPSHOT_ENABLED
+        snapshot_path = settings.LOOKUP_SNAPSHOT_PATH
+        max_age = settings.LOOKUP_SNAPSHOT_MAX_AGE
+
+        snapshot = LookupSnapshot.open(snapshot_path, max_age) if snapshot_enabled else None
+        if snapshot is not None:
+            return snapshot.tables
+
+        # Run the tasks sequentially to avoid concurrent session operations
+        tables = {
+            "cnae": cls.get_cnaes(session),
+            "natju": cls.get_legal_natures(session),
+            "moti": cls.get_registration_statuses(session),
+            "munic": cls.get_cities(session),
         }
-        cls.registration_statuses_dict = {
-            str(registration_status_info["code"]): registration_status_info
-            for registration_status_info in registration_statuses
+
+        if snapshot_enabled:
+            try:
+                LookupSnapshot.write(snapshot_path, tables)
+                snapshot = LookupSnapshot.open(snapshot_path, max_age)
+            except Exception as e:
+                logger.error(f"Error writing lookup snapshot {snapshot_path}: {e}")
+
+        if snapshot is not None:
+            return snapshot.tables
+
+        return {
+            table_name: {str(entry["code"]): entry for entry in entries}
+            for table_name, entries in tables.items()
         }
-        cls.cities_dict = {
-            str(city_info["code"]): city_info for city_info in cities}
+
+    @classmethod
+    def initialize_static_properties(cls, session: Session):
+        tables = cls.get_lookup_tables(session)
+
+        # Assign the results to the class properties
+        cls.cnaes_dict = tables["cnae"]
+        cls.cnae_index = PrefixSearchIndex(cls.cnaes_dict.values())
+        cls.legal_nature_dict = tables["natju"]
+        cls.registration_statuses_dict = tables["moti"]
+        cls.cities_dict = tables["munic"]
+        cls.city_matcher = FuzzyMatcher(
+            city_info["text"] for city_info in cls.cities_dict.values())
 
         cls.company_size_dict = get_company_size_dict()
         cls.company_situation_dict = get_company_situation_dict()
         cls.establishment_type_dict = get_establishment_type_dict()
 
+        cls.use_cnae_side_codes_column(cls.has_cnae_side_codes_column(session))
+
+    @staticmethod
+    def has_cnae_side_codes_column(session: Session) -> bool:
+        """
+        Check whether the establishment table has the secondary CNAE codes column.
+
+        Parameters:
+        session (Session): The database session.
+
+        Returns:
+        bool: Whether the generated column exists.
+        """
+        return session.execute(
+            text(
+                "select exists (select 1 from information_schema.columns "
+                "where table_name = 'estabelecimento' and column_name = :column)"
+            ),
+            {"column": CNAE_SIDE_CODES_COLUMN},
+        ).scalar()
+
+    @staticmethod
+    def use_cnae_side_codes_column(available: bool):
+        """
+        Match secondary CNAEs on the generated column, or on the text column.
+
+        Parameters:
+        available (bool): Whether the generated column exists.
+        """
+        sql = CNAE_SIDE_CODES_COLUMN if available else CNAE_SIDE_CODES_EXPRESSION
+        if not available and CNPJRepository.cnae_side_codes_sql != sql:
+            logger.warning(
+                f"Column estabelecimento.{CNAE_SIDE_CODES_COLUMN} is missing, "
+                "secondary CNAEs are matched on the text column, see "
+                "data/migrations/0001_estabelecimento_cnae_fiscal_secundaria_array.sql."
+            )
+
+        CNPJRepository.cnae_side_codes_sql = sql
+
+    @staticmethod
+    def check_missing_cnae_side_codes_column(error: DBAPIError):
+        """
+        Fall back to the text column when a query misses the generated one,
+        as a reload of the establishment table drops it.
+
+        Parameters:
+        error (DBAPIError): The query error.
+        """
+        sqlstate = getattr(error.orig, "sqlstate", None) or getattr(
+            error.orig, "pgcode", None)
+        if sqlstate == UNDEFINED_COLUMN and CNAE_SIDE_CODES_COLUMN in str(error.orig):
+            CNPJRepository.use_cnae_side_codes_column(False)
+
+    @classmethod
+    def get_activities_query(cls) -> str:
+        return CNPJ_ACTIVITIES_QUERY.format(cnae_side_codes=cls.cnae_side_codes_sql)
+
     @classmethod
     def initialize_on_startup(cls, session: Session):
         if not hasattr(cls, "cnaes_dict"):
             cls.initialize_static_properties(session)
 
-    def get_cnpjs_raw(self, query_params: CNPJQueryParams):
+    @staticmethod
+    def execute_query(
+        session: Session, prefix: str, sql: str, params: Optional[Dict[str, Any]] = None
+    ) -> Result:
+        """
+        Execute a parameterized query as a prepared statement.
+
+        Parameters:
+        session (Session): The database session.
+        prefix (str): The statement name prefix.
+        sql (str): The SQL with ':name' binds, independent of the bound values.
+        params (Dict[str, Any]): The bound values.
+
+        Returns:
+        Result: The execution result.
+        """
+        params = params or {}
+        param_types = {param: QUERY_PARAM_TYPES[param] for param in params}
+        statement = get_statement(prefix, sql, param_types)
+
+        try:
+            return execute_statement(session, statement, params)
+        except DBAPIError as e:
+            CNPJRepository.check_missing_cnae_side_codes_column(e)
+            raise
+
+    @staticmethod
+    def keyset_condition(
+        cursor: Optional[str], offset: int, distinct_base: bool = False
+    ) -> Tuple[str, int, Dict[str, str]]:
+        """
+        Build the keyset pagination condition for a cursor.
+
+        Parameters:
+        cursor (str): The opaque cursor of the previous page, if any.
+        offset (int): The requested offset, used only without cursor.
+        distinct_base (bool): Whether the query returns one row per CNPJ base.
+
+        Returns:
+        Tuple: The SQL condition, the effective offset and the bound parameters.
+        """
+        if not cursor:
+            return "1=1", offset, {}
+
+        basico, ordem, dv = decode_cursor(cursor)
+        params = {
+            "cursor_basico": basico,
+            "cursor_ordem": ordem,
+            "cursor_dv": dv,
+        }
+
+        # Queries with 'distinct on (cnpj_basico)' emit each base once
+        condition = (
+            "cnpj_basico > :cursor_basico"
+            if distinct_base
+            else "(cnpj_basico, cnpj_ordem, cnpj_dv) > "
+            "(:cursor_basico, :cursor_ordem, :cursor_dv)"
+        )
+
+        return condition, 0, params
+
+    @classmethod
+    def cnae_condition(
+        cls, cnae_codes: Iterable[Union[str, int]], has_secondary_cnae: bool = True
+    ) -> Tuple[str, Dict[str, List]]:
+        """
+        Build the CNAE filter on the establishment table.
+
+        Secondary CNAEs are matched on the GIN-indexed 'cnae_fiscal_secundaria_array'
+        column (see data/migrations) instead of 'like' scans on the raw text column,
+        or on an int[] expression of the text column while the former is missing.
+
+        Parameters:
+        cnae_codes (Iterable): The CNAE codes to match.
+        has_secondary_cnae (bool): Whether secondary CNAEs are also matched.
+
+        Returns:
+        Tuple: The SQL condition and its bound parameters.
+        """
+        # Integer casting validates the codes and matches their unpadded storage
+        codes = [int(cnae_code) for cnae_code in cnae_codes]
+
+        params = {"cnae_main_codes": [str(code) for code in codes]}
+        condition = "cnae_fiscal_principal = any(cast(:cnae_main_codes as text[]))"
+
+        if has_secondary_cnae:
+            params["cnae_side_codes"] = codes
+            condition = (
+                f"{condition} or "
+                f"{cls.cnae_side_codes_sql} && cast(:cnae_side_codes as int[])"
+            )
+
+        return f"({condition})", params
+
+    @staticmethod
+    def next_cursor(keys: List[Tuple], limit: int) -> Optional[str]:
+        """
+        Get the cursor for the page after the given keys.
+
+        Parameters:
+        keys (List[Tuple]): The (cnpj_basico, cnpj_ordem, cnpj_dv) keys of the page.
+        limit (int): The page size.
+
+        Returns:
+        str: The cursor of the next page, or None on the last page.
+        """
+        return encode_cursor(keys[-1]) if len(keys) == limit else None
+
+    @staticmethod
+    def to_cnpjs(cnpj_tuples: List[Tuple]) -> CNPJList:
+        """
+        Get the CNPJ objects of (cnpj_basico, cnpj_ordem, cnpj_dv) rows.
+
+        Parameters:
+        cnpj_tuples (List[Tuple]): The CNPJ key rows.
+
+        Returns:
+        CNPJList: The CNPJ objects.
+        """
+        return [
+            CNPJ(cnpj_base, cnpj_order, cnpj_digits)
+            for cnpj_base, cnpj_order, cnpj_digits in cnpj_tuples
+        ]
+
+    def get_cnpjs_raw(
+            self, query_params: CNPJQueryParams) -> Tuple[List[str], Optional[str]]:
         """
         Get CNPJs on database according to (state_abbrev, city_code, cnae_code, zipcode).
         One may set filters has_secondary_cnae for checking all CNAE codes, limit for page size and
-        offset for page start point.
+        either cursor or offset for page start point.
+
+        Returns:
+        Tuple: The CNPJs of the page and the cursor of the next page.
         """
-        # Filters
-        filled_zipcode = str(int(query_params.zipcode)) \
-            if query_params.zipcode else ""
-        zipcode_condition = f"cep='{filled_zipcode}'" \
-            if filled_zipcode else "1=1"
+        query, params = self.get_cnpjs_raw_query(query_params)
 
-        city_name = query_params.city_name
-        city_condition = f"municipio='{city_name.upper()}'" \
-            if query_params.city_name else "1=1"
+        cnpjs_result: Result = self.execute_query(
+            self.session, "cnpjs_raw", query, params
+        ).fetchall()
 
-        state_abbrev = query_params.state_abbrev
-        state_condition = f"uf='{state_abbrev.upper()}'" \
-            if query_params.state_abbrev else "1=1"
+        return self._build_cnpjs_raw(cnpjs_result, query_params.limit)
 
-        activity_start_date = query_params.activity_start_date
+    def get_cnpjs_raw_query(
+            self, query_params: CNPJQueryParams) -> Tuple[str, Dict[str, Any]]:
+        """
+        Get the statement of the filtered CNPJ search.
+
+        Parameters:
+        query_params (CNPJQueryParams): The search filters and page.
+
+        Returns:
+        Tuple: The SQL and its bound parameters.
+        """
+        keyset_condition, offset, keyset_params = self.keyset_condition(
+            query_params.cursor, query_params.offset
+        )
+
+        params = {
+            **keyset_params,
+            "limit": query_params.limit,
+            "offset": offset,
+        }
+
+        # Filters: only the enabled ones take part in the statement shape
+        zipcode_condition = "1=1"
+        if query_params.zipcode:
+            params["zipcode"] = str(int(query_params.zipcode))
+            zipcode_condition = "cep = :zipcode"
+
+        city_condition = "1=1"
+        if query_params.city_name:
+            params["city_name"] = query_params.city_name.upper()
+            city_condition = "municipio = :city_name"
+
+        state_condition = "1=1"
+        if query_params.state_abbrev:
+            params["state_abbrev"] = query_params.state_abbrev.upper()
+            state_condition = "uf = :state_abbrev"
 
-        activity_start_date_condition = f"data_inicio_atividade>='{activity_start_date.strftime('%Y%m%d')}'" \
-            if activity_start_date else "1=1"
+        activity_start_date = query_params.activity_start_date
+        activity_start_date_condition = "1=1"
+        if activity_start_date:
+            params["activity_start_date"] = activity_start_date.strftime("%Y%m%d")
+            activity_start_date_condition = "data_inicio_atividade >= :activity_start_date"
 
         only_headquarters = query_params.only_headquarters
         only_headquarters_condition = "identificador_matriz_filial='1'" \
             if only_headquarters else "1=1"
 
+        cnae_condition = "1=1"
         if query_params.cnae_code:
-            cnae_condition = (
-                f"""
-                (
-                    (
-                        cnae_fiscal_principal = '{query_params.cnae_code}' or
-                        cnae_fiscal_secundaria @> Array[{query_params.cnae_code}]
-                    )
-                )
-                """
-                if query_params.has_secondary_cnae
-                else f"""
-                (
-                    (
-                        cnae_fiscal_principal = '{query_params.cnae_code}'
-                    )
-                )
-                """
+            cnae_condition, cnae_params = self.cnae_condition(
+                [query_params.cnae_code], query_params.has_secondary_cnae
             )
-        else:
-            cnae_condition = "1=1"
+            params.update(cnae_params)
 
-        query = text(
+        query = (
             f"""
                 with estabelecimento_uf as (
                     select
@@ -150,20 +736,19 @@ class CNPJRepository:
                             lpad(cnpj_ordem::text, 4, '0'),
                             lpad(cnpj_dv::text, 2, '0')
                         ) as cnpj,
+                        cnpj_basico,
+                        cnpj_ordem,
+                        cnpj_dv,
                         situacao_cadastral,
                         cep,
                         uf,
                         municipio,
                         data_inicio_atividade,
                         cnae_fiscal_principal,
-                        case
-                            WHEN cnae_fiscal_secundaria = 'nan' THEN '{{}}'
-                        else
-                            string_to_array(cnae_fiscal_secundaria, ',')::INT[]
-                        end as cnae_fiscal_secundaria,
+                        cnae_fiscal_secundaria_array,
                         identificador_matriz_filial
                     from estabelecimento
-                    where {state_condition}
+                    where {state_condition} and {keyset_condition}
                 ),
                 estabelecimento_uf_cidade as (
                     select
@@ -198,27 +783,28 @@ class CNPJRepository:
                         {only_headquarters_condition}
                 )
 
-                select cnpj
+                select cnpj, cnpj_basico, cnpj_ordem, cnpj_dv
                 from estabelecimento_matriz
+                order by
+                    cnpj_basico, cnpj_ordem, cnpj_dv
                 limit
-                    {query_params.limit}
+                    :limit
                 offset
-                    {query_params.offset}
+                    :offset
             """
         )
 
-        print(query)
+        return query, params
 
-        cnpjs_result: Result = replace_invalid_fields_on_list_tuple(
-            self.session.execute(query).fetchall()
-        )
-
-        columns = ["cnpj"]
-        cnpjs_df = pd.DataFrame(cnpjs_result, columns=columns)
+    def _build_cnpjs_raw(
+        self, cnpjs_result: List[Tuple], limit: int
+    ) -> Tuple[List[str], Optional[str]]:
+        cnpjs_result = replace_invalid_fields_on_list_tuple(cnpjs_result)
 
-        cnpjs_list = list(cnpjs_df["cnpj"])
+        cnpjs_list = [cnpj_row[0] for cnpj_row in cnpjs_result]
+        keys = [tuple(cnpj_row[1:]) for cnpj_row in cnpjs_result]
 
-        return cnpjs_list
+        return cnpjs_list, self.next_cursor(keys, limit)
 
     def is_code_key_valid(self, code_key: CodeType,
                           code_dict: Dict[str, Any]) -> bool:
@@ -283,20 +869,8 @@ class CNPJRepository:
         if not token:
             return []
 
-        # Use parameterized queries to safely include the token in the query
-        query = CNAE.descricao.ilike(f"%{token}%")
-        cnae_result: List[CNAE] = self.session.query(CNAE).filter(query).all()
-
-        # Map the results to the desired format
-        cnae_dict = [
-            {
-                "code": cnae_object.codigo,
-                "text": cnae_object.descricao
-            }
-            for cnae_object in cnae_result
-        ]
-
-        return cnae_dict
+        # Search the index built from the CNAE table at startup
+        return self.__class__.cnae_index.search(token)
 
     @staticmethod
     def get_cnaes(session):
@@ -442,34 +1016,17 @@ class CNPJRepository:
         if not city_name:
             return False, None
 
-        query = text(
-            f"""
-                select
-                    codigo, descricao
-                from
-                    munic
-                where
-                    descricao ilike '{city_name}'
-            """
-        )
+        city_result: Result = self.execute_query(
+            self.session, "city_exists", CITY_BY_NAME_QUERY, {"city_name": city_name}
+        ).fetchall()
 
-        city_result: Result = self.session.execute(query).fetchall()
+        return self._build_city(city_result)
 
+    def _build_city(self, city_result: List[Tuple]):
         columns = ["code", "text"]
-        empty_df = pd.DataFrame(columns=columns)
-        city_df = (
-            empty_df
-            if len(city_result) == 0
-            else pd.DataFrame(city_result, columns=columns)
-        )
-        city_obj = (
-            city_df.to_dict()
-            if len(city_result) == 0
-            else city_df.to_dict(orient="records")[0]
-        )
         has_city = len(city_result) != 0
 
-        return has_city, city_obj if has_city else None
+        return has_city, dict(zip(columns, city_result[0])) if has_city else None
 
     def get_city(self, city_code: str):
         """
@@ -511,32 +1068,22 @@ class CNPJRepository:
 
     def get_city_candidates(self, city_candidates_list: CodeListType):
         """
-        Get the city for the code.
+        Get the closest city names for each candidate name.
 
         Parameters:
-        code (str): The code of the city.
+        city_candidates_list (CodeListType): The candidate city names.
 
         Returns:
-        str: The name of the city.
+        Dict[str, List[str]]: The closest city names of each candidate.
         """
         city_candidates_list = list(set(city_candidates_list))
-        lower_city_candidates_list = [
-            city_candidate.lower() for city_candidate in city_candidates_list
-        ]
-        elegible_cities_text = [
-            city_dict["text"] for city_dict in self.cities_dict.values()
-        ]
 
         # NOTE: Hard coded limit_count = 3
         LIMIT_COUNT = 3
 
         return {
-            city_candidate: find_most_possible_tokens(
-                elegible_cities_text, lower_city_candidate, LIMIT_COUNT
-            )
-            for lower_city_candidate, city_candidate in zip(
-                lower_city_candidates_list, city_candidates_list
-            )
+            city_candidate: self.city_matcher.top_k(city_candidate, LIMIT_COUNT)
+            for city_candidate in city_candidates_list
         }
 
     def get_cities_list(self, cities_code_list: CodeListType):
@@ -569,392 +1116,342 @@ class CNPJRepository:
 
         return company_dict
 
-    def get_cnpjs_company(self, cnpj_list: CNPJList):
+    @staticmethod
+    def get_profile_query(sections: List[str]) -> str:
         """
-        Get the company for the CNPJ.
+        Get the profile statement for the given sections.
 
         Parameters:
-        cnpj (CNPJ): The CNPJ object.
+        sections (List[str]): The profile sections, in PROFILE_SECTIONS order.
 
         Returns:
-        DataFrame: The DataFrame with the company.
+        str: The SQL, bound to the cnpj_basicos, cnpj_ordens and cnpj_dvs arrays.
         """
-        cnpj_basicos_str = comma_stringify_list(
-            [cnpj.basico_int for cnpj in cnpj_list])
-
-        columns = [
-            "cnpj_basico",
-            "razao_social",
-            "ente_federativo_responsavel",
-            "porte_empresa",
-            "capital_social",
-            "natureza_juridica",
-        ]
-        columns_str = commify_list(columns)
+        ctes_str = ",".join(PROFILE_SECTION_CTES[section] for section in sections)
+        joins_str = "\n".join(PROFILE_SECTION_JOINS[section] for section in sections)
+        columns_str = commify_list(
+            [
+                f"{alias}.{column}"
+                for alias, columns in map(PROFILE_SECTIONS.get, sections)
+                for column in columns
+            ]
+        )
 
-        query = text(
+        return (
             f"""
-            with empresa_ as (
+                with requested (cnpj_basico, cnpj_ordem, cnpj_dv) as (
+                    select * from unnest(
+                        cast(:cnpj_basicos as text[]),
+                        cast(:cnpj_ordens as text[]),
+                        cast(:cnpj_dvs as text[])
+                    )
+                ),
+                {ctes_str}
                 select
                     {columns_str}
-                from empresa emp
-                    where emp.cnpj_basico in ({cnpj_basicos_str})
-            )
-            select
-                distinct on (cnpj_basico)
-                cnpj_basico,
-                razao_social,
-                ente_federativo_responsavel,
-                porte_empresa,
-                capital_social,
-                concat(natju.codigo, '-', natju.descricao) as natureza_juridica
-            from
-                empresa_ emp
-            left join natju on natju.codigo::text = emp.natureza_juridica::text
+                from
+                    requested req
+                {joins_str}
             """
         )
 
-        with get_session(settings.POSTGRES_DBNAME_RFB) as session:
-            company_result: Result = session.execute(query).fetchall()
+    def get_cnpjs_profile(
+        self, cnpj_list: CNPJList, sections: Iterable[str] = PROFILE_SECTIONS
+    ) -> Dict[str, List[Tuple]]:
+        """
+        Get the profile sections for a batch of CNPJs in a single statement.
 
-        company_result: Result = replace_invalid_fields_on_list_tuple(
-            company_result)
-        company_result: Result = replace_spaces_on_list_tuple(company_result)
+        Establishment, company, partners and Simples/SIMEI rows are fetched
+        together, on the repository session, by joining each section to the requested
+        CNPJs.
 
-        empty_df = pd.DataFrame(columns=columns)
-        company_df = pd.DataFrame(company_result, columns=columns)
-        company_df = empty_df if len(company_result) == 0 else company_df
-        company_df["cnpj_basico"] = company_df["cnpj_basico"].apply(
-            zfill_factory(8))
+        Parameters:
+        cnpj_list (CNPJList): The list of CNPJ objects.
+        sections (Iterable[str]): The profile sections to fetch.
 
-        if len(company_df) == 0:
-            return []
+        Returns:
+        Dict: The section rows, keyed by section name.
+        """
+        sections = [section for section in PROFILE_SECTIONS if section in sections]
 
-        company_dict = dataframe_to_nested_dict(company_df, "cnpj_basico")
+        cnpj_list = list(cnpj_list)
+        if len(cnpj_list) == 0 or len(sections) == 0:
+            return {section: [] for section in sections}
 
-        def item_map(item):
-            return item[0], self.__format_company(item[1])
+        query = self.get_profile_query(sections)
+        params = self.get_profile_params(cnpj_list)
 
-        company_dict = dict(map(item_map, company_dict.items()))
+        profile_result: Result = self.execute_query(
+            self.session, "cnpjs_profile", query, params
+        ).fetchall()
 
-        cnpjs_base = [cnpj.to_tuple()[0] for cnpj in cnpj_list]
+        return self.split_profile(profile_result, sections)
 
-        companies_dict = {
-            cnpj.to_raw(): company_dict[cnpj_base]
-            for cnpj_base, cnpj in zip(cnpjs_base, cnpj_list)
-            if cnpj_base in company_dict
-        }
+    @staticmethod
+    def get_profile_params(cnpj_list: CNPJList) -> Dict[str, List[str]]:
+        """
+        Get the bound parameters of the profile statement.
 
-        return companies_dict
+        Parameters:
+        cnpj_list (CNPJList): The list of CNPJ objects.
 
-    def __format_establishment(self, establishment_dict: Dict[str, Any]):
+        Returns:
+        Dict: The parallel key arrays, unnested into exact (basico, ordem, dv) rows.
         """
-        Formats the establishment dictionary.
+        return {
+            "cnpj_basicos": [str(cnpj.basico_int) for cnpj in cnpj_list],
+            "cnpj_ordens": [str(cnpj.ordem_int) for cnpj in cnpj_list],
+            "cnpj_dvs": [str(cnpj.digitos_verificadores_int) for cnpj in cnpj_list],
+        }
 
-        Args:
-            establishment_dict (Dict): The establishment dictionary to format.
+    @staticmethod
+    def split_profile(
+        profile_result: List[Tuple], sections: List[str]
+    ) -> Dict[str, List[Tuple]]:
+        """
+        Split the profile rows into their sections.
+
+        Parameters:
+        profile_result (List[Tuple]): The rows of the profile statement.
+        sections (List[str]): The profile sections, in PROFILE_SECTIONS order.
 
         Returns:
-            Dict: The formatted establishment dictionary.
+        Dict: The section rows, keyed by section name.
         """
-        data_inicio_atividade = establishment_dict["data_inicio_atividade"]
-        establishment_dict["abertura"] = format_database_date(
-            data_inicio_atividade)
-        del establishment_dict["data_inicio_atividade"]
+        profile = {section: [] for section in sections}
 
-        establishment_dict["email"] = establishment_dict["correio_eletronico"].lower(
-        )
-        del establishment_dict["correio_eletronico"]
+        # Skip absent and repeated sections of each row
+        seen = {section: set() for section in sections}
+        for row in profile_result:
+            start = 0
+            for section in sections:
+                _, columns = PROFILE_SECTIONS[section]
+                section_row = tuple(row[start:start + len(columns)])
+                start += len(columns)
 
-        basico = establishment_dict["cnpj_basico"].zfill(8)
-        ordem = establishment_dict["cnpj_ordem"].zfill(4)
-        dv = establishment_dict["cnpj_dv"].zfill(2)
-        establishment_dict["cnpj"] = format_cnpj(f"{basico}{ordem}{dv}")
+                # Establishments are keyed by the full CNPJ, other sections by its base
+                key = section_row[:3] if section == "establishment" else section_row[:1]
+                if section_row[0] is None or key in seen[section]:
+                    continue
 
-        del establishment_dict["cnpj_basico"]
-        del establishment_dict["cnpj_ordem"]
-        del establishment_dict["cnpj_dv"]
+                seen[section].add(key)
+                profile[section].append(section_row)
 
-        # Get the registration status
-        registration_status = establishment_dict["situacao_cadastral"]
-        situacao_cadastral = str(number_string_to_number(registration_status))
+        return profile
 
-        establishment_dict["situacao"] = self.company_situation_dict[situacao_cadastral]
-        del establishment_dict["situacao_cadastral"]
+    def get_cnpjs_company(self, cnpj_list: CNPJList):
+        """
+        Get the company for the CNPJ.
 
-        establishment_dict["fantasia"] = humanize_string(
-            establishment_dict["nome_fantasia"]
-        )
-        del establishment_dict["nome_fantasia"]
+        Parameters:
+        cnpj (CNPJ): The CNPJ object.
 
-        data_situacao_cadastral = establishment_dict["data_situacao_cadastral"]
-        establishment_dict["data_situacao"] = format_database_date(
-            data_situacao_cadastral
-        )
-        del establishment_dict["data_situacao_cadastral"]
+        Returns:
+        DataFrame: The DataFrame with the company.
+        """
+        profile = self.get_cnpjs_profile(cnpj_list, ["company"])
 
-        registration_reason = establishment_dict["motivo_situacao_cadastral"]
-        establishment_dict["motivo_situacao"] = registration_reason
+        return self._build_company(profile["company"], cnpj_list)
 
-        del establishment_dict["motivo_situacao_cadastral"]
+    def _build_company(self, company_result: List[Tuple], cnpj_list: CNPJList):
+        company_result: Result = replace_invalid_fields_on_list_tuple(
+            company_result)
+        company_result: Result = replace_spaces_on_list_tuple(company_result)
 
-        # Format the phone number
+        if len(company_result) == 0:
+            return []
 
-        # Check if the DDD columns are invalid
-        ddd_1 = establishment_dict["ddd_1"]
-        ddd_2 = establishment_dict["ddd_2"]
-        telefone_1 = establishment_dict["telefone_1"]
-        telefone_2 = establishment_dict["telefone_2"]
+        company_dict = rows_to_nested_dict(
+            company_result, COMPANY_COLUMNS, "cnpj_basico", zfill_factory(8))
 
-        # Format the phone number
-        is_1_invalid = is_field_valid(ddd_1)
-        is_2_invalid = is_field_valid(ddd_2)
+        def item_map(item):
+            return item[0], self.__format_company(item[1])
 
-        telefone_1 = "" if is_1_invalid else format_phone(ddd_1, telefone_1)
-        telefone_2 = "" if is_2_invalid else format_phone(ddd_2, telefone_2)
-        delimiter = " / " if telefone_1 and telefone_1 else ""
+        company_dict = dict(map(item_map, company_dict.items()))
 
-        establishment_dict["telefone"] = telefone_1 + delimiter + telefone_2
+        cnpjs_base = [cnpj.to_tuple()[0] for cnpj in cnpj_list]
+
+        companies_dict = {
+            cnpj.to_raw(): company_dict[cnpj_base]
+            for cnpj_base, cnpj in zip(cnpjs_base, cnpj_list)
+            if cnpj_base in company_dict
+        }
 
-        del establishment_dict["ddd_1"]
-        del establishment_dict["telefone_1"]
-        del establishment_dict["ddd_2"]
-        del establishment_dict["telefone_2"]
+        return companies_dict
 
-        # Format address
-        address_type = establishment_dict["tipo_logradouro"]
-        address_name = establishment_dict["logradouro"]
-        address_type = replace_spaces(address_type).strip()
-        address_name = replace_spaces(address_name).strip()
-        address = humanize_string(address_type + " " + address_name)
+    def _format_establishments(self, columns: Dict[str, List]) -> List[Dict]:
+        """
+        Formats establishment columns into establishment dictionaries.
 
-        establishment_dict["logradouro"] = address
-        del establishment_dict["tipo_logradouro"]
+        Each output field is computed over a whole column, and the lookups
+        and string formatting run once per distinct value, so companies with
+        thousands of branches cost about as much as their distinct values.
 
-        # Format UF
-        complement = establishment_dict["complemento"]
-        establishment_dict["complemento"] = humanize_string(complement)
-        establishment_dict["bairro"] = humanize_string(
-            establishment_dict["bairro"])
+        Args:
+            columns (Dict[str, List]): The values of each establishment column.
 
-        # Format CEP
-        zip_code = establishment_dict["cep"]
-        establishment_dict["cep"] = format_cep(zip_code)
+        Returns:
+            List[Dict]: The formatted establishment dictionaries, in row order.
+        """
+        def clean_field_map(el):
+            return "" if not is_field_valid(el) else el
 
-        # Get the company type
-        identificador = establishment_dict["identificador_matriz_filial"]
-        establishment_dict["tipo"] = self.establishment_type_dict[identificador]
+        def clean_column(column):
+            return map_column(clean_field_map, column)
 
-        del establishment_dict["identificador_matriz_filial"]
+        def cnpj_map(cnpj_parts):
+            basico, ordem, dv = cnpj_parts
+            return f"{basico[:2]}.{basico[2:5]}.{basico[5:8]}/{ordem}-{dv}"
 
-        # Get city name
-        city_code = establishment_dict["municipio"]
-        city_dict = self.get_city(city_code)
-        city_label = city_dict["text"]
+        def situation_map(registration_status):
+            situacao_cadastral = str(number_string_to_number(registration_status))
+            return self.company_situation_dict[situacao_cadastral]
 
-        establishment_dict["municipio"] = humanize_string(city_label)
+        def phone_map(phone_parts):
+            ddd, phone = phone_parts
+            # The DDD check is kept as is
+            is_invalid = is_field_valid(ddd)
+            return "" if is_invalid else format_phone(ddd, phone)
 
-        # Get the main CNAE
-        atividade_principal = establishment_dict["cnae_fiscal_principal"]
+        def address_map(address_parts):
+            address_type, address_name = address_parts
+            address_type = replace_spaces(address_type).strip()
+            address_name = replace_spaces(address_name).strip()
+            return humanize_string(address_type + " " + address_name)
 
-        establishment_dict["atividade_principal"] = (
-            self.get_cnae(atividade_principal) if atividade_principal else {}
-        )
+        def city_map(city_code):
+            return humanize_string(self.get_city(city_code)["text"])
 
-        del establishment_dict["cnae_fiscal_principal"]
+        def main_activity_map(atividade_principal):
+            return self.get_cnae(atividade_principal) if atividade_principal else {}
 
-        # Get the secondary CNAEs
-        side_activities_str = establishment_dict["cnae_fiscal_secundaria"]
+        def side_activities_map(side_activities_str):
+            if not is_field_valid(side_activities_str):
+                return []
 
-        if is_field_valid(side_activities_str):
             cnae_list = side_activities_str.split(",")
             has_side_cnaes = len(cnae_list) != 0 and cnae_list[0] != ""
+            if not has_side_cnaes:
+                return []
+
+            cnae_list = [str(int(cnae_str.strip())) for cnae_str in cnae_list]
+            return self.get_cnae_list(cnae_list)
+
+        cnpj_column = map_column(cnpj_map, zip(
+            map_column(zfill_factory(8), columns["cnpj_basico"]),
+            map_column(zfill_factory(4), columns["cnpj_ordem"]),
+            map_column(zfill_factory(2), columns["cnpj_dv"]),
+        ))
+
+        phone_1_column = map_column(
+            phone_map, zip(columns["ddd_1"], columns["telefone_1"]))
+        phone_2_column = map_column(
+            phone_map, zip(columns["ddd_2"], columns["telefone_2"]))
+        phone_column = [
+            telefone_1 + (" / " if telefone_1 else "") + telefone_2
+            for telefone_1, telefone_2 in zip(phone_1_column, phone_2_column)
+        ]
 
-            side_activity_names = []
-            if has_side_cnaes:
-                cnae_list = [str(int(cnae_str.strip()))
-                             for cnae_str in cnae_list]
-                side_activity_names = self.get_cnae_list(cnae_list)
-
-            establishment_dict["atividades_secundarias"] = side_activity_names
-        else:
-            establishment_dict["atividades_secundarias"] = []
-
-        del establishment_dict["cnae_fiscal_secundaria"]
-
-        list_dict = [establishment_dict]
-        list_dict = replace_invalid_fields_on_list_dict(list_dict)
-        establishment_dict = list_dict[0]
+        address_column = map_column(
+            address_map, zip(columns["tipo_logradouro"], columns["logradouro"]))
+
+        formatted_columns = {
+            "logradouro": clean_column(address_column),
+            "numero": clean_column(columns["numero"]),
+            "complemento": clean_column(
+                map_column(humanize_string, columns["complemento"])),
+            "bairro": clean_column(
+                map_column(humanize_string, columns["bairro"])),
+            "municipio": clean_column(map_column(city_map, columns["municipio"])),
+            "cep": clean_column(map_column(format_cep, columns["cep"])),
+            "uf": clean_column(columns["uf"]),
+            "situacao_especial": clean_column(columns["situacao_especial"]),
+            "data_situacao_especial": clean_column(
+                columns["data_situacao_especial"]),
+            "abertura": clean_column(map_column(
+                format_database_date, columns["data_inicio_atividade"])),
+            "email": clean_column(map_column(
+                str.lower, columns["correio_eletronico"])),
+            "cnpj": cnpj_column,
+            "situacao": clean_column(
+                map_column(situation_map, columns["situacao_cadastral"])),
+            "fantasia": clean_column(
+                map_column(humanize_string, columns["nome_fantasia"])),
+            "data_situacao": clean_column(map_column(
+                format_database_date, columns["data_situacao_cadastral"])),
+            # Registration reasons may already be mapped to (unhashable) dicts
+            "motivo_situacao": [
+                clean_field_map(registration_reason)
+                for registration_reason in columns["motivo_situacao_cadastral"]
+            ],
+            "telefone": clean_column(phone_column),
+            "tipo": clean_column(map_column(
+                self.establishment_type_dict.__getitem__,
+                columns["identificador_matriz_filial"])),
+            "atividade_principal": map_column(
+                main_activity_map, columns["cnae_fiscal_principal"]),
+            "atividades_secundarias": map_column(
+                side_activities_map, columns["cnae_fiscal_secundaria"]),
+        }
 
-        return establishment_dict
+        return columns_to_dicts(formatted_columns)
 
     def get_cnpjs_establishment(self, cnpj_list: CNPJList) -> Dict:
-        columns = [
-            "cnpj_basico",
-            "cnpj_ordem",
-            "cnpj_dv",
-            "correio_eletronico",
-            "data_inicio_atividade",
-            "data_situacao_cadastral",
-            "situacao_cadastral",
-            "motivo_situacao_cadastral",
-            "nome_fantasia",
-            "tipo_logradouro",
-            "logradouro",
-            "numero",
-            "complemento",
-            "bairro",
-            "municipio",
-            "cep",
-            "uf",
-            "cnae_fiscal_principal",
-            "cnae_fiscal_secundaria",
-            "identificador_matriz_filial",
-            "situacao_especial",
-            "data_situacao_especial",
-            "ddd_1",
-            "telefone_1",
-            "ddd_2",
-            "telefone_2",
-        ]
-        columns_str = commify_list(columns)
+        profile = self.get_cnpjs_profile(cnpj_list, ["establishment"])
 
-        cnpjs_basicos_str = comma_stringify_list(
-            [cnpj.basico_int for cnpj in cnpj_list]
-        )
-        cnpjs_ordem_str = comma_stringify_list(
-            [cnpj.ordem_int for cnpj in cnpj_list])
-        cnpjs_dv_str = comma_stringify_list(
-            [cnpj.digitos_verificadores_int for cnpj in cnpj_list]
-        )
+        return self._build_establishment(profile["establishment"])
 
-        # Create the table if it does not exist
-        query = text(
-            f"""
-                select
-                    {columns_str}
-                from
-                    estabelecimento est
-                where
-                    est.cnpj_basico in ({cnpjs_basicos_str}) AND
-                    est.cnpj_ordem in ({cnpjs_ordem_str}) AND
-                    est.cnpj_dv in ({cnpjs_dv_str})
-            """
-        )
-
-        with get_session(settings.POSTGRES_DBNAME_RFB) as session:
-            establishment_result: Result = session.execute(query).fetchall()
-
-        empty_df = pd.DataFrame(columns=columns)
-        df_is_empty = len(establishment_result) == 0
-        if df_is_empty:
+    def _build_establishment(self, establishment_result: List[Tuple]) -> Dict:
+        if len(establishment_result) == 0:
             return {}
 
-        establishment_result = replace_invalid_fields_on_list_tuple(
-            establishment_result
-        )
-        establishment_result = replace_spaces_on_list_tuple(
-            establishment_result)
-
-        establishment_df = pd.DataFrame(establishment_result, columns=columns)
-        establishment_df = (
-            empty_df if len(establishment_result) == 0 else establishment_df
-        )
+        columns = clean_columns(
+            rows_to_columns(establishment_result, ESTABLISHMENT_COLUMNS))
 
-        registration_status = establishment_df["motivo_situacao_cadastral"]
-        registration_status = registration_status.map(
-            self.registration_statuses_dict)
-        establishment_df["motivo_situacao_cadastral"] = registration_status
-
-        cnpj_base_series = establishment_df["cnpj_basico"]
-        cnpj_ordem_series = establishment_df["cnpj_ordem"]
-        cnpj_dv_series = establishment_df["cnpj_dv"]
-
-        establishment_df["cnpj_"] = (
-            cnpj_base_series.apply(zfill_factory(8))
-            + cnpj_ordem_series.apply(zfill_factory(4))
-            + cnpj_dv_series.apply(zfill_factory(2))
-        )
-        establishment_dict = dataframe_to_nested_dict(
-            establishment_df, "cnpj_")
-
-        def item_map(item):
-            return item[0], self.__format_establishment(item[1])
-
-        establishment_dict = dict(map(item_map, establishment_dict.items()))
+        cnpj_keys = [
+            basico.zfill(8) + ordem.zfill(4) + dv.zfill(2)
+            for basico, ordem, dv in zip(
+                columns["cnpj_basico"], columns["cnpj_ordem"], columns["cnpj_dv"])
+        ]
 
-        return establishment_dict
+        # Keep the last row of each CNPJ
+        last_rows = {cnpj_key: index for index, cnpj_key in enumerate(cnpj_keys)}
+        if len(last_rows) != len(cnpj_keys):
+            columns = {
+                column: [values[index] for index in last_rows.values()]
+                for column, values in columns.items()
+            }
 
-    def get_cnpj_establishments(self, cnpj: CNPJ) -> List:
-        columns = [
-            "cnpj_basico",
-            "cnpj_ordem",
-            "cnpj_dv",
-            "correio_eletronico",
-            "data_inicio_atividade",
-            "data_situacao_cadastral",
-            "situacao_cadastral",
-            "motivo_situacao_cadastral",
-            "nome_fantasia",
-            "tipo_logradouro",
-            "logradouro",
-            "numero",
-            "complemento",
-            "bairro",
-            "municipio",
-            "cep",
-            "uf",
-            "cnae_fiscal_principal",
-            "cnae_fiscal_secundaria",
-            "identificador_matriz_filial",
-            "situacao_especial",
-            "data_situacao_especial",
-            "ddd_1",
-            "telefone_1",
-            "ddd_2",
-            "telefone_2",
+        columns["motivo_situacao_cadastral"] = [
+            self.registration_statuses_dict.get(registration_status)
+            for registration_status in columns["motivo_situacao_cadastral"]
         ]
 
-        # Create the table if it does not exist
-        establishment_colums_str = commify_list(columns)
-        query = text(
-            f"""
-                select distinct {establishment_colums_str}
-                from estabelecimento est
-                where est.cnpj_basico = '{cnpj.basico_int}'
-                order by 1, 2
-            """
-        )
+        return dict(zip(last_rows, self._format_establishments(columns)))
 
-        with get_session(settings.POSTGRES_DBNAME_RFB) as session:
-            establishment_result = session.execute(query)
-            establishment_result: Result = establishment_result.fetchall()
+    def get_cnpj_establishments(self, cnpj: CNPJ) -> List:
+        params = {"cnpj_basico": str(cnpj.basico_int)}
 
-        establishment_result = replace_invalid_fields_on_list_tuple(
-            establishment_result
-        )
-        establishment_result = replace_spaces_on_list_tuple(
-            establishment_result)
+        establishment_result: Result = self.execute_query(
+            self.session, "cnpj_establishments", CNPJ_ESTABLISHMENTS_QUERY, params
+        ).fetchall()
 
-        empty_df = pd.DataFrame(columns=columns)
-        establishment_df = pd.DataFrame(establishment_result, columns=columns)
-        establishment_df = (
-            empty_df if len(establishment_result) == 0 else establishment_df
-        )
+        return self._build_establishments(establishment_result)
 
-        establishment_df["cnpj_ordem"] = establishment_df["cnpj_ordem"].apply(
-            int)
-        establishment_df = establishment_df.sort_values(by=["cnpj_ordem"])
-        establishment_df["cnpj_ordem"] = establishment_df["cnpj_ordem"].apply(
-            str)
+    def _build_establishments(self, establishment_result: List[Tuple]) -> List:
+        columns = clean_columns(
+            rows_to_columns(establishment_result, ESTABLISHMENT_COLUMNS))
 
-        establishment_list = establishment_df.to_dict(orient="records")
+        cnpj_ordens = [int(cnpj_ordem) for cnpj_ordem in columns["cnpj_ordem"]]
+        order = sorted(range(len(cnpj_ordens)), key=cnpj_ordens.__getitem__)
 
-        est_is_empty = len(establishment_df) == 0
-        format_map = self.__format_establishment
+        columns = {
+            column: [values[index] for index in order]
+            for column, values in columns.items()
+        }
+        columns["cnpj_ordem"] = [str(cnpj_ordens[index]) for index in order]
 
-        return [] if est_is_empty else list(
-            map(format_map, establishment_list))
+        return self._format_establishments(columns)
 
     def get_cnpjs_partners(self, cnpj_list: CNPJList) -> List:
         """
@@ -966,60 +1463,20 @@ class CNPJRepository:
         Returns:
         DataFrame: The DataFrame with the partners.
         """
-        cnpj_basicos_str = format_cnpj_list(cnpj_list)
-
-        query = text(
-            f"""
-                with socios_ as (
-                    select
-                        cnpj_basico,
-                        qualificacao_socio,
-                        nome_socio_razao_social
-                    from
-                        socios
-                    where
-                        cnpj_basico IN ({cnpj_basicos_str})
-                    group by
-                        1, 2, 3
-                )
-                SELECT
-                    cnpj_basico,
-                    json_agg(
-                        json_build_object(
-                            'nome', nome_socio_razao_social,
-                            'qual', concat(qualificacao_socio,'-', qual_socio.descricao)
-                        )
-                    ) AS qsa
-                FROM
-                    socios_ soc
-                left join
-                    quals qual_socio
-                on
-                    qual_socio.codigo::text = soc.qualificacao_socio::text
-                GROUP BY
-                    cnpj_basico
-            """
-        )
+        profile = self.get_cnpjs_profile(cnpj_list, ["partners"])
 
-        with get_session(settings.POSTGRES_DBNAME_RFB) as session:
-            partners_result = session.execute(query)
-            partners_result: Result = partners_result.fetchall()
+        return self._build_partners(profile["partners"], cnpj_list)
 
+    def _build_partners(self, partners_result: List[Tuple], cnpj_list: CNPJList):
         partners_result: Result = replace_invalid_fields_on_list_tuple(
             partners_result)
         partners_result: Result = replace_spaces_on_list_tuple(partners_result)
 
-        columns = ["cnpj_basico", "qsa"]
-        empty_df = pd.DataFrame(columns=columns)
-
-        partners_df = pd.DataFrame(partners_result, columns=columns)
-        partners_df = empty_df if len(partners_df) == 0 else partners_df
+        partners_dict = rows_to_nested_dict(
+            partners_result, PARTNERS_COLUMNS, "cnpj_basico", zfill_factory(8))
 
-        partners_df["qsa"] = partners_df["qsa"].apply(string_to_json)
-        partners_df["cnpj_basico"] = partners_df["cnpj_basico"].apply(
-            zfill_factory(8))
-        partners_dict = dataframe_to_nested_dict(
-            partners_df, index_col="cnpj_basico")
+        for partners in partners_dict.values():
+            partners["qsa"] = string_to_json(partners["qsa"])
 
         cnpjs_raw_base = [(cnpj.to_raw(), cnpj.to_tuple()[0])
                           for cnpj in cnpj_list]
@@ -1074,86 +1531,18 @@ class CNPJRepository:
         Returns:
         DataFrame: The DataFrame with the partners.
         """
-        cnpj_basicos_str = comma_stringify_list(
-            [cnpj.basico_int for cnpj in cnpj_list])
-
-        query = text(
-            f"""
-            SELECT
-                cnpj_basico,
-                json_build_object(
-                    'optante',
-                    case when opcao_pelo_simples ilike 'S' then 'true' else 'false' end,
-                    'data_opcao', COALESCE(
-                        TO_CHAR(
-                            TO_DATE(
-                                NULLIF(data_opcao_simples, '0'),  -- Replace '0' with NULL
-                                'YYYYMMDD'
-                            ),
-                            'DD/MM/YYYY'
-                        ),
-                        'null'  -- Default value if the date is invalid or NULL
-                    ),
-                    'data_exclusao', COALESCE(
-                        TO_CHAR(
-                            TO_DATE(
-                                NULLIF(data_exclusao_simples, '0'),  -- Replace '0' with NULL
-                                'YYYYMMDD'
-                            ),
-                            'DD/MM/YYYY'
-                        ),
-                        'null'  -- Default value if the date is invalid or NULL
-                    )
-                ) AS simples,
-                json_build_object(
-                    'optante', case when opcao_mei ilike 'S' then 'true' else 'false' end,
-                    'data_opcao', COALESCE(
-                        TO_CHAR(
-                            TO_DATE(
-                                NULLIF(data_opcao_mei, '0'),  -- Replace '0' with NULL
-                                'YYYYMMDD'
-                            ),
-                            'DD/MM/YYYY'
-                        ),
-                        'null'  -- Default value if the date is invalid or NULL
-                    ),
-                    'data_exclusao', COALESCE(
-                        TO_CHAR(
-                            TO_DATE(
-                                NULLIF(data_exclusao_mei, '0'),
-                                'YYYYMMDD'
-                            ),
-                            'DD/MM/YYYY'
-                        ),
-                        'null'
-                    )
-                ) AS simei
-            FROM
-                simples soc
-                where
-                    cnpj_basico IN ({cnpj_basicos_str})
-            """
-        )
+        profile = self.get_cnpjs_profile(cnpj_list, ["simples_simei"])
 
-        with get_session(settings.POSTGRES_DBNAME_RFB) as session:
-            simples_simei_result: Result = session.execute(query)
+        return self._build_simples_simei(profile["simples_simei"], cnpj_list)
 
-        simples_simei_result: Result = simples_simei_result.fetchall()
+    def _build_simples_simei(
+            self, simples_simei_result: List[Tuple], cnpj_list: CNPJList):
         simples_simei_result = replace_invalid_fields_on_list_tuple(
             simples_simei_result
         )
         simples_simei_result = replace_spaces_on_list_tuple(
             simples_simei_result)
 
-        columns = ["cnpj_basico", "simples", "simei"]
-
-        simples_simei_df = pd.DataFrame(simples_simei_result, columns=columns)
-        simples_simei_df = (simples_simei_df if len(
-            simples_simei_df) == 0 else simples_simei_df)
-
-        simples_simei_df["cnpj_basico"] = simples_simei_df["cnpj_basico"].apply(
-            zfill_factory(8))
-
         cnpjs_raw_base = [(cnpj.to_raw(), cnpj.to_tuple()[0])
                           for cnpj in cnpj_list]
 
@@ -1164,8 +1553,11 @@ class CNPJRepository:
         }
         empty_dict = {"simples": not_selected_dict, "simei": not_selected_dict}
 
-        simples_simei_dict = dataframe_to_nested_dict(
-            simples_simei_df, index_col="cnpj_basico"
+        simples_simei_dict = rows_to_nested_dict(
+            simples_simei_result,
+            SIMPLES_SIMEI_COLUMNS,
+            "cnpj_basico",
+            zfill_factory(8),
         )
 
         def cnpj_map(cnpj_base_):
@@ -1222,72 +1614,15 @@ class CNPJRepository:
         Returns:
         DataFrame: The DataFrame with the activities.
         """
-        query = text(
-            f"""
-                with cnae_unnest as (
-                    select
-                        cnpj_basico,
-                        unnest(
-                            string_to_array(
-                                est.cnae_fiscal_secundaria, ','
-                            )
-                        )::integer AS codigo_cnae
-                    FROM estabelecimento est
-                    where cnpj_basico::text = '{cnpj.basico_int}'
-                ),
-                nosso_cnae as (
-                    select
-                        cnpj_basico,
-                        codigo,
-                        descricao
-                    from
-                        cnae_unnest
-                    inner join
-                        cnae
-                    on cnae.codigo::text = cnae_unnest.codigo_cnae::text
-                    group by cnpj_basico, codigo, descricao
-                    order by cnpj_basico, codigo, descricao
-                ),
-                atividade_principal as (
-                    select
-                        cnpj_basico,
-                        json_build_object(
-                            'code', cnae.codigo::integer,
-                            'text', cnae.descricao
-                        ) as atividade_principal
-                    from estabelecimento est
-                    inner join cnae
-                        on est.cnae_fiscal_principal::text = cnae.codigo::text
-                    where cnpj_basico::text = '{cnpj.basico_int}'
-                ),
-                atividades_secundarias as (
-                    select
-                        cnpj_basico,
-                        json_agg(
-                            json_build_object(
-                                'code', codigo,
-                                'text', descricao
-                            )
-                        ) as atividades_secundarias
-                    from nosso_cnae
-                    group by cnpj_basico
-                )
-                select
-                    a_s.cnpj_basico as cnpj_basico,
-                    a_p.atividade_principal as atividade_principal,
-                    a_s.atividades_secundarias as atividades_secundarias
-                from
-                    atividades_secundarias a_s
-                inner join
-                    atividade_principal a_p
-                on
-                    a_s.cnpj_basico::text = a_p.cnpj_basico::text
-            """
-        )
+        params = {"cnpj_basico": str(cnpj.basico_int)}
 
-        with get_session(settings.POSTGRES_DBNAME_RFB) as session:
-            activities_result: Result = session.execute(query).fetchall()
+        activities_result: Result = self.execute_query(
+            self.session, "cnpj_activities", self.get_activities_query(), params
+        ).fetchall()
 
+        return self._build_activities(activities_result)
+
+    def _build_activities(self, activities_result: List[Tuple]) -> Dict:
         activities_result = replace_invalid_fields_on_list_tuple(
             activities_result)
         activities_result = replace_spaces_on_list_tuple(activities_result)
@@ -1296,15 +1631,10 @@ class CNPJRepository:
             "cnpj_basico",
             "atividade_principal",
             "atividades_secundarias"]
-        partners_df = pd.DataFrame(activities_result, columns=columns)
-        empty_df = pd.DataFrame(columns=columns)
-
-        partners_df = empty_df if len(partners_df) == 0 else partners_df
+        activities_dict = rows_to_dicts(activities_result, columns)[0]
 
-        partners_dict = partners_df.to_dict(orient="records")[0]
-
-        main_activities_str = partners_dict["atividade_principal"]
-        side_activities_str = partners_dict["atividades_secundarias"]
+        main_activities_str = activities_dict["atividade_principal"]
+        side_activities_str = activities_dict["atividades_secundarias"]
         main_activities = string_to_json(main_activities_str)
         side_activities = string_to_json(side_activities_str)
 
@@ -1318,7 +1648,7 @@ class CNPJRepository:
 
     def get_cnpjs_info(self, cnpj_list: CNPJList) -> JSON:
         """
-        Get the information for the CNPJ.
+        Get the information for the CNPJ, reading through the release cache.
 
         Parameters:
         cnpj (CNPJ): The CNPJ object.
@@ -1326,69 +1656,101 @@ class CNPJRepository:
         Returns:
         dict: The dictionary with the CNPJ information.
         """
-        columns = [
-            "cnpj",
-            "cnpj_raw",
-            "abertura",
-            "tipo",
-            "nome",
-            "fantasia",
-            "capital_social",
-            "porte",
-            "logradouro",
-            "numero",
-            "complemento",
-            "bairro",
-            "municipio",
-            "uf",
-            "cep",
-            "email",
-            "telefone",
-            "situacao",
-            "data_situacao",
-            "motivo_situacao",
-            "situacao_especial",
-            "data_situacao_especial",
-            "atividade_principal",
-            "atividades_secundarias",
-            "efr",
-            "qsa",
-            "simples",
-            "simei",
-        ]
+        cnpj_list = list(cnpj_list)
+        cnpj_infos, missing_list = self._get_cached_cnpjs_info(cnpj_list)
+
+        if missing_list:
+            profile = self.get_cnpjs_profile(missing_list)
+            missing_infos = self._build_cnpjs_info(profile, missing_list)
+            cnpj_infos.update(self._cache_cnpjs_info(missing_list, missing_infos))
+
+        return self._merge_cnpjs_info(cnpj_list, cnpj_infos)
+
+    @staticmethod
+    def _get_cached_cnpjs_info(
+        cnpj_list: CNPJList,
+    ) -> Tuple[Dict[str, Optional[Dict]], CNPJList]:
+        """
+        Get the cached information of the CNPJs.
+
+        Parameters:
+        cnpj_list (CNPJList): The list of CNPJ objects.
+
+        Returns:
+        Tuple: The cached information, None for CNPJs known to be missing,
+        keyed by raw CNPJ, and the CNPJs to fetch.
+        """
+        cnpj_infos, missing = cnpj_info_cache.get_many(
+            {cnpj.to_raw() for cnpj in cnpj_list})
+        missing = set(missing)
+
+        return cnpj_infos, [cnpj for cnpj in cnpj_list if cnpj.to_raw() in missing]
+
+    @staticmethod
+    def _cache_cnpjs_info(
+        cnpj_list: CNPJList, cnpj_infos: JSON
+    ) -> Dict[str, Optional[Dict]]:
+        """
+        Cache the fetched information of the CNPJs.
+
+        CNPJs without an establishment are cached as None, so repeated
+        lookups of unknown CNPJs do not reach the database either.
 
-        # Define the methods to run in parallel
-        tasks = {
-            "establishment": self.get_cnpjs_establishment,
-            "company": self.get_cnpjs_company,
-            "partners": self.get_cnpjs_partners,
-            "simples_simei": self.get_cnpjs_simples_simei,
+        Parameters:
+        cnpj_list (CNPJList): The fetched CNPJ objects.
+        cnpj_infos (JSON): Their information, as built by _build_cnpjs_info.
+
+        Returns:
+        Dict[str, Optional[Dict]]: The cached information, keyed by raw CNPJ.
+        """
+        found_infos = {
+            cnpj_info["cnpj_raw"]: cnpj_info
+            for cnpj_info in cnpj_infos or []
+            if "cnpj" in cnpj_info
         }
+        cnpj_infos = {
+            cnpj.to_raw(): found_infos.get(cnpj.to_raw()) for cnpj in cnpj_list}
+
+        cnpj_info_cache.set_many(cnpj_infos)
 
-        results = {}
-
-        # Run the tasks in parallel using ThreadPoolExecutor
-        with ThreadPoolExecutor() as executor:
-            # Create a future for each task
-            future_to_task = {
-                executor.submit(
-                    task,
-                    cnpj_list): name for name,
-                task in tasks.items()}
-
-            # Collect the results as they complete
-            for future in as_completed(future_to_task):
-                task_name = future_to_task[future]
-                try:
-                    results[task_name] = future.result()
-                except Exception as e:
-                    results[task_name] = f"Error occurred: {e}"
-
-        # Combine all the results into a single dictionary and return it
-        establishment_dict: dict = results.get("establishment", {})
-        company_dict: dict = results.get("company", {})
-        partners_dict: dict = results.get("partners", {})
-        simples_simei_dict: dict = results.get("simples_simei", {})
+        return cnpj_infos
+
+    @staticmethod
+    def _merge_cnpjs_info(
+        cnpj_list: CNPJList, cnpj_infos: Dict[str, Optional[Dict]]
+    ) -> JSON:
+        """
+        Order the information of the found CNPJs as requested.
+
+        Parameters:
+        cnpj_list (CNPJList): The requested CNPJ objects.
+        cnpj_infos (Dict[str, Optional[Dict]]): The information, keyed by raw CNPJ.
+
+        Returns:
+        JSON: The information of the found CNPJs, or an empty dict if none.
+        """
+        merged_infos = {}
+        for cnpj in cnpj_list:
+            cnpj_info = cnpj_infos.get(cnpj.to_raw())
+            if cnpj_info is not None:
+                merged_infos.setdefault(cnpj.to_raw(), cnpj_info)
+
+        return list(merged_infos.values()) if merged_infos else {}
+
+    def _build_cnpjs_info(
+        self, profile: Dict[str, List[Tuple]], cnpj_list: CNPJList
+    ) -> JSON:
+        columns = CNPJ_INFO_COLUMNS
+
+        # Project each section out of the profile rows
+        establishment_dict: dict = self._build_establishment(
+            profile["establishment"])
+        company_dict: dict = self._build_company(
+            profile["company"], cnpj_list) or {}
+        partners_dict: dict = self._build_partners(
+            profile["partners"], cnpj_list)
+        simples_simei_dict: dict = self._build_simples_simei(
+            profile["simples_simei"], cnpj_list)
 
         if (len(establishment_dict) == 0):
             return {}
@@ -1426,43 +1788,16 @@ class CNPJRepository:
         Returns:
         dict: The dictionary with the CNPJ information.
         """
-        columns = [
-            "cnpj_raw",
-            "cnpj",
-            "abertura",
-            "situacao",
-            "data_situacao",
-            "motivo_situacao",
-            "situacao_especial",
-            "data_situacao_especial",
-            "tipo",
-            "nome",
-            "fantasia",
-            "porte",
-            "natureza_juridica",
-            "capital_social",
-            "atividade_principal",
-            "atividades_secundarias",
-            "logradouro",
-            "numero",
-            "complemento",
-            "municipio",
-            "bairro",
-            "uf",
-            "cep",
-            "email",
-            "telefone",
-            "efr",
-            "qsa",
-        ]
-        pd.DataFrame(columns=columns)
-
         cnpj_info = (self.get_cnpjs_info([cnpj]))[0]
 
         return cnpj_info if len(cnpj_info) != 0 else []
 
     def get_cnpjs_with_cnae(
-        self, cnae_code: str, limit: int = settings.PAGE_SIZE, offset: int = 0
+        self,
+        cnae_code: str,
+        limit: int = settings.PAGE_SIZE,
+        offset: int = 0,
+        cursor: Optional[str] = None,
     ):
         """
         Get the companies with the CNAE.
@@ -1471,9 +1806,40 @@ class CNPJRepository:
         cnae_code (str): The code of the CNAE.
 
         Returns:
-        DataFrame: The DataFrame with the companies.
+        Tuple: The companies and the cursor of the next page.
+        """
+        query, params = self.get_cnpjs_with_cnae_query(
+            cnae_code, limit, offset, cursor)
+        cnpj_tuples = self.execute_query(
+            self.session, "cnpjs_with_cnae", query, params
+        ).fetchall()
+
+        return (
+            self.get_cnpjs_info(self.to_cnpjs(cnpj_tuples)),
+            self.next_cursor(cnpj_tuples, limit),
+        )
+
+    def get_cnpjs_with_cnae_query(
+        self,
+        cnae_code: str,
+        limit: int = settings.PAGE_SIZE,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        Get the statement of the active companies with the CNAE.
+
+        Returns:
+        Tuple: The SQL and its bound parameters.
         """
-        query = text(
+        keyset_condition, offset, keyset_params = self.keyset_condition(
+            cursor, offset, distinct_base=True
+        )
+
+        cnae_condition, cnae_params = self.cnae_condition([cnae_code])
+        params = {**keyset_params, **cnae_params, "limit": limit, "offset": offset}
+
+        query = (
             f"""
                 select
                     distinct on (cnpj_basico)
@@ -1481,34 +1847,24 @@ class CNPJRepository:
                 from
                     estabelecimento
                 where
-                    (
-                        cnae_fiscal_principal = '{cnae_code}' or
-                        cnae_fiscal_secundaria like '%{cnae_code}%'
-                    ) and
-                    situacao_cadastral = '2' -- ATIVA
+                    {cnae_condition} and
+                    situacao_cadastral = '2' and -- ATIVA
+                    {keyset_condition}
                 order by
                     1, 2
                 limit
-                    {limit}
+                    :limit
                 offset
-                    {offset}
+                    :offset
             """
         )
 
-        result: Result = self.session.execute(query)
-        cnpj_tuples = result.fetchall()
-
-        cnpjs_str_list = [
-            CNPJ(cnpj_base, cnpj_order, cnpj_digits)
-            for cnpj_base, cnpj_order, cnpj_digits in cnpj_tuples
-        ]
-
-        return self.get_cnpjs_info(cnpjs_str_list)
+        return query, params
 
     def get_cnpjs_by_cnaes(
             self,
             cnaes_list: CodeListType,
-            query_params: PaginatedLimitOffsetParams):
+            query_params: CursorLimitOffsetParams):
         """
         Get the companies by the CNAEs.
 
@@ -1516,16 +1872,41 @@ class CNPJRepository:
         cnaes_list (CodeListType): The list of CNAEs.
 
         Returns:
-        Dict: The dictionary with the CNPJs info.
+        Tuple: The CNPJs info and the cursor of the next page.
         """
-        cnaes_str = comma_stringify_list(cnaes_list)
+        query, params = self.get_cnpjs_by_cnaes_query(cnaes_list, query_params)
+        cnpj_tuples = self.execute_query(
+            self.session, "cnpjs_by_cnaes", query, params
+        ).fetchall()
 
-        main_cnae_str_condition = f"cnae_fiscal_principal in ({cnaes_str})"
-        side_cnae_str_condition = " or ".join(
-            [f"cnae_fiscal_secundaria like '%{cnae}%'" for cnae in cnaes_list]
+        return (
+            self.get_cnpjs_info(self.to_cnpjs(cnpj_tuples)),
+            self.next_cursor(cnpj_tuples, query_params.limit),
         )
 
-        query = text(
+    def get_cnpjs_by_cnaes_query(
+            self,
+            cnaes_list: CodeListType,
+            query_params: CursorLimitOffsetParams) -> Tuple[str, Dict[str, Any]]:
+        """
+        Get the statement of the active companies by the CNAEs.
+
+        Returns:
+        Tuple: The SQL and its bound parameters.
+        """
+        keyset_condition, offset, keyset_params = self.keyset_condition(
+            query_params.cursor, query_params.offset, distinct_base=True
+        )
+
+        cnae_condition, cnae_params = self.cnae_condition(cnaes_list)
+        params = {
+            **keyset_params,
+            **cnae_params,
+            "limit": query_params.limit,
+            "offset": offset,
+        }
+
+        query = (
             f"""
                 select
                     distinct on (cnpj_basico)
@@ -1533,35 +1914,26 @@ class CNPJRepository:
                 from
                     estabelecimento
                 where
-                    (
-                        {main_cnae_str_condition} or
-                        {side_cnae_str_condition}
-                    ) and
-                    situacao_cadastral::text = '2' -- ATIVA
+                    {cnae_condition} and
+                    situacao_cadastral::text = '2' and -- ATIVA
+                    {keyset_condition}
                 order by
                     1, 2
                 limit
-                    {query_params.limit}
+                    :limit
                 offset
-                    {query_params.offset}
+                    :offset
             """
         )
 
-        result: Result = self.session.execute(query)
-        cnpj_tuples = result.fetchall()
-
-        cnpjs_str_list = [
-            CNPJ(cnpj_base, cnpj_order, cnpj_digits)
-            for cnpj_base, cnpj_order, cnpj_digits in cnpj_tuples
-        ]
-
-        return self.get_cnpjs_info(cnpjs_str_list)
+        return query, params
 
     def get_cnpjs_by_states(
         self,
         states_list: CodeListType,
         limit: int = settings.PAGE_SIZE,
         offset: int = 0,
+        cursor: Optional[str] = None,
     ):
         """
         Get the companies by the states.
@@ -1569,12 +1941,44 @@ class CNPJRepository:
         Parameters:
 
         Returns:
-        Dict: The dictionary with the CNPJs info.
+        Tuple: The CNPJs info and the cursor of the next page.
         """
+        query, params = self.get_cnpjs_by_states_query(
+            states_list, limit, offset, cursor)
+        cnpj_tuples = self.execute_query(
+            self.session, "cnpjs_by_states", query, params
+        ).fetchall()
 
-        states_str = comma_stringify_list(states_list)
+        return (
+            self.get_cnpjs_info(self.to_cnpjs(cnpj_tuples)),
+            self.next_cursor(cnpj_tuples, limit),
+        )
 
-        query = text(
+    def get_cnpjs_by_states_query(
+        self,
+        states_list: CodeListType,
+        limit: int = settings.PAGE_SIZE,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        Get the statement of the active companies by the states.
+
+        Returns:
+        Tuple: The SQL and its bound parameters.
+        """
+        keyset_condition, offset, keyset_params = self.keyset_condition(
+            cursor, offset, distinct_base=True
+        )
+
+        params = {
+            **keyset_params,
+            "states": list(states_list),
+            "limit": limit,
+            "offset": offset,
+        }
+
+        query = (
             f"""
                 select
                     distinct on (cnpj_basico)
@@ -1582,23 +1986,270 @@ class CNPJRepository:
                 from
                     estabelecimento
                 where
-                    uf in ({states_str}) and
-                    situacao_cadastral::text = '2' -- ATIVA
+                    uf = any(cast(:states as text[])) and
+                    situacao_cadastral::text = '2' and -- ATIVA
+                    {keyset_condition}
                 order by
                     1, 2
                 limit
-                    {limit}
+                    :limit
                 offset
-                    {offset}
+                    :offset
             """
         )
 
-        result: Result = self.session.execute(query)
-        cnpj_tuples = result.fetchall()
+        return query, params
 
-        cnpjs_str_list = [
-            CNPJ(cnpj_base, cnpj_order, cnpj_digits)
-            for cnpj_base, cnpj_order, cnpj_digits in cnpj_tuples
-        ]
 
-        return self.get_cnpjs_info(cnpjs_str_list)
+class AsyncCNPJRepository(CNPJRepository):
+    """
+    CNPJ repository on the asyncio engine.
+
+    Database lookups are coroutines sharing the statements and row builders of
+    CNPJRepository, so routes await them on the event loop instead of holding a
+    threadpool worker. The psycopg driver prepares and caches the statements of
+    each connection by itself. Code tables are still served from the class
+    dictionaries loaded on startup.
+
+    Lookups share the connection of the request, checked out on the first
+    one and returned when the request ends. There is no sync session: an
+    inherited lookup not overridden by a coroutine fails explicitly.
+    """
+
+    def __init__(self, connection: RequestConnection):
+        """
+        Parameters:
+        connection (RequestConnection): The connection of the request.
+        """
+        self.connection = connection
+
+    @property
+    def session(self) -> Session:
+        raise NotImplementedError(
+            "AsyncCNPJRepository has no sync session, "
+            "override the lookup as a coroutine on the request connection."
+        )
+
+    @staticmethod
+    async def execute_query(
+        session: Union[AsyncConnection, AsyncSession],
+        prefix: str,
+        sql: str,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> Result:
+        """
+        Execute a parameterized query on an asyncio connection or session.
+
+        Parameters:
+        session (Union[AsyncConnection, AsyncSession]): The asyncio connection or session.
+        prefix (str): The statement name prefix, kept for parity with the sync variant.
+        sql (str): The SQL with ':name' binds, independent of the bound values.
+        params (Dict[str, Any]): The bound values.
+
+        Returns:
+        Result: The buffered execution result.
+        """
+        return await session.execute(text(sql), params or {})
+
+    async def fetch_all(
+        self, prefix: str, sql: str, params: Optional[Dict[str, Any]] = None
+    ) -> List[Tuple]:
+        """
+        Fetch the rows of a query on the connection of the request.
+
+        Parameters:
+        prefix (str): The statement name prefix.
+        sql (str): The SQL with ':name' binds.
+        params (Dict[str, Any]): The bound values.
+
+        Returns:
+        List[Tuple]: The result rows.
+        """
+        connection = await self.connection.get()
+        try:
+            result = await self.execute_query(connection, prefix, sql, params)
+        except DBAPIError as e:
+            self.check_missing_cnae_side_codes_column(e)
+            raise
+
+        return result.fetchall()
+
+    async def get_cnpjs_raw(
+            self, query_params: CNPJQueryParams) -> Tuple[List[str], Optional[str]]:
+        query, params = self.get_cnpjs_raw_query(query_params)
+        cnpjs_result = await self.fetch_all("cnpjs_raw", query, params)
+
+        return self._build_cnpjs_raw(cnpjs_result, query_params.limit)
+
+    async def city_exists(self, city_name: str):
+        if not city_name:
+            return False, None
+
+        city_result = await self.fetch_all(
+            "city_exists", CITY_BY_NAME_QUERY, {"city_name": city_name}
+        )
+
+        return self._build_city(city_result)
+
+    async def get_cnpjs_profile(
+        self, cnpj_list: CNPJList, sections: Iterable[str] = PROFILE_SECTIONS
+    ) -> Dict[str, List[Tuple]]:
+        sections = [section for section in PROFILE_SECTIONS if section in sections]
+
+        cnpj_list = list(cnpj_list)
+        if len(cnpj_list) == 0 or len(sections) == 0:
+            return {section: [] for section in sections}
+
+        query = self.get_profile_query(sections)
+        params = self.get_profile_params(cnpj_list)
+        profile_result = await self.fetch_all("cnpjs_profile", query, params)
+
+        return self.split_profile(profile_result, sections)
+
+    async def get_cnpjs_profile_pipelined(
+        self, cnpj_list: CNPJList
+    ) -> Dict[str, List[Tuple]]:
+        """
+        Get the profile sections as statements pipelined on one connection.
+
+        The section statements are sent back-to-back on the connection of the
+        request and their results read together, so the sections cost about
+        one round trip.
+
+        Parameters:
+        cnpj_list (CNPJList): The list of CNPJ objects.
+
+        Returns:
+        Dict: The section rows, keyed by section name.
+        """
+        cnpj_list = list(cnpj_list)
+        if len(cnpj_list) == 0:
+            return {section: [] for section in PROFILE_SECTIONS}
+
+        params = self.get_profile_params(cnpj_list)
+        section_results = await execute_pipeline(
+            await self.connection.get(),
+            [
+                (self.get_profile_query([section]), params)
+                for section in PROFILE_SECTIONS
+            ],
+        )
+
+        return {
+            section: self.split_profile(section_result, [section])[section]
+            for section, section_result in zip(PROFILE_SECTIONS, section_results)
+        }
+
+    async def get_cnpjs_company(self, cnpj_list: CNPJList):
+        profile = await self.get_cnpjs_profile(cnpj_list, ["company"])
+
+        return self._build_company(profile["company"], cnpj_list)
+
+    async def get_cnpjs_establishment(self, cnpj_list: CNPJList) -> Dict:
+        profile = await self.get_cnpjs_profile(cnpj_list, ["establishment"])
+
+        return self._build_establishment(profile["establishment"])
+
+    async def get_cnpj_establishments(self, cnpj: CNPJ) -> List:
+        establishment_result = await self.fetch_all(
+            "cnpj_establishments",
+            CNPJ_ESTABLISHMENTS_QUERY,
+            {"cnpj_basico": str(cnpj.basico_int)},
+        )
+
+        return self._build_establishments(establishment_result)
+
+    async def get_cnpjs_partners(self, cnpj_list: CNPJList) -> List:
+        profile = await self.get_cnpjs_profile(cnpj_list, ["partners"])
+
+        return self._build_partners(profile["partners"], cnpj_list)
+
+    async def get_cnpjs_simples_simei(self, cnpj_list: CNPJList) -> List:
+        profile = await self.get_cnpjs_profile(cnpj_list, ["simples_simei"])
+
+        return self._build_simples_simei(profile["simples_simei"], cnpj_list)
+
+    async def get_cnpj_activities(self, cnpj: CNPJ):
+        activities_result = await self.fetch_all(
+            "cnpj_activities",
+            self.get_activities_query(),
+            {"cnpj_basico": str(cnpj.basico_int)},
+        )
+
+        return self._build_activities(activities_result)
+
+    async def get_cnpjs_info(self, cnpj_list: CNPJList) -> JSON:
+        """
+        Get the information for the CNPJs.
+
+        The four profile sections are pipelined on the connection of the
+        request or, with POSTGRES_PIPELINE off, fetched on it in a single
+        statement.
+
+        Parameters:
+        cnpj_list (CNPJList): The list of CNPJ objects.
+
+        Returns:
+        list: The CNPJ information dictionaries.
+        """
+        cnpj_list = list(cnpj_list)
+        cnpj_infos, missing_list = self._get_cached_cnpjs_info(cnpj_list)
+
+        if missing_list:
+            if settings.POSTGRES_PIPELINE:
+                profile = await self.get_cnpjs_profile_pipelined(missing_list)
+            else:
+                profile = await self.get_cnpjs_profile(missing_list)
+            missing_infos = self._build_cnpjs_info(profile, missing_list)
+            cnpj_infos.update(self._cache_cnpjs_info(missing_list, missing_infos))
+
+        return self._merge_cnpjs_info(cnpj_list, cnpj_infos)
+
+    async def get_cnpj_info(self, cnpj: CNPJ) -> JSON:
+        cnpj_info = (await self.get_cnpjs_info([cnpj]))[0]
+
+        return cnpj_info if len(cnpj_info) != 0 else []
+
+    async def get_cnpjs_with_cnae(
+        self,
+        cnae_code: str,
+        limit: int = settings.PAGE_SIZE,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+    ):
+        query, params = self.get_cnpjs_with_cnae_query(
+            cnae_code, limit, offset, cursor)
+        cnpj_tuples = await self.fetch_all("cnpjs_with_cnae", query, params)
+
+        return (
+            await self.get_cnpjs_info(self.to_cnpjs(cnpj_tuples)),
+            self.next_cursor(cnpj_tuples, limit),
+        )
+
+    async def get_cnpjs_by_cnaes(
+            self,
+            cnaes_list: CodeListType,
+            query_params: CursorLimitOffsetParams):
+        query, params = self.get_cnpjs_by_cnaes_query(cnaes_list, query_params)
+        cnpj_tuples = await self.fetch_all("cnpjs_by_cnaes", query, params)
+
+        return (
+            await self.get_cnpjs_info(self.to_cnpjs(cnpj_tuples)),
+            self.next_cursor(cnpj_tuples, query_params.limit),
+        )
+
+    async def get_cnpjs_by_states(
+        self,
+        states_list: CodeListType,
+        limit: int = settings.PAGE_SIZE,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+    ):
+        query, params = self.get_cnpjs_by_states_query(
+            states_list, limit, offset, cursor)
+        cnpj_tuples = await self.fetch_all("cnpjs_by_states", query, params)
+
+        return (
+            await self.get_cnpjs_info(self.to_cnpjs(cnpj_tuples)),
+            self.next_cursor(cnpj_tuples, limit),
+        )
@@ -0,0 +1,120 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from ipaddress import ip_address
+from typing import Any, Callable, Dict, Iterable, List
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+
+from backend.app.api.repositories.base import BaseRepository
+from backend.app.database.models.logs import IpInfo
+
+# Resolves the information of a public IP address, such as its RDAP record
+IpResolver = Callable[[str], Dict[str, Any]]
+
+# Information of the addresses with nothing to look up
+NON_PUBLIC_IP_INFO = {"is_public": False}
+
+
+def rdap_resolver(ip: str) -> Dict[str, Any]:
+    # Deferred, only the IP lookup task needs it
+    from ipwhois import IPWhois
+
+    return IPWhois(ip).lookup_rdap(depth=1)
+
+
+def is_public_ip(ip: str) -> bool:
+    try:
+        ip_obj = ip_address(ip)
+    except ValueError:
+        return False
+
+    return not (ip_obj.is_private or ip_obj.is_loopback or ip_obj.is_reserved)
+
+
+def resolve_ips(
+    ips: Iterable[str], resolver: IpResolver, max_workers: int
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Resolves IP addresses, at most max_workers at a time.
+
+    Failed lookups resolve to their error, so that their logs are not picked
+    up again on every run.
+
+    Args:
+        ips (Iterable[str]): The distinct IP addresses.
+        resolver (IpResolver): Resolves an IP address.
+        max_workers (int): The maximum number of concurrent lookups.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: The information of each address.
+    """
+    ips = list(ips)
+    if not ips:
+        return {}
+
+    def resolve(ip: str) -> Dict[str, Any]:
+        try:
+            return resolver(ip)
+        except Exception as e:
+            # Deferred, setup.logging imports this module through the log repositories
+            from backend.app.setup.logging import logger
+
+            logger.warning(f"Error looking up IP {ip}: {e}", extra={"ip": ip})
+            return {"error": str(e)}
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(ips))) as executor:
+        return dict(zip(ips, executor.map(resolve, ips)))
+
+
+class IpInfoRepository(BaseRepository):
+    def get_fresh(self, ips: List[str], ttl: timedelta) -> Dict[str, Dict[str, Any]]:
+        """
+        Gets the cached information of IP addresses, if resolved within a TTL.
+
+        Parameters:
+        ips (List[str]): The IP addresses.
+        ttl (timedelta): The maximum age of the cached information.
+
+        Returns:
+        Dict[str, Dict[str, Any]]: The information of the cached addresses.
+        """
+        if not ips:
+            return {}
+
+        cutoff = datetime.now(timezone.utc) - ttl
+        rows = self.session.execute(
+            select(IpInfo.ipin_ip_address, IpInfo.ipin_info).where(
+                IpInfo.ipin_ip_address.in_(ips),
+                IpInfo.ipin_resolved_at >= cutoff,
+            )
+        )
+        return {ip: info for ip, info in rows}
+
+    def upsert_many(self, infos: Dict[str, Dict[str, Any]]) -> int:
+        """
+        Caches the information of IP addresses, replacing older entries.
+
+        Parameters:
+        infos (Dict[str, Dict[str, Any]]): The information of each address.
+
+        Returns:
+        int: The number of cached addresses.
+        """
+        if not infos:
+            return 0
+
+        resolved_at = datetime.now(timezone.utc)
+        statement = insert(IpInfo).values([
+            {"ipin_ip_address": ip, "ipin_info": info, "ipin_resolved_at": resolved_at}
+            for ip, info in infos.items()
+        ])
+        self.session.execute(statement.on_conflict_do_update(
+            index_elements=[IpInfo.ipin_ip_address],
+            set_={
+                "ipin_info": statement.excluded.ipin_info,
+                "ipin_resolved_at": statement.excluded.ipin_resolved_at,
+            },
+        ))
+        self.session.commit()
+        return len(infos)
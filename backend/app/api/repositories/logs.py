@@ -1,21 +1,30 @@
 # app/repositories/request_log_repository.py
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
+import json
 import logging
-import asyncio
 
 
 from uuid import UUID
-from ipwhois import IPWhois
-from sqlalchemy import delete
+from sqlalchemy import delete, func, insert, text
 from sqlalchemy.future import select
-from sqlalchemy.orm import Session
 
 from backend.app.setup.config import settings
 from backend.app.database.models.logs import DebugLog
 from backend.app.database.models.logs import TaskLog, RequestLog, AppStartLog
+from backend.app.database.models.logs import RequestLatencyRollup
 from backend.app.api.models.logs import RequestLogCreate
 from backend.app.api.repositories.base import BaseRepository
+from backend.app.api.repositories.ip_info import (
+    IpInfoRepository,
+    IpResolver,
+    NON_PUBLIC_IP_INFO,
+    is_public_ip,
+    rdap_resolver,
+    resolve_ips,
+)
+from backend.app.api.utils.batching import BatchWriter
+from backend.app.database.base import get_session
 from backend.app.api.models.logs import TaskLogCreate
 
 
@@ -27,6 +36,24 @@ class RequestLogRepository(BaseRepository):
         self.session.refresh(db_log)
         return db_log
 
+    def create_many(self, data: List[RequestLogCreate]) -> int:
+        """
+        Insert request logs in a single multi-row statement.
+
+        Parameters:
+        data (List[RequestLogCreate]): The request logs.
+
+        Returns:
+        int: The number of inserted logs.
+        """
+        if not data:
+            return 0
+
+        self.session.execute(
+            insert(RequestLog), [log.model_dump() for log in data])
+        self.session.commit()
+        return len(data)
+
     def update(self,
                item_id: UUID,
                data: Dict[str,
@@ -35,7 +62,10 @@ class RequestLogRepository(BaseRepository):
         return None
 
     def get_by_id(self, item_id: UUID) -> Optional[RequestLog]:
-        return self.session.get(RequestLog, item_id)
+        # Keyed by partition too, so not a primary key lookup
+        return self.session.execute(
+            select(RequestLog).where(RequestLog.relo_id == item_id)
+        ).scalar_one_or_none()
 
     def delete_by_id(self, item_id: UUID) -> bool:
         log = self.get_by_id(item_id)
@@ -67,37 +97,105 @@ class RequestLogRepository(BaseRepository):
             self.session.execute(delete_query)
             self.session.commit()
 
-    def lookup_and_update_ip_info(self):
-        # Get all logs with missing IP info
-        logs_without_ip_info = (
-            self.session.query(RequestLog).filter(
-                RequestLog.relo_ip_info == {}).all())
+    def get_ips_without_info(self, limit: int) -> List[str]:
+        """
+        Gets distinct IP addresses of the logs with no IP information yet.
 
-        for log in logs_without_ip_info:
-            ip_address_ = log.relo_ip_address
-            if ip_address_:
-                try:
-                    # Correct the IP address handling
-                    from ipaddress import ip_address
+        Parameters:
+        limit (int): The maximum number of addresses.
 
-                    ip_obj = ip_address(ip_address_)
+        Returns:
+        List[str]: The IP addresses.
+        """
+        rows = self.session.execute(
+            select(RequestLog.relo_ip_address)
+            .where(
+                RequestLog.relo_ip_info == {},
+                func.jsonb_typeof(RequestLog.relo_ip_address) == "string",
+            )
+            .distinct()
+            .limit(limit)
+        ).scalars()
+        return list(rows)
+
+    def update_ip_info(self, infos: Dict[str, Dict[str, Any]]) -> int:
+        """
+        Sets the IP information of the logs of many addresses in one statement.
 
-                    # Check if the IP is public
-                    if not (
-                            ip_obj.is_private or ip_obj.is_loopback or ip_obj.is_reserved):
-                        # Perform IP lookup only for public IPs
-                        obj = IPWhois(ip_address_)
-                        results = obj.lookup_rdap(depth=1)
+        Parameters:
+        infos (Dict[str, Dict[str, Any]]): The information of each address.
 
-                        # Update the log's IP info
-                        self.session.query(RequestLog).filter(
-                            RequestLog.relo_id == log.relo_id
-                        ).update({RequestLog.relo_ip_info: results})
-                        self.session.commit()
+        Returns:
+        int: The number of updated logs.
+        """
+        if not infos:
+            return 0
 
-                except Exception as e:
-                    print(f"Error looking up IP {ip_address}: {e}")
-                    self.session.rollback()
+        result = self.session.execute(
+            text(
+                "update request_logs set relo_ip_info = ip_infos.value "
+                "from jsonb_each(cast(:infos as jsonb)) as ip_infos "
+                "where request_logs.relo_ip_address = to_jsonb(ip_infos.key) "
+                "and request_logs.relo_ip_info = '{}'::jsonb"
+            ),
+            {"infos": json.dumps(infos, default=str)},
+        )
+        self.session.commit()
+        return result.rowcount
+
+    def lookup_and_update_ip_info(
+        self,
+        resolver: IpResolver = rdap_resolver,
+        batch_size: int = 500,
+        max_workers: int = 8,
+        ttl: timedelta = timedelta(days=30),
+    ) -> Dict[str, int]:
+        """
+        Sets the IP information of the logs missing it, batch by batch of
+        distinct addresses.
+
+        Addresses are looked up on the IP information cache first, and only
+        the public ones missing from it are resolved, then cached.
+
+        Parameters:
+        resolver (IpResolver): Resolves a public IP address.
+        batch_size (int): The maximum number of distinct addresses per batch.
+        max_workers (int): The maximum number of concurrent lookups.
+        ttl (timedelta): The maximum age of the cached information.
+
+        Returns:
+        Dict[str, int]: The number of addresses from the cache, resolved and
+            not public, and of updated logs.
+        """
+        ip_info_repository = IpInfoRepository(self.session)
+        counts = {"cached": 0, "resolved": 0, "not_public": 0, "updated_logs": 0}
+
+        while True:
+            ips = self.get_ips_without_info(batch_size)
+            if not ips:
+                return counts
+
+            public_ips = [ip for ip in ips if is_public_ip(ip)]
+            infos = {ip: NON_PUBLIC_IP_INFO for ip in ips if not is_public_ip(ip)}
+
+            cached = ip_info_repository.get_fresh(public_ips, ttl)
+            resolved = resolve_ips(
+                [ip for ip in public_ips if ip not in cached], resolver, max_workers)
+            ip_info_repository.upsert_many({
+                ip: info for ip, info in resolved.items() if "error" not in info})
+
+            infos.update(cached)
+            infos.update(resolved)
+            updated_logs = self.update_ip_info(infos)
+            counts["updated_logs"] += updated_logs
+            counts["cached"] += len(cached)
+            counts["resolved"] += len(resolved)
+            counts["not_public"] += len(ips) - len(public_ips)
+
+            # Every address of the batch has its logs updated, unless the logs
+            # changed meanwhile: stop rather than pick them up again
+            if not updated_logs:
+                return counts
 
 
 class TaskLogRepository(BaseRepository):
@@ -121,7 +219,10 @@ class TaskLogRepository(BaseRepository):
         return task_log
 
     def get_by_id(self, item_id: UUID) -> Optional[TaskLog]:
-        return self.session.get(TaskLog, item_id)
+        # Keyed by partition too, so not a primary key lookup
+        return self.session.execute(
+            select(TaskLog).where(TaskLog.talo_id == item_id)
+        ).scalar_one_or_none()
 
     def delete_by_id(self, item_id: UUID) -> bool:
         task_log = self.get_by_id(item_id)
@@ -214,68 +315,42 @@ class AppStartLogRepository(BaseRepository):
             self.session.commit()
 
 
-class DebuggingDatabaseHandler(logging.Handler):
-    def __init__(self, db_session: Session):
-        super().__init__()
-        self.session = db_session
-        self.queue = asyncio.Queue()
-        self.stop_event = asyncio.Event()
-        
-        # Create a new event loop and set it as the current loop
-        self.loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(self.loop)
-        
-        # Start the processing task
-        self.loop.create_task(self.process_queue())
+class RequestLatencyRollupRepository(BaseRepository):
+    def create_many(self, data: List[Dict[str, Any]]) -> int:
+        """
+        Inserts latency rollups in a single multi-row statement.
+        """
+        if not data:
+            return 0
 
-    def emit(self, record):
-        # This is where you format the log record
-        log_entry = self.format(record)
-
-        # Create a new DebugLog entry and add it to the session
-        log_data = {
-            "created_at": datetime.fromtimestamp(record.created),
-            "level": record.levelname,
-            "message": log_entry,
-            "pathname": record.pathname,
-            "func_name": record.funcName,
-            "lineno": record.lineno,
-            "environment": settings.ENVIRONMENT,
-            "machine_name": settings.MACHINE_NAME,
-        }
-
-        # Add the log to the database and commit the session
-        self.queue.put_nowait(log_data)
-
-    async def process_queue(self):
-        while not self.stop_event.is_set() or not self.queue.empty():
-            log_data = await self.queue.get()
-            self.write_to_db(log_data)
-            self.queue.task_done()
-
-    def write_to_db(self, log_data):
-        # Create a new DebugLog entry and add it to the session
-        debug_log = DebugLog(
-            delo_created_at=log_data["created_at"],
-            delo_level=log_data["level"],
-            delo_message=log_data["message"],
-            delo_pathname=log_data["pathname"],
-            delo_func_name=log_data["func_name"],
-            delo_lineno=log_data["lineno"],
-            delo_environment=log_data["environment"],
-            delo_machine=log_data["machine_name"],
-        )
+        self.session.execute(insert(RequestLatencyRollup), data)
+        self.session.commit()
+        return len(data)
 
-        # Add the log to the database and commit the session
-        self.session.add(debug_log)
+    def delete_old_logs(self, time_delta: timedelta):
+        """
+        Deletes latency rollups of windows older than a specified time delta.
+        """
+        cutoff_date = datetime.now() - time_delta
+        self.session.execute(
+            delete(RequestLatencyRollup).where(
+                RequestLatencyRollup.rlro_window_end < cutoff_date))
         self.session.commit()
 
-    async def close(self):
-        self.stop_event.set()
-        await self.queue.join()  # Awaiting the queue join
-        await super().close()
 
-    async def delete_old_logs(self, time_delta: timedelta):
+class DebugLogRepository(BaseRepository):
+    def create_many(self, data: List[Dict[str, Any]]) -> int:
+        """
+        Inserts debug logs in a single multi-row statement.
+        """
+        if not data:
+            return 0
+
+        self.session.execute(insert(DebugLog), data)
+        self.session.commit()
+        return len(data)
+
+    def delete_old_logs(self, time_delta: timedelta):
         """
         Deletes DebugLog entries older than a specified time delta.
         """
@@ -283,11 +358,11 @@ class DebuggingDatabaseHandler(logging.Handler):
         self.session.query(DebugLog).filter(
             DebugLog.delo_created_at < cutoff_date
         ).delete()
-        await self.session.commit()
+        self.session.commit()
 
-    async def delete_excess_logs(self, max_rows: int):
+    def delete_excess_logs(self, max_rows: int):
         """
-        Deletes excess AppStartLog entries, keeping only a specified number of rows.
+        Deletes excess DebugLog entries, keeping only a specified number of rows.
         """
         query = self.session.query(DebugLog).order_by(DebugLog.delo_created_at)
         total_rows = query.count()
@@ -295,3 +370,56 @@ class DebuggingDatabaseHandler(logging.Handler):
             delete_query = query.delete(synchronize_session="fetch")
             self.session.execute(delete_query)
             self.session.commit()
+
+
+def write_debug_logs(logs: List[Dict[str, Any]]):
+    with get_session(settings.POSTGRES_DBNAME_AUDIT) as db_session:
+        DebugLogRepository(db_session).create_many(logs)
+
+
+class DebuggingDatabaseHandler(logging.Handler):
+    """
+    A logging handler writing the records to the debug_logs table.
+
+    Records are formatted by the logging thread and queued on a bounded batch
+    writer, whose own thread inserts them in batches on fresh sessions. Emitting
+    never waits on the audit database: records are dropped when the queue is
+    full, and the queued ones are written on close.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 200,
+        flush_interval: float = 2.0,
+        max_queue_size: int = 10000,
+        write_batch=write_debug_logs,
+    ):
+        super().__init__()
+        self.writer = BatchWriter(
+            "debug_logs",
+            write_batch,
+            batch_size=batch_size,
+            flush_interval=flush_interval,
+            max_queue_size=max_queue_size,
+        )
+        self.writer.start()
+
+    def emit(self, record):
+        try:
+            self.writer.submit({
+                "delo_created_at": datetime.fromtimestamp(record.created),
+                "delo_level": record.levelname,
+                "delo_message": self.format(record),
+                "delo_pathname": record.pathname,
+                "delo_func_name": record.funcName,
+                "delo_lineno": record.lineno,
+                "delo_environment": settings.ENVIRONMENT,
+                "delo_machine": settings.MACHINE_NAME,
+            })
+        except Exception:
+            self.handleError(record)
+
+    def close(self, timeout: float = 10):
+        """Writes the queued records, then closes the handler."""
+        self.writer.stop(timeout)
+        super().close()
@@ -0,0 +1,279 @@
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, NamedTuple, Optional
+
+from sqlalchemy import text
+
+from backend.app.api.repositories.base import BaseRepository
+
+# Partition name suffix format of each period
+PERIOD_FORMATS = {"day": "%Y%m%d", "month": "%Y%m"}
+
+
+class PartitionSpec(NamedTuple):
+    """A table range-partitioned by a timestamp column, with its retention."""
+
+    table: str
+    column: str
+    period: str
+    retention: timedelta
+
+
+def period_start(moment: datetime, period: str) -> datetime:
+    """
+    Gets the start of the period holding a moment, in UTC.
+
+    Args:
+        moment (datetime): The moment, timezone-aware.
+        period (str): The period, "day" or "month".
+
+    Returns:
+        datetime: The period start.
+    """
+    start = moment.astimezone(timezone.utc).replace(
+        hour=0, minute=0, second=0, microsecond=0)
+
+    return start.replace(day=1) if period == "month" else start
+
+
+def next_period_start(start: datetime, period: str) -> datetime:
+    """
+    Gets the start of the period after the one starting at a moment.
+
+    Args:
+        start (datetime): The period start.
+        period (str): The period, "day" or "month".
+
+    Returns:
+        datetime: The next period start.
+    """
+    if period == "month":
+        return (start + timedelta(days=32)).replace(day=1)
+
+    return start + timedelta(days=1)
+
+
+def partition_name(table: str, start: datetime, period: str) -> str:
+    return f"{table}_p{start.strftime(PERIOD_FORMATS[period])}"
+
+
+def default_partition_name(table: str) -> str:
+    return f"{table}_default"
+
+
+def partition_start(table: str, name: str, period: str) -> Optional[datetime]:
+    """
+    Gets the period start of a partition from its name.
+
+    Returns:
+        Optional[datetime]: The period start, or None if not named by period.
+    """
+    prefix = f"{table}_p"
+    if not name.startswith(prefix):
+        return None
+
+    try:
+        start = datetime.strptime(name[len(prefix):], PERIOD_FORMATS[period])
+    except ValueError:
+        return None
+
+    return start.replace(tzinfo=timezone.utc)
+
+
+class PartitionRepository(BaseRepository):
+    """Creates and drops the range partitions of tables, by period."""
+
+    def is_partitioned(self, table: str) -> bool:
+        """
+        Checks whether a table is partitioned.
+
+        Parameters:
+        table (str): The table name.
+
+        Returns:
+        bool: Whether the table exists and is partitioned.
+        """
+        return bool(self.session.execute(
+            text(
+                "select exists (select 1 from pg_partitioned_table pt "
+                "join pg_class c on c.oid = pt.partrelid "
+                "where c.relname = :table and pg_table_is_visible(c.oid))"
+            ),
+            {"table": table},
+        ).scalar())
+
+    def get_partitions(self, table: str) -> List[str]:
+        """
+        Gets the partition names of a table.
+
+        Parameters:
+        table (str): The table name.
+
+        Returns:
+        List[str]: The partition names.
+        """
+        return list(self.session.execute(
+            text(
+                "select child.relname from pg_inherits i "
+                "join pg_class parent on parent.oid = i.inhparent "
+                "join pg_class child on child.oid = i.inhrelid "
+                "where parent.relname = :table and pg_table_is_visible(parent.oid)"
+            ),
+            {"table": table},
+        ).scalars())
+
+    def create_default_partition(self, table: str):
+        """
+        Creates the default partition of a table, if missing.
+
+        The default partition takes the rows of the periods with no partition,
+        so writes do not fail when the maintenance falls behind.
+
+        Parameters:
+        table (str): The partitioned table name.
+        """
+        self.session.execute(text(
+            f'create table if not exists "{default_partition_name(table)}" '
+            f'partition of "{table}" default'
+        ))
+        self.session.commit()
+
+    def create_partition(
+        self, spec: PartitionSpec, name: str, start: datetime, end: datetime
+    ):
+        """
+        Creates the partition of a table for a timestamp range, if missing.
+
+        The rows of the range in the default partition are moved to the new
+        partition, which is attached in the same transaction, as a range
+        partition cannot overlap rows of the default one.
+
+        Parameters:
+        spec (PartitionSpec): The partitioned table.
+        name (str): The partition name.
+        start (datetime): The range start, included.
+        end (datetime): The range end, excluded.
+        """
+        default_name = default_partition_name(spec.table)
+        in_range = (
+            f""""{spec.column}" >= '{start.isoformat()}' """
+            f"""and "{spec.column}" < '{end.isoformat()}'"""
+        )
+
+        self.session.execute(text(
+            "do $$ begin "
+            f"""if to_regclass('"{name}"') is null then """
+            f'lock table "{default_name}" in share row exclusive mode; '
+            f'create table "{name}" (like "{spec.table}" including defaults); '
+            f'insert into "{name}" select * from "{default_name}" where {in_range}; '
+            f'delete from "{default_name}" where {in_range}; '
+            f'alter table "{spec.table}" attach partition "{name}" '
+            f"for values from ('{start.isoformat()}') to ('{end.isoformat()}'); "
+            "end if; "
+            "end $$"
+        ))
+        self.session.commit()
+
+    def delete_expired(self, table: str, column: str, cutoff: datetime) -> int:
+        """
+        Deletes the rows of a table older than a cutoff, row by row.
+
+        Parameters:
+        table (str): The table name.
+        column (str): The timestamp column.
+        cutoff (datetime): Rows before this moment are deleted.
+
+        Returns:
+        int: The number of deleted rows.
+        """
+        result = self.session.execute(
+            text(f'delete from "{table}" where "{column}" < :cutoff'),
+            {"cutoff": cutoff},
+        )
+        self.session.commit()
+
+        return result.rowcount
+
+    def drop_table_if_expired(self, table: str, column: str, cutoff: datetime) -> bool:
+        """
+        Drops a table once every row of it is older than a cutoff.
+
+        Parameters:
+        table (str): The table name.
+        column (str): The timestamp column.
+        cutoff (datetime): The moment every row must be older than.
+
+        Returns:
+        bool: Whether the table existed and was dropped.
+        """
+        exists = self.session.execute(
+            text("select to_regclass(:table) is not null"), {"table": f'"{table}"'}
+        ).scalar()
+        if not exists:
+            return False
+
+        has_recent_rows = self.session.execute(
+            text(f'select exists (select 1 from "{table}" where "{column}" >= :cutoff)'),
+            {"cutoff": cutoff},
+        ).scalar()
+        if has_recent_rows:
+            return False
+
+        self.session.execute(text(f'drop table "{table}"'))
+        self.session.commit()
+
+        return True
+
+    def drop_partition(self, name: str):
+        """
+        Drops a partition, with all its rows at once.
+
+        Parameters:
+        name (str): The partition name.
+        """
+        self.session.execute(text(f'drop table if exists "{name}"'))
+        self.session.commit()
+
+    def maintain(
+        self, spec: PartitionSpec, ahead: int, now: Optional[datetime] = None
+    ) -> Dict[str, List[str]]:
+        """
+        Creates the default partition and the partitions of the current and
+        next periods, and drops the partitions whose every row is past the
+        retention. Expired rows left in the default partition are deleted.
+
+        Parameters:
+        spec (PartitionSpec): The partitioned table.
+        ahead (int): The number of periods to create after the current one.
+        now (Optional[datetime]): The current moment. Defaults to now.
+
+        Returns:
+        Dict[str, List[str]]: The names of the created and dropped partitions.
+        """
+        now = datetime.now(timezone.utc) if now is None else now
+        existing = set(self.get_partitions(spec.table))
+        created, dropped = [], []
+        cutoff = now - spec.retention
+
+        default_name = default_partition_name(spec.table)
+        if default_name in existing:
+            self.delete_expired(default_name, spec.column, cutoff)
+        else:
+            self.create_default_partition(spec.table)
+            created.append(default_name)
+
+        start = period_start(now, spec.period)
+        for _ in range(ahead + 1):
+            end = next_period_start(start, spec.period)
+            name = partition_name(spec.table, start, spec.period)
+            if name not in existing:
+                self.create_partition(spec, name, start, end)
+                created.append(name)
+            start = end
+
+        for name in sorted(existing):
+            start = partition_start(spec.table, name, spec.period)
+            if start is not None and next_period_start(start, spec.period) <= cutoff:
+                self.drop_partition(name)
+                dropped.append(name)
+
+        return {"created": created, "dropped": dropped}
@@ -0,0 +1,248 @@
+import json
+import mmap
+import os
+import struct
+import tempfile
+from collections.abc import Mapping
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from backend.app.setup.logging import logger
+
+SNAPSHOT_MAGIC = b"CNPJLKP\x00"
+SNAPSHOT_FORMAT_VERSION = 1
+
+# Magic and header length prefix
+SNAPSHOT_PREFIX = struct.Struct("<8sI")
+SEGMENT_ALIGNMENT = 8
+
+
+class SnapshotTable(Mapping):
+    """
+    A read-only code-description table backed by a memory-mapped snapshot.
+
+    Codes are a sorted fixed-width byte array and texts one UTF-8 blob with
+    offsets, all viewed in place on the mapping. Entries are decoded on first
+    access, with the shape of get_cnpj_code_description_entries records, and
+    kept for the next ones: the hot codes are few, the table is not.
+    """
+
+    def __init__(self, codes: np.ndarray, text_offsets: np.ndarray, texts: memoryview):
+        """
+        Parameters:
+        codes (np.ndarray): The sorted codes, as fixed-width bytes.
+        text_offsets (np.ndarray): The start of each text, and the end of the last.
+        texts (memoryview): The UTF-8 encoded texts.
+        """
+        self.codes = codes
+        self.text_offsets = text_offsets
+        self.texts = texts
+        self.decoded: Dict[str, Dict[str, str]] = {}
+
+    def find(self, code: str) -> int:
+        encoded_code = code.encode() if isinstance(code, str) else b""
+        if not encoded_code or len(encoded_code) > self.codes.itemsize:
+            return -1
+
+        position = int(np.searchsorted(self.codes, encoded_code))
+        if position < len(self.codes) and self.codes[position] == encoded_code:
+            return position
+
+        return -1
+
+    def entry(self, position: int) -> Dict[str, str]:
+        start, end = self.text_offsets[position], self.text_offsets[position + 1]
+
+        return {
+            "code": self.codes[position].decode(),
+            "text": bytes(self.texts[start:end]).decode(),
+        }
+
+    def __getitem__(self, code: str) -> Dict[str, str]:
+        entry = self.decoded.get(code)
+        if entry is not None:
+            return entry
+
+        position = self.find(code)
+        if position < 0:
+            raise KeyError(code)
+
+        entry = self.decoded[code] = self.entry(position)
+
+        return entry
+
+    def __contains__(self, code: object) -> bool:
+        return code in self.decoded or self.find(code) >= 0
+
+    def values(self) -> List[Dict[str, str]]:
+        # Full scans, such as index builds, should not fill the decoded entries
+        return [self.entry(position) for position in range(len(self.codes))]
+
+    def items(self) -> List[Tuple[str, Dict[str, str]]]:
+        return [(entry["code"], entry) for entry in self.values()]
+
+    def __iter__(self) -> Iterator[str]:
+        return (code.decode() for code in self.codes)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+
+class LookupSnapshot:
+    """
+    A versioned snapshot file of the code-description lookup tables.
+
+    Every worker on a host maps the same file read-only, so the tables are
+    loaded once into the page cache instead of once per worker heap.
+    """
+
+    @classmethod
+    def from_buffer(cls, path: str, buffer: mmap.mmap) -> Optional["LookupSnapshot"]:
+        """
+        Read a mapped snapshot file.
+
+        Parameters:
+        path (str): The snapshot file path.
+        buffer (mmap.mmap): The mapped snapshot file.
+
+        Returns:
+        Optional[LookupSnapshot]: The snapshot, or None if of another format version.
+        """
+        magic, header_size = SNAPSHOT_PREFIX.unpack_from(buffer)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError("not a lookup snapshot")
+
+        header = json.loads(
+            buffer[SNAPSHOT_PREFIX.size:SNAPSHOT_PREFIX.size + header_size])
+        if header["version"] != SNAPSHOT_FORMAT_VERSION:
+            return None
+
+        return cls(path, header, buffer, SNAPSHOT_PREFIX.size + header_size)
+
+    def __init__(self, path: str, header: Dict, buffer: mmap.mmap, data_start: int):
+        """
+        Parameters:
+        path (str): The snapshot file path.
+        header (Dict): The snapshot header, with the layout of each table.
+        buffer (mmap.mmap): The mapped snapshot file.
+        data_start (int): The position of the first segment, past the header.
+        """
+        self.path = path
+        self.header = header
+        self.buffer = buffer
+        self.created_at = datetime.fromisoformat(header["created_at"])
+
+        view = memoryview(buffer)
+        self.tables: Dict[str, SnapshotTable] = {}
+        for name, layout in header["tables"].items():
+            codes_start = data_start + layout["codes"][0]
+            offsets_start = data_start + layout["text_offsets"][0]
+            texts_start, texts_size = layout["texts"]
+            texts_start += data_start
+
+            self.tables[name] = SnapshotTable(
+                np.frombuffer(
+                    buffer, dtype=f"S{layout['code_width']}",
+                    count=layout["count"], offset=codes_start),
+                np.frombuffer(
+                    buffer, dtype="<u4",
+                    count=layout["count"] + 1, offset=offsets_start),
+                view[texts_start:texts_start + texts_size],
+            )
+
+    @classmethod
+    def open(cls, path: str, max_age: timedelta) -> Optional["LookupSnapshot"]:
+        """
+        Map a snapshot file, if it exists, has the current format and is fresh.
+
+        Parameters:
+        path (str): The snapshot file path.
+        max_age (timedelta): The age after which the snapshot is stale.
+
+        Returns:
+        Optional[LookupSnapshot]: The snapshot, or None if missing or stale.
+        """
+        try:
+            with open(path, "rb") as file:
+                buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        try:
+            snapshot = cls.from_buffer(path, buffer)
+        except Exception as e:
+            logger.error(f"Error reading lookup snapshot {path}: {e}")
+            return None
+
+        if snapshot is None:
+            logger.info(f"Lookup snapshot {path} has another format version.")
+            return None
+
+        if datetime.now(timezone.utc) - snapshot.created_at > max_age:
+            logger.info(f"Lookup snapshot {path} is stale.")
+            return None
+
+        return snapshot
+
+    @staticmethod
+    def write(path: str, tables: Dict[str, List[Dict]]) -> None:
+        """
+        Write the tables to a snapshot file, atomically replacing any other.
+
+        Parameters:
+        path (str): The snapshot file path.
+        tables (Dict[str, List[Dict]]): The code-description entries of each table.
+        """
+        layouts, segments, size = {}, [], 0
+
+        def add_segment(data: bytes) -> List[int]:
+            nonlocal size
+            start = size
+            padding = -len(data) % SEGMENT_ALIGNMENT
+            segments.append(data + b"\x00" * padding)
+            size += len(data) + padding
+
+            return [start, len(data)]
+
+        for name, entries in tables.items():
+            entries = sorted(
+                (str(entry["code"]).encode(), str(entry["text"]).encode())
+                for entry in entries)
+            code_width = max((len(code) for code, _ in entries), default=1)
+            text_offsets = np.cumsum(
+                [0] + [len(text) for _, text in entries], dtype="<u4")
+
+            layouts[name] = {
+                "count": len(entries),
+                "code_width": code_width,
+                "codes": add_segment(
+                    np.array([code for code, _ in entries], dtype=f"S{code_width}").tobytes()),
+                "text_offsets": add_segment(text_offsets.tobytes()),
+                "texts": add_segment(b"".join(text for _, text in entries)),
+            }
+
+        header = {
+            "version": SNAPSHOT_FORMAT_VERSION,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "tables": layouts,
+        }
+        # Pad the header so that the segments start aligned
+        encoded_header = json.dumps(header).encode()
+        encoded_header = encoded_header.ljust(
+            len(encoded_header) + -(SNAPSHOT_PREFIX.size + len(encoded_header)) % SEGMENT_ALIGNMENT)
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=directory)
+        try:
+            with os.fdopen(file_descriptor, "wb") as file:
+                file.write(SNAPSHOT_PREFIX.pack(SNAPSHOT_MAGIC, len(encoded_header)))
+                file.write(encoded_header)
+                file.writelines(segments)
+            os.chmod(temporary_path, 0o644)
+            os.replace(temporary_path, path)
+        except BaseException:
+            os.unlink(temporary_path)
+            raise
@@ -0,0 +1,130 @@
+import re
+from hashlib import md5
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Result
+from sqlalchemy.exc import ProgrammingError
+from sqlalchemy.orm import Session
+
+from backend.app.setup.config import settings
+
+# Same named-bind syntax as sqlalchemy's text(), which skips '::' casts
+BIND_PARAM_PATTERN = re.compile(r"(?<![:\w\x5c]):(\w+)(?!:)")
+
+# Key on the pooled DBAPI connection info, cleared when it is replaced
+PREPARED_STATEMENTS_KEY = "prepared_statements"
+
+# SQLSTATE duplicate_prepared_statement
+DUPLICATE_PREPARED_STATEMENT = "42P05"
+
+
+class Statement:
+    """
+    A parameterized SQL statement.
+
+    The SQL text depends on the statement shape only, never on bound values,
+    so the server parses and plans it once per connection through
+    PREPARE/EXECUTE instead of once per request.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        sql: str,
+        param_types: Optional[Dict[str, str]] = None,
+        prepare: bool = True,
+    ):
+        """
+        Parameters:
+        name (str): The prepared statement name, unique per statement shape.
+        sql (str): The SQL with ':name' binds.
+        param_types (Dict[str, str]): The Postgres type of each bind, in order.
+        prepare (bool): Whether the statement is prepared on the server.
+        """
+        self.name = name
+        self.sql = sql
+        self.param_types = param_types or {}
+        self.prepare = prepare
+
+        positions = {
+            param: f"${index}"
+            for index, param in enumerate(self.param_types, start=1)
+        }
+        positional_sql = BIND_PARAM_PATTERN.sub(
+            lambda match: positions[match.group(1)], sql
+        )
+        types_str = ", ".join(self.param_types.values())
+        types_str = f"({types_str})" if types_str else ""
+        binds_str = ", ".join(f":{param}" for param in self.param_types)
+        binds_str = f"({binds_str})" if binds_str else ""
+
+        self.query = text(sql)
+        self.prepare_query = text(f"prepare {name} {types_str} as {positional_sql}")
+        self.execute_query = text(f"execute {name} {binds_str}")
+
+    def __repr__(self) -> str:
+        return f"<Statement(name={self.name})>"
+
+
+# Statements built so far, keyed by name
+statements: Dict[str, Statement] = {}
+
+
+def get_statement(
+    prefix: str, sql: str, param_types: Optional[Dict[str, str]] = None
+) -> Statement:
+    """
+    Get the statement for a SQL shape, building it on first use.
+
+    Parameters:
+    prefix (str): The statement name prefix, usually the repository method.
+    sql (str): The SQL with ':name' binds.
+    param_types (Dict[str, str]): The Postgres type of each bind.
+
+    Returns:
+    Statement: The cached statement, named after the prefix and a SQL digest.
+    """
+    param_types = param_types or {}
+    digest = md5(f"{sql}{param_types}".encode("utf8")).hexdigest()[:12]
+    name = f"{prefix}_{digest}"
+
+    if name not in statements:
+        statements[name] = Statement(name, sql, param_types)
+
+    return statements[name]
+
+
+def execute_statement(
+    session: Session, statement: Statement, params: Optional[Dict[str, Any]] = None
+) -> Result:
+    """
+    Execute a statement, preparing it on the session connection if needed.
+
+    Parameters:
+    session (Session): The database session.
+    statement (Statement): The statement to execute.
+    params (Dict[str, Any]): The bound values.
+
+    Returns:
+    Result: The execution result.
+    """
+    params = params or {}
+
+    if not (statement.prepare and settings.POSTGRES_PREPARED_STATEMENTS):
+        return session.execute(statement.query, params)
+
+    connection = session.connection()
+    prepared = connection.connection.info.setdefault(PREPARED_STATEMENTS_KEY, set())
+
+    if statement.name not in prepared:
+        try:
+            connection.execute(statement.prepare_query)
+        except ProgrammingError as e:
+            # Prepared by a previous owner of the same server connection
+            if getattr(e.orig, "pgcode", None) != DUPLICATE_PREPARED_STATEMENT:
+                raise
+
+        prepared.add(statement.name)
+
+    return session.execute(statement.execute_query, params)
@@ -1,13 +1,18 @@
-from typing import Union, Dict
+from typing import Union, Dict, Optional
 
-from fastapi import APIRouter, Request, Depends
+from fastapi import APIRouter, Request, Response, Depends
 
 from backend.app.api.services.cnpj import CNPJService, CNPJServiceDependency
 from backend.app.rate_limiter import rate_limit
 from backend.app.api.dependencies.auth import JWTDependency
 from backend.app.api.models.base import BatchModel
 from backend.app.api.models.cnpj import CNPJBatch, CNPJQueryParams
-from backend.app.api.models.misc import LimitOffsetParams, PaginatedLimitOffsetParams
+from backend.app.api.models.misc import (
+    LimitOffsetParams,
+    PaginatedLimitOffsetParams,
+    CursorLimitOffsetParams,
+)
+from backend.app.api.constants import NEXT_CURSOR_HEADER
 
 # Types
 CodeType = Union[str, int]
@@ -15,6 +20,12 @@ CodeType = Union[str, int]
 router = APIRouter(tags=["CNPJ"], dependencies=[JWTDependency])
 
 
+def set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    """Exposes the cursor of the next page, if any, on the response headers."""
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+
 @rate_limit()
 @router.get("/cnaes")
 def get_cnaes(
@@ -60,10 +71,11 @@ def get_cnae_objects(
 
 @rate_limit()
 @router.post("/cnaes/cnpjs")
-def get_cnpjs_by_cnaes(
+async def get_cnpjs_by_cnaes(
     request: Request,
+    response: Response,
     cnae_batch: BatchModel,
-    query_params: PaginatedLimitOffsetParams = Depends(),
+    query_params: CursorLimitOffsetParams = Depends(),
     cnpj_service: CNPJService = CNPJServiceDependency,
 ):
     """
@@ -73,11 +85,16 @@ def get_cnpjs_by_cnaes(
     - cnae_code: The CNAE code to search for.
     - limit: The maximum number of establishments to return.
     - offset: The number of establishments to skip.
+    - cursor: The cursor of the previous page, from header X-Next-Cursor.
 
     Returns:
     - A list of establishments as dictionaries.
     """
-    return cnpj_service.get_cnpjs_by_cnaes(cnae_batch, query_params)
+    establishments, next_cursor = await cnpj_service.get_cnpjs_by_cnaes(
+        cnae_batch, query_params)
+    set_next_cursor(response, next_cursor)
+
+    return establishments
 
 
 @rate_limit()
@@ -101,10 +118,11 @@ def get_cnae_description(
 
 @rate_limit()
 @router.get("/cnae/{cnae_code}/cnpjs")
-def get_cnpjs_with_cnae(
+async def get_cnpjs_with_cnae(
     request: Request,
+    response: Response,
     cnae_code: CodeType,
-    query_params: PaginatedLimitOffsetParams = Depends(),
+    query_params: CursorLimitOffsetParams = Depends(),
     cnpj_service: CNPJService = CNPJServiceDependency,
 ):
     """
@@ -114,19 +132,25 @@ def get_cnpjs_with_cnae(
     - cnae_code: The CNAE code to search for.
     - limit: The maximum number of establishments to return.
     - offset: The number of establishments to skip.
+    - cursor: The cursor of the previous page, from header X-Next-Cursor.
 
     Returns:
     - A list of establishments as dictionaries.
     """
-    return cnpj_service.get_cnpjs_with_cnae(cnae_code, query_params)
+    establishments, next_cursor = await cnpj_service.get_cnpjs_with_cnae(
+        cnae_code, query_params)
+    set_next_cursor(response, next_cursor)
+
+    return establishments
 
 
 @rate_limit()
 @router.post("/states/cnpjs")
-def get_cnpjs_by_state(
+async def get_cnpjs_by_state(
     request: Request,
+    response: Response,
     state_batch: BatchModel,
-    query_params: LimitOffsetParams = Depends(),
+    query_params: CursorLimitOffsetParams = Depends(),
     cnpj_service: CNPJService = CNPJServiceDependency,
 ):
     """
@@ -136,13 +160,17 @@ def get_cnpjs_by_state(
     - state_code: The state code to search for.
     - limit: The maximum number of establishments to return.
     - offset: The number of establishments to skip.
+    - cursor: The cursor of the previous page, from header X-Next-Cursor.
 
     Returns:
     - A list of establishments as dictionaries.
     """
-    return cnpj_service.get_cnpjs_by_states(
-        state_batch, query_params.limit, query_params.offset
+    establishments, next_cursor = await cnpj_service.get_cnpjs_by_states(
+        state_batch, query_params.limit, query_params.offset, query_params.cursor
     )
+    set_next_cursor(response, next_cursor)
+
+    return establishments
 
 
 @rate_limit()
@@ -364,7 +392,7 @@ def get_registration_statuses_list(
 
 @rate_limit()
 @router.get("/cnpj/{cnpj}")
-def get_cnpj_info(
+async def get_cnpj_info(
     request: Request,
     cnpj: str,
     cnpj_service: CNPJService = CNPJServiceDependency,
@@ -378,12 +406,12 @@ def get_cnpj_info(
     Returns:
     - A dictionary with information about the CNPJ.
     """
-    return cnpj_service.get_cnpj_info(cnpj)
+    return await cnpj_service.get_cnpj_info(cnpj)
 
 
 @rate_limit()
 @router.get("/cnpj/{cnpj}/activities")
-def get_cnpj_activities(
+async def get_cnpj_activities(
     request: Request,
     cnpj: str,
     cnpj_service: CNPJService = CNPJServiceDependency,
@@ -397,12 +425,12 @@ def get_cnpj_activities(
     Returns:
     - A list of activities associated with the CNPJ.
     """
-    return cnpj_service.get_cnpj_activities(cnpj)
+    return await cnpj_service.get_cnpj_activities(cnpj)
 
 
 @rate_limit()
 @router.get("/cnpj/{cnpj}/partners")
-def get_cnpj_partners(
+async def get_cnpj_partners(
     request: Request,
     cnpj: str,
     cnpj_service: CNPJService = CNPJServiceDependency,
@@ -416,12 +444,12 @@ def get_cnpj_partners(
     Returns:
     - A list of partners associated with the CNPJ.
     """
-    return cnpj_service.get_cnpj_partners(cnpj)
+    return await cnpj_service.get_cnpj_partners(cnpj)
 
 
 @rate_limit()
 @router.get("/cnpj/{cnpj}/simples-simei")
-def get_cnpj_simples_simei(
+async def get_cnpj_simples_simei(
     request: Request,
     cnpj: str,
     cnpj_service: CNPJService = CNPJServiceDependency,
@@ -435,12 +463,12 @@ def get_cnpj_simples_simei(
     Returns:
     - A list of partners associated with the CNPJ.
     """
-    return cnpj_service.get_cnpj_simples_simei(cnpj)
+    return await cnpj_service.get_cnpj_simples_simei(cnpj)
 
 
 @rate_limit()
 @router.get("/cnpj/{cnpj}/company")
-def get_cnpj_company(
+async def get_cnpj_company(
     request: Request,
     cnpj: str,
     cnpj_service: CNPJService = CNPJServiceDependency,
@@ -454,12 +482,12 @@ def get_cnpj_company(
     Returns:
     - A dictionary with information about the company.
     """
-    return cnpj_service.get_cnpj_company(cnpj)
+    return await cnpj_service.get_cnpj_company(cnpj)
 
 
 @rate_limit()
 @router.get("/cnpj/{cnpj}/establishment")
-def get_cnpj_establishment(
+async def get_cnpj_establishment(
     request: Request,
     cnpj: str,
     cnpj_service: CNPJService = CNPJServiceDependency,
@@ -473,12 +501,12 @@ def get_cnpj_establishment(
     Returns:
     - A dictionary with information about the establishment.
     """
-    return cnpj_service.get_cnpj_establishment(cnpj)
+    return await cnpj_service.get_cnpj_establishment(cnpj)
 
 
 @rate_limit()
 @router.get("/cnpj/{cnpj}/establishments")
-def get_cnpj_establishments(
+async def get_cnpj_establishments(
     request: Request,
     cnpj: str,
     cnpj_service: CNPJService = CNPJServiceDependency,
@@ -493,13 +521,14 @@ def get_cnpj_establishments(
     Returns:
     - A list of establishments associated with the CNPJ.
     """
-    return cnpj_service.get_cnpj_establishments(cnpj)
+    return await cnpj_service.get_cnpj_establishments(cnpj)
 
 
 @rate_limit()
 @router.get("/cnpjs")
-def get_cnpjs(
+async def get_cnpjs(
     request: Request,
+    response: Response,
     query_params: CNPJQueryParams = Depends(),
     cnpj_service: CNPJService = CNPJServiceDependency,
 ):
@@ -508,16 +537,20 @@ def get_cnpjs(
 
     Parameters:
     - limit: The maximum number of CNPJs to return.
+    - cursor: The cursor of the previous page, from header X-Next-Cursor.
 
     Returns:
     - A list of CNPJs as dictionaries.
     """
-    return cnpj_service.get_cnpjs(query_params)
+    cnpjs, next_cursor = await cnpj_service.get_cnpjs(query_params)
+    set_next_cursor(response, next_cursor)
+
+    return cnpjs
 
 
 @rate_limit()
 @router.post("/cnpjs")
-def get_cnpjs_info(
+async def get_cnpjs_info(
     request: Request,
     cnpj_batch: BatchModel,
     cnpj_service: CNPJService = CNPJServiceDependency,
@@ -531,12 +564,12 @@ def get_cnpjs_info(
     Returns:
     - A list of CNPJs as dictionaries.
     """
-    return cnpj_service.get_cnpjs_info(cnpj_batch)
+    return await cnpj_service.get_cnpjs_info(cnpj_batch)
 
 
 @rate_limit()
 @router.post("/cnpjs/partners")
-def get_cnpjs_partners(
+async def get_cnpjs_partners(
     request: Request,
     cnpj_batch: CNPJBatch,
     cnpj_service: CNPJService = CNPJServiceDependency,
@@ -550,12 +583,12 @@ def get_cnpjs_partners(
     Returns:
     - A list of CNPJs as dictionaries.
     """
-    return cnpj_service.get_cnpjs_partners(cnpj_batch)
+    return await cnpj_service.get_cnpjs_partners(cnpj_batch)
 
 
 @rate_limit()
 @router.post("/cnpjs/company")
-def get_cnpjs_company(
+async def get_cnpjs_company(
     request: Request,
     cnpj_batch: CNPJBatch,
     cnpj_service: CNPJService = CNPJServiceDependency,
@@ -569,12 +602,12 @@ def get_cnpjs_company(
     Returns:
     - A list of CNPJs as dictionaries.
     """
-    return cnpj_service.get_cnpjs_company(cnpj_batch)
+    return await cnpj_service.get_cnpjs_company(cnpj_batch)
 
 
 @rate_limit()
 @router.post("/cnpjs/establishment")
-def get_cnpjs_establishment(
+async def get_cnpjs_establishment(
     request: Request,
     cnpj_batch: CNPJBatch,
     cnpj_service: CNPJService = CNPJServiceDependency,
@@ -588,12 +621,12 @@ def get_cnpjs_establishment(
     Returns:
     - A list of CNPJs as dictionaries.
     """
-    return cnpj_service.get_cnpjs_establishment(cnpj_batch)
+    return await cnpj_service.get_cnpjs_establishment(cnpj_batch)
 
 
 @rate_limit()
 @router.post("/cnpjs/simples-simei")
-def get_cnpjs_simples_simei(
+async def get_cnpjs_simples_simei(
     request: Request,
     cnpj_batch: CNPJBatch,
     cnpj_service: CNPJService = CNPJServiceDependency,
@@ -605,4 +638,4 @@ def get_cnpjs_simples_simei(
     Returns:
     - A list of CNPJs as dictionaries.
     """
-    return cnpj_service.get_cnpjs_simples_simei(cnpj_batch)
+    return await cnpj_service.get_cnpjs_simples_simei(cnpj_batch)
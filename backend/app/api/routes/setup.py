@@ -2,11 +2,17 @@
 
 import toml
 import os
+from typing import Dict, List, Optional
+
 from fastapi import APIRouter, Request, HTTPException
 from pydantic import BaseModel
 
 from backend.app.api.dependencies.auth import JWTDependency
+from backend.app.api.repositories.cache import cnpj_info_cache
+from backend.app.api.utils.metrics import request_latencies
+from backend.app.database.base import multi_database
 from backend.app.rate_limiter import rate_limit
+from backend.app.scheduler.bundler import task_orchestrator
 
 router = APIRouter(tags=["Setup"], dependencies=[JWTDependency])
 
@@ -15,6 +21,63 @@ class HealthCheckResponse(BaseModel):
     status: str
 
 
+class CacheStatsResponse(BaseModel):
+    name: str
+    release: Optional[str]
+    size: int
+    max_size: int
+    local_hits: int
+    shared_hits: int
+    misses: int
+    evictions: int
+    releases: int
+
+
+class LatencyStatsResponse(BaseModel):
+    method: str
+    route: str
+    count: int
+    sum_seconds: float
+    p50_seconds: float
+    p90_seconds: float
+    p99_seconds: float
+    max_seconds: float
+
+
+class HistogramSummaryResponse(BaseModel):
+    count: int
+    sum_seconds: float
+    p50_seconds: float
+    p90_seconds: float
+    p99_seconds: float
+    max_seconds: float
+
+
+class TaskRunStatsResponse(BaseModel):
+    task_name: str
+    max_concurrency: int
+    queued: int
+    running: int
+    succeeded: int
+    failed: int
+    rejected: int
+    queue_wait: HistogramSummaryResponse
+    run_time: HistogramSummaryResponse
+
+
+class PoolResponse(BaseModel):
+    size: int
+    checked_out: int
+    idle: int
+    overflow: int
+
+
+class PoolStatsResponse(BaseModel):
+    database: str
+    pools: Dict[str, PoolResponse]
+    checkout_wait: HistogramSummaryResponse
+
+
 class InfoResponse(BaseModel):
     name: str
     version: str
@@ -55,3 +118,51 @@ async def info(request: Request) -> InfoResponse:
     except toml.TomlDecodeError:
         raise HTTPException(status_code=500,
                             detail="Error decoding configuration file")
+
+
+@rate_limit()
+@router.get("/cache", response_model=CacheStatsResponse)
+async def cache_stats(request: Request) -> CacheStatsResponse:
+    """
+    Endpoint to retrieve the counters of the CNPJ information cache.
+    """
+    return CacheStatsResponse(**cnpj_info_cache.stats())
+
+
+@rate_limit()
+@router.get("/latencies", response_model=List[LatencyStatsResponse])
+async def latency_stats(request: Request) -> List[LatencyStatsResponse]:
+    """
+    Endpoint to retrieve the request latency histograms of this process, per
+    method and route, slowest tail first.
+    """
+    return [
+        LatencyStatsResponse(**summary)
+        for summary in request_latencies.summaries()
+    ]
+
+
+@rate_limit()
+@router.get("/task-runs", response_model=List[TaskRunStatsResponse])
+async def task_run_stats(request: Request) -> List[TaskRunStatsResponse]:
+    """
+    Endpoint to retrieve the queue depth, outcomes and timings of the
+    scheduled task runs of this process.
+    """
+    return [
+        TaskRunStatsResponse(**summary)
+        for summary in task_orchestrator.runner.summaries()
+    ]
+
+
+@rate_limit()
+@router.get("/pools", response_model=List[PoolStatsResponse])
+async def pool_stats(request: Request) -> List[PoolStatsResponse]:
+    """
+    Endpoint to retrieve the connection pools of this process and the
+    time the requests waited for their connection.
+    """
+    return [
+        PoolStatsResponse(**stats)
+        for stats in multi_database.pool_stats()
+    ]
@@ -1,17 +1,20 @@
-from typing import Union
+from typing import Union, Optional, List
 
 from fastapi import HTTPException, Depends
 
 from backend.app.setup.config import settings
 from backend.app.setup.logging import logger
 from backend.app.api.dependencies.cnpj import CNPJRepositoryDependency
-from backend.app.api.repositories.cnpj import CNPJRepository
+from backend.app.api.repositories.cnpj import AsyncCNPJRepository
 from backend.app.utils.misc import is_number, are_numbers
-from backend.app.api.utils.cnpj import are_cnpj_str_valid
+from backend.app.api.utils.cnpj import CNPJArrays, parse_cnpj_strs
 from backend.app.api.utils.cnpj import parse_cnpj_str, format_cnpj
 from backend.app.api.models.cnpj import CNPJ, CNPJQueryParams, CNPJBatch
 from backend.app.api.models.base import BatchModel
-from backend.app.api.models.misc import PaginatedLimitOffsetParams
+from backend.app.api.models.misc import (
+    PaginatedLimitOffsetParams,
+    CursorLimitOffsetParams,
+)
 from backend.app.api.constants import STATES_BRAZIL
 
 # Types
@@ -33,13 +36,55 @@ def cnpj_str_to_obj(cnpj_str: str):
     return CNPJ(*cnpj_list)
 
 
+def cnpj_arrays_to_objs(cnpj_arrays: CNPJArrays) -> List[CNPJ]:
+    """
+    Converts the valid CNPJs of a parsed batch to CNPJ objects.
+
+    Args:
+        cnpj_arrays (CNPJArrays): The parsed CNPJ batch.
+
+    Returns:
+        List[CNPJ]: The CNPJ objects, in batch order.
+    """
+    is_valid = cnpj_arrays.is_valid
+
+    return list(map(
+        CNPJ,
+        cnpj_arrays.basicos[is_valid].tolist(),
+        cnpj_arrays.ordens[is_valid].tolist(),
+        cnpj_arrays.digitos_verificadores[is_valid].tolist(),
+    ))
+
+
+def cnpj_strs_to_objs(cnpj_strs: List[str]) -> List[CNPJ]:
+    """
+    Converts a batch of CNPJ strings to CNPJ objects.
+
+    Args:
+        cnpj_strs (List[str]): The CNPJ strings to convert.
+
+    Returns:
+        List[CNPJ]: The CNPJ objects.
+
+    Raises:
+        ValueError: The reason of the first invalid CNPJ.
+    """
+    cnpj_arrays = parse_cnpj_strs(cnpj_strs)
+
+    if not cnpj_arrays.is_valid.all():
+        first_invalid = cnpj_arrays.is_valid.argmin()
+        raise ValueError(str(cnpj_arrays.reasons[first_invalid]))
+
+    return cnpj_arrays_to_objs(cnpj_arrays)
+
+
 # Types
 CodeType = Union[str, int]
 
 
 class CNPJService:
-    def __init__(self, cnpj_repository: CNPJRepository):
-        self.repository: CNPJRepository = cnpj_repository
+    def __init__(self, cnpj_repository: AsyncCNPJRepository):
+        self.repository: AsyncCNPJRepository = cnpj_repository
 
     def get_cnaes(self, query_params: PaginatedLimitOffsetParams):
         """
@@ -135,8 +180,8 @@ class CNPJService:
             logger.error(f"Error getting CNAEs: {e}")
             raise HTTPException(status_code=400, detail=str(e)) from e
 
-    def get_cnpjs_with_cnae(
-        self, cnae_code: CodeType, query_params: PaginatedLimitOffsetParams
+    async def get_cnpjs_with_cnae(
+        self, cnae_code: CodeType, query_params: CursorLimitOffsetParams
     ):
         """
         Get a list of establishments with a given CNAE code.
@@ -145,9 +190,10 @@ class CNPJService:
         - cnae_code: The CNAE code to search for.
         - limit: The maximum number of establishments to return.
         - offset: The number of establishments to skip.
+        - cursor: The cursor of the previous page.
 
         Returns:
-        - A list of establishments as dictionaries.
+        - A list of establishments as dictionaries and the next page cursor.
         """
         try:
             if not is_number(cnae_code):
@@ -159,7 +205,7 @@ class CNPJService:
                 raise ValueError(f"There isn't CNAE code {cnae_code}.")
 
             cnae_code_list = [cnae_code]
-            cnpjs = self.repository.get_cnpjs_by_cnaes(
+            cnpjs, next_cursor = await self.repository.get_cnpjs_by_cnaes(
                 cnae_code_list, query_params)
 
         except Exception as e:
@@ -168,14 +214,14 @@ class CNPJService:
 
         if len(cnpjs) == 0:
             return {
-                "message": f"There are no establishents with CNAE code {cnae_code}."}
+                "message": f"There are no establishents with CNAE code {cnae_code}."}, None
 
-        return cnpjs
+        return cnpjs, next_cursor
 
-    def get_cnpjs_by_cnaes(
+    async def get_cnpjs_by_cnaes(
             self,
             cnae_batch: BatchModel,
-            query_params: PaginatedLimitOffsetParams):
+            query_params: CursorLimitOffsetParams):
         """
         Get a list of establishments with the specified CNAE codes.
 
@@ -183,9 +229,10 @@ class CNPJService:
         - cnae_batch: The batch of CNAE codes to search for.
         - limit: The maximum number of establishments to return.
         - offset: The number of establishments to skip.
+        - cursor: The cursor of the previous page.
 
         Returns:
-        - A list of establishments as dictionaries.
+        - A list of establishments as dictionaries and the next page cursor.
         """
         print(':)')
         try:
@@ -199,7 +246,7 @@ class CNPJService:
                 not_numbers = list(filter(not_number_map, cnae_list))
                 raise ValueError(f"CNAE codes {not_numbers} are not numbers.")
 
-            establishments = self.repository.get_cnpjs_by_cnaes(
+            establishments, next_cursor = await self.repository.get_cnpjs_by_cnaes(
                 cnae_list, query_params)
 
         except Exception as e:
@@ -208,9 +255,9 @@ class CNPJService:
 
         if len(establishments) == 0:
             return {
-                "message": f"There are no establishments with CNAE codes {cnae_list}."}
+                "message": f"There are no establishments with CNAE codes {cnae_list}."}, None
 
-        return establishments
+        return establishments, next_cursor
 
     def get_city_candidates(self, city_names: BatchModel):
         """
@@ -234,19 +281,23 @@ class CNPJService:
             logger.error(f"Error getting city candidates: {e}")
             raise HTTPException(status_code=400, detail=str(e)) from e
 
-    def get_cnpjs_by_states(
+    async def get_cnpjs_by_states(
             self,
             state_batch: BatchModel,
             limit: int = settings.PAGE_SIZE,
-            offset: int = 0):
+            offset: int = 0,
+            cursor: Optional[str] = None):
         """
         Get a list of establishments in the specified states.
 
         Parameters:
         - state_batch: The batch of states to search for.
+        - limit: The maximum number of establishments to return.
+        - offset: The number of establishments to skip.
+        - cursor: The cursor of the previous page.
 
         Returns:
-        - A list of establishments as dictionaries.
+        - A list of establishments as dictionaries and the next page cursor.
         """
         try:
             states = list(set(map(str.upper, state_batch.batch)))
@@ -255,8 +306,8 @@ class CNPJService:
             if invalid_states:
                 raise ValueError(f"Invalid states: {invalid_states}")
 
-            cnpjs_info = self.repository.get_cnpjs_by_states(
-                states, limit=limit, offset=offset
+            cnpjs_info, next_cursor = await self.repository.get_cnpjs_by_states(
+                states, limit=limit, offset=offset, cursor=cursor
             )
 
         except Exception as e:
@@ -264,9 +315,9 @@ class CNPJService:
             raise HTTPException(status_code=400, detail=str(e)) from e
 
         if len(cnpjs_info) == 0:
-            return {"message": f"There are no cnpjs in states {states}."}
+            return {"message": f"There are no cnpjs in states {states}."}, None
 
-        return cnpjs_info
+        return cnpjs_info, next_cursor
 
     def get_city(self, city_code: CodeType):
         """
@@ -541,7 +592,7 @@ class CNPJService:
             logger.error(f"Error getting registration statuses: {e}")
             raise HTTPException(status_code=400, detail=str(e)) from e
 
-    def get_cnpj_activities(self, cnpj: str):
+    async def get_cnpj_activities(self, cnpj: str):
         """
         Get the activities of a CNPJ number.
 
@@ -558,7 +609,7 @@ class CNPJService:
                 )
 
             cnpj_obj = cnpj_str_to_obj(cnpj)
-            activities = self.repository.get_cnpj_activities(cnpj_obj)
+            activities = await self.repository.get_cnpj_activities(cnpj_obj)
 
         except Exception as e:
             logger.error(f"Error getting CNPJ activities: {e}")
@@ -570,7 +621,7 @@ class CNPJService:
 
         return activities
 
-    def get_cnpj_partners(self, cnpj: str):
+    async def get_cnpj_partners(self, cnpj: str):
         """
         Get the partners of a CNPJ number.
 
@@ -588,7 +639,7 @@ class CNPJService:
 
             cnpj_obj = cnpj_str_to_obj(cnpj)
             cnpj_list = [cnpj_obj]
-            cnpj_info = self.repository.get_cnpjs_partners(cnpj_list)
+            cnpj_info = await self.repository.get_cnpjs_partners(cnpj_list)
 
         except Exception as e:
             logger.error(f"Error getting CNPJ partners: {e}")
@@ -601,7 +652,7 @@ class CNPJService:
 
         return cnpj_info[cnpj_obj.to_raw()]
 
-    def get_cnpj_simples_simei(self, cnpj: str):
+    async def get_cnpj_simples_simei(self, cnpj: str):
         """
         Get the partners of a CNPJ number.
 
@@ -620,7 +671,7 @@ class CNPJService:
             cnpj_obj = cnpj_str_to_obj(cnpj)
             cnpj_list = [cnpj_obj]
 
-            cnpj_info = self.repository.get_cnpjs_simples_simei(cnpj_list)
+            cnpj_info = await self.repository.get_cnpjs_simples_simei(cnpj_list)
 
         except Exception as e:
             logger.error(f"Error getting CNPJ Simples and SIMEI: {e}")
@@ -634,7 +685,7 @@ class CNPJService:
 
         return cnpj_info[cnpj_obj.to_raw()]
 
-    def get_cnpj_company(self, cnpj: str):
+    async def get_cnpj_company(self, cnpj: str):
         """
         Get the company associated with a CNPJ number.
 
@@ -653,7 +704,7 @@ class CNPJService:
             cnpj_obj = cnpj_str_to_obj(cnpj)
             cnpj_list = [cnpj_obj]
 
-            company_info = self.repository.get_cnpjs_company(cnpj_list)
+            company_info = await self.repository.get_cnpjs_company(cnpj_list)
 
         except Exception as e:
             logger.error(f"Error getting CNPJ company: {e}")
@@ -665,7 +716,7 @@ class CNPJService:
 
         return company_info[cnpj_obj.to_raw()]
 
-    def get_cnpj_establishment(self, cnpj: str):
+    async def get_cnpj_establishment(self, cnpj: str):
         """
         Get the establishment associated with a CNPJ number.
 
@@ -685,7 +736,7 @@ class CNPJService:
             cnpj_obj = cnpj_str_to_obj(cnpj)
             cnpjs = [cnpj_obj]
 
-            est_info = self.repository.get_cnpjs_establishment(cnpjs)
+            est_info = await self.repository.get_cnpjs_establishment(cnpjs)
 
         except Exception as e:
             logger.error(f"Error getting CNPJ establishment: {e}")
@@ -701,7 +752,7 @@ class CNPJService:
 
         return est_info[cnpj]
 
-    def get_cnpj_establishments(self, cnpj: str):
+    async def get_cnpj_establishments(self, cnpj: str):
         """
         Get the establishments associated with a CNPJ base (First 8 digits).
         You must provide any full CNPJ number.
@@ -721,7 +772,7 @@ class CNPJService:
             cnpj_obj = cnpj_str_to_obj(cnpj)
             cnpj_base = cnpj_obj.basico_str
 
-            est_info = self.repository.get_cnpj_establishments(cnpj_obj)
+            est_info = await self.repository.get_cnpj_establishments(cnpj_obj)
 
         except Exception as e:
             logger.error(f"Error getting CNPJ establishments: {e}")
@@ -734,10 +785,10 @@ class CNPJService:
         return est_info
 
     # Helper Methods
-    def _validate_city(self, city_name: str) -> str:
+    async def _validate_city(self, city_name: str) -> str:
         """Validate and get the city code for a given city name."""
         if city_name:
-            has_city, city_obj = self.repository.city_exists(city_name)
+            has_city, city_obj = await self.repository.city_exists(city_name)
             if not has_city:
                 raise ValueError(f"City {city_name} not found.")
             return city_obj["code"]
@@ -781,9 +832,9 @@ class CNPJService:
                 raise ValueError(f"Invalid Zipcode {zipcode}.")
         return ""
 
-    def validate_cnpj_query_params(self, query_params: CNPJQueryParams):
+    async def validate_cnpj_query_params(self, query_params: CNPJQueryParams):
         # Validate inputs
-        query_params.city_name = self._validate_city(query_params.city_name)
+        query_params.city_name = await self._validate_city(query_params.city_name)
 
         self._validate_state(query_params.state_abbrev)
         query_params.cnae_code = self._validate_cnae(query_params.cnae_code)
@@ -791,34 +842,35 @@ class CNPJService:
 
         return query_params
 
-    def _process_cnpjs(self, cnpjs_raw_list: list) -> dict:
+    async def _process_cnpjs(self, cnpjs_raw_list: list) -> dict:
         """Convert raw CNPJs to objects and fetch additional info if available."""
-        cnpj_objs = list(map(cnpj_str_to_obj, cnpjs_raw_list))
+        cnpj_objs = cnpj_strs_to_objs(cnpjs_raw_list)
         if cnpj_objs:
-            return self.repository.get_cnpjs_info(cnpj_objs)
+            return await self.repository.get_cnpjs_info(cnpj_objs)
         return {}
 
-    def get_cnpjs(self, query_params: CNPJQueryParams):
+    async def get_cnpjs(self, query_params: CNPJQueryParams):
         """
         Get a list of CNPJs from the database.
 
         Parameters:
-        - cnpj_batch: The batch of CNPJs to search for.
+        - query_params: The filters and the page to search for.
 
         Returns:
-        - A list of CNPJs as dictionaries.
+        - A list of CNPJs as dictionaries and the next page cursor.
         """
 
         try:
-            query_params = self.validate_cnpj_query_params(query_params)
-            cnpjs_raw_list = self.repository.get_cnpjs_raw(query_params)
-            return self._process_cnpjs(cnpjs_raw_list)
+            query_params = await self.validate_cnpj_query_params(query_params)
+            cnpjs_raw_list, next_cursor = await self.repository.get_cnpjs_raw(
+                query_params)
+            return await self._process_cnpjs(cnpjs_raw_list), next_cursor
 
         except Exception as e:
             logger.error(f"Error getting CNPJs: {e}")
             raise HTTPException(status_code=400, detail=str(e)) from e
 
-    def get_cnpjs_partners(self, cnpj_batch: CNPJBatch):
+    async def get_cnpjs_partners(self, cnpj_batch: CNPJBatch):
         """
         Get a list of CNPJ partners information from the database.
 
@@ -830,15 +882,15 @@ class CNPJService:
         """
         try:
 
-            cnpj_objs = set(map(cnpj_str_to_obj, cnpj_batch.batch))
+            cnpj_objs = set(cnpj_strs_to_objs(cnpj_batch.batch))
 
-            return self.repository.get_cnpjs_partners(cnpj_objs)
+            return await self.repository.get_cnpjs_partners(cnpj_objs)
 
         except Exception as e:
             logger.error(f"Error getting CNPJ partners: {e}")
             raise HTTPException(status_code=400, detail=str(e)) from e
 
-    def get_cnpjs_simples_simei(self, cnpj_batch: CNPJBatch):
+    async def get_cnpjs_simples_simei(self, cnpj_batch: CNPJBatch):
         """
         Get a list of CNPJ partners information from the database.
 
@@ -850,15 +902,15 @@ class CNPJService:
         """
         try:
 
-            cnpj_objs = set(map(cnpj_str_to_obj, cnpj_batch.batch))
+            cnpj_objs = set(cnpj_strs_to_objs(cnpj_batch.batch))
 
-            return self.repository.get_cnpjs_simples_simei(cnpj_objs)
+            return await self.repository.get_cnpjs_simples_simei(cnpj_objs)
 
         except Exception as e:
             logger.error(f"Error getting CNPJ Simples and SIMEI: {e}")
             raise HTTPException(status_code=400, detail=str(e)) from e
 
-    def get_cnpjs_company(self, cnpj_batch: CNPJBatch):
+    async def get_cnpjs_company(self, cnpj_batch: CNPJBatch):
         """
         Get a list of CNPJ partners information from the database.
 
@@ -869,15 +921,15 @@ class CNPJService:
         - A list of CNPJs as dictionaries.
         """
         try:
-            cnpj_objs = set(map(cnpj_str_to_obj, cnpj_batch.batch))
+            cnpj_objs = set(cnpj_strs_to_objs(cnpj_batch.batch))
 
-            return self.repository.get_cnpjs_company(cnpj_objs)
+            return await self.repository.get_cnpjs_company(cnpj_objs)
 
         except Exception as e:
             logger.error(f"Error getting CNPJ company: {e}")
             raise HTTPException(status_code=400, detail=str(e)) from e
 
-    def get_cnpjs_establishment(self, cnpj_batch: CNPJBatch):
+    async def get_cnpjs_establishment(self, cnpj_batch: CNPJBatch):
         """
         Get a list of CNPJ partners information from the database.
 
@@ -888,8 +940,8 @@ class CNPJService:
         - A list of CNPJs as dictionaries.
         """
         try:
-            cnpj_objs = list(map(cnpj_str_to_obj, cnpj_batch.batch))
-            est_objs = self.repository.get_cnpjs_establishment(cnpj_objs)
+            cnpj_objs = cnpj_strs_to_objs(cnpj_batch.batch)
+            est_objs = await self.repository.get_cnpjs_establishment(cnpj_objs)
 
             return est_objs
 
@@ -897,7 +949,7 @@ class CNPJService:
             logger.error(f"Error getting CNPJ establishment: {e}")
             raise HTTPException(status_code=400, detail=str(e)) from e
 
-    def get_cnpj_info(self, cnpj: str):
+    async def get_cnpj_info(self, cnpj: str):
         """
         Get information about a CNPJ number.
 
@@ -917,7 +969,7 @@ class CNPJService:
 
             cnpj_objs = [cnpj_obj]
 
-            cnpj_info = self.repository.get_cnpjs_info(cnpj_objs)
+            cnpj_info = await self.repository.get_cnpjs_info(cnpj_objs)
         except Exception as e:
             logger.error(f"Error getting CNPJ info: {e}")
             raise HTTPException(status_code=400, detail=str(e)) from e
@@ -927,7 +979,7 @@ class CNPJService:
 
         return cnpj_info[0]
 
-    def get_cnpjs_info(self, cnpj_batch: BatchModel):
+    async def get_cnpjs_info(self, cnpj_batch: BatchModel):
         """
         Get information about a CNPJ number.
 
@@ -939,21 +991,18 @@ class CNPJService:
         """
         try:
             cnpj_list = list(set(cnpj_batch.batch))
-            cnpj_validity_list = are_cnpj_str_valid(cnpj_list)
-
-            cnpj_validity_dict = dict(zip(cnpj_list, cnpj_validity_list))
+            cnpj_arrays = parse_cnpj_strs(cnpj_list)
 
-            valid_cnpjs = [
-                cnpj_str
-                for cnpj_str, cnpj_validity_dict in cnpj_validity_dict.items()
-                if cnpj_validity_dict["is_valid"]
-            ]
-            valid_cnpj_objs = list(map(cnpj_str_to_obj, valid_cnpjs))
+            valid_cnpj_objs = cnpj_arrays_to_objs(cnpj_arrays)
 
             invalid_cnpjs = {
-                cnpj_str: cnpj_validity_dict
-                for cnpj_str, cnpj_validity_dict in cnpj_validity_dict.items()
-                if not cnpj_validity_dict["is_valid"]
+                cnpj_str: {"is_valid": False, "reason": reason}
+                for cnpj_str, is_valid, reason in zip(
+                    cnpj_list,
+                    cnpj_arrays.is_valid.tolist(),
+                    cnpj_arrays.reasons.tolist(),
+                )
+                if not is_valid
             }
 
         except Exception as e:
@@ -961,13 +1010,13 @@ class CNPJService:
             raise HTTPException(status_code=400, detail=str(e)) from e
 
         return {
-            "success": self.repository.get_cnpjs_info(valid_cnpj_objs),
+            "success": await self.repository.get_cnpjs_info(valid_cnpj_objs),
             "fail": invalid_cnpjs,
         }
 
 
 def get_cnpj_service(
-    cnpj_repository: CNPJRepository = CNPJRepositoryDependency,
+    cnpj_repository: AsyncCNPJRepository = CNPJRepositoryDependency,
 ) -> CNPJService:
     return CNPJService(cnpj_repository)
 
@@ -1,10 +1,10 @@
 from urllib import request
 from functools import reduce, partial
 from datetime import datetime
+from typing import Optional
 import re
 
 
-from bs4 import BeautifulSoup
 from fastapi import Depends
 import pytz
 
@@ -81,10 +81,13 @@ class CNPJScrapService:
             month -= 1
         return f"{year:04d}-{month:02d}"
 
-    def scrap_files_date(self):
+    def scrap_files_date(self, timeout: Optional[float] = None):
         """
         Scrapes the RF (Receita Federal) website to extract file information.
 
+        Args:
+            timeout (Optional[float]): The seconds to wait for the website, if any.
+
         Returns:
             list: A list of tuples containing the updated date and filename of the files
             found on the RF website.
@@ -93,9 +96,13 @@ class CNPJScrapService:
         year_month = self.get_previous_year_month(current_year_month)
         data_url = f"{self.base_url}/{year_month}/"
 
-        with request.urlopen(data_url) as response:
+        urlopen_kwargs = {} if timeout is None else {"timeout": timeout}
+        with request.urlopen(data_url, **urlopen_kwargs) as response:
             raw_html = response.read()
 
+        # Deferred, only the scraping routes and tasks need it
+        from bs4 import BeautifulSoup
+
         # Formatar página e converter em string
         page_items = BeautifulSoup(raw_html, "lxml")
 
@@ -149,15 +156,18 @@ class CNPJScrapService:
 
         return files_info
 
-    def max_update_at(self):
+    def max_update_at(self, timeout: Optional[float] = None):
         """
         Scrapes the RF (Receita Federal) website to extract the most recent file's date.
 
+        Args:
+            timeout (Optional[float]): The seconds to wait for the website, if any.
+
         Returns:
             datetime: The date and time when the most recent file was last updated.
         """
 
-        files_info = self.scrap_files_date()
+        files_info = self.scrap_files_date(timeout)
         max_date = max(
             files_info.values(),
             key=lambda x: x["updated_at"])["updated_at"]
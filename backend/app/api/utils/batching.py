@@ -0,0 +1,168 @@
+import queue
+import sys
+from threading import Event, Lock, Thread
+from time import monotonic
+from typing import Any, Callable, Dict, List, Optional
+
+# Wakes the writer thread up when stopping, it is never written
+WAKE_UP = object()
+
+
+class BatchWriter:
+    """
+    A bounded in-process queue of records, written in batches by a thread.
+
+    A batch is written once it reaches batch_size records or its first record
+    waited for flush_interval seconds. Submitting never blocks: when the sink
+    is slower than the producers and the queue is full, records are dropped
+    and counted, so that a slow audit database cannot stall the requests.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        write_batch: Callable[[List[Any]], Any],
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        max_queue_size: int = 10000,
+    ):
+        """
+        Args:
+            name (str): The writer name, for its thread and error messages.
+            write_batch (Callable[[List[Any]], Any]): Writes a batch of records.
+            batch_size (int): The maximum number of records per batch.
+            flush_interval (float): The maximum seconds a record waits for its batch.
+            max_queue_size (int): The maximum number of records waiting.
+        """
+        self.name = name
+        self.write_batch = write_batch
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self.stopping = Event()
+        self.thread: Optional[Thread] = None
+        self.lock = Lock()
+
+        self.submitted = 0
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+        self.batches = 0
+
+    def submit(self, record: Any) -> bool:
+        """
+        Queues a record to be written, unless the queue is full.
+
+        Args:
+            record (Any): The record to write.
+
+        Returns:
+            bool: Whether the record was queued.
+        """
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self.lock:
+                self.dropped += 1
+            return False
+
+        with self.lock:
+            self.submitted += 1
+
+        return True
+
+    def start(self) -> None:
+        """Starts the writer thread, if not running."""
+        if self.thread is not None and self.thread.is_alive():
+            return
+
+        self.stopping.clear()
+        self.thread = Thread(target=self.run, name=f"{self.name}-writer", daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Stops the writer thread once the queued records are written.
+
+        Args:
+            timeout (Optional[float]): The maximum seconds to wait for the thread.
+        """
+        if self.thread is None:
+            return
+
+        self.stopping.set()
+        try:
+            self.queue.put_nowait(WAKE_UP)
+        except queue.Full:
+            # The thread is busy writing, it will see the stop flag
+            pass
+
+        self.thread.join(timeout)
+        self.thread = None
+
+    def run(self) -> None:
+        while True:
+            batch = self.next_batch()
+            if batch:
+                self.write(batch)
+            elif self.stopping.is_set() and self.queue.empty():
+                return
+
+    def next_batch(self) -> List[Any]:
+        """
+        Waits for the next batch, full or due.
+
+        Returns:
+            List[Any]: The records of the batch, empty if none came in time.
+        """
+        batch: List[Any] = []
+        deadline = monotonic() + self.flush_interval
+
+        while len(batch) < self.batch_size:
+            # No waiting when stopping, whatever is queued goes out at once
+            timeout = 0 if self.stopping.is_set() else deadline - monotonic()
+            try:
+                record = self.queue.get(timeout=max(timeout, 0))
+            except queue.Empty:
+                break
+
+            if record is not WAKE_UP:
+                batch.append(record)
+
+        return batch
+
+    def write(self, batch: List[Any]) -> None:
+        try:
+            self.write_batch(batch)
+        except Exception as e:
+            with self.lock:
+                self.failed += len(batch)
+            # Not logged, the log handlers may write through a batch writer too
+            print(
+                f"Batch writer {self.name}: error writing {len(batch)} records: {e}",
+                file=sys.stderr,
+            )
+            return
+
+        with self.lock:
+            self.written += len(batch)
+            self.batches += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Gets the writer counters.
+
+        Returns:
+            Dict[str, Any]: The queue size and the record and batch counters.
+        """
+        with self.lock:
+            return {
+                "name": self.name,
+                "queued": self.queue.qsize(),
+                "max_queue_size": self.queue.maxsize,
+                "submitted": self.submitted,
+                "dropped": self.dropped,
+                "written": self.written,
+                "failed": self.failed,
+                "batches": self.batches,
+            }
@@ -1,10 +1,24 @@
-from typing import Dict, List, Union, Tuple
+from typing import Dict, List, Union, Tuple, NamedTuple, Iterable
 
 from sqlalchemy import text
 from sqlalchemy.orm import Session
-import pandas as pd
+import numpy as np
 
 from backend.app.utils.misc import is_number
+from backend.app.utils.rows import rows_to_dicts
+
+# Validation failure reasons
+INVALID_LENGTH_REASON = "Invalid length. CNPJ should have 14 digits."
+NON_NUMERIC_REASON = "CNPJ contains non-numeric characters."
+INVALID_DIGITS_REASON = "Invalid verification digits."
+CNPJ_REASONS = np.array(
+    ["", INVALID_LENGTH_REASON, NON_NUMERIC_REASON, INVALID_DIGITS_REASON],
+    dtype=object,
+)
+
+# Verification digit weights
+CNPJ_WEIGHTS_1 = np.array([5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2])
+CNPJ_WEIGHTS_2 = np.array([6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2])
 
 
 def calculate_cnpj_verification_digits(cnpj: str) -> Tuple[int, int]:
@@ -55,31 +69,93 @@ def is_cnpj_str_valid(cnpj: str) -> Dict[str, Union[bool, str]]:
     """
     # Check length
     if len(cnpj) != 14:
-        return {
-            "is_valid": False,
-            "reason": "Invalid length. CNPJ should have 14 digits.",
-        }
+        return {"is_valid": False, "reason": INVALID_LENGTH_REASON}
 
     # Calculate verification digits
     try:
         digit1, digit2 = calculate_cnpj_verification_digits(cnpj)
 
     except ValueError:
-        return {
-            "is_valid": False,
-            "reason": "CNPJ contains non-numeric characters."}
+        return {"is_valid": False, "reason": NON_NUMERIC_REASON}
 
     # Check verification digits
     if cnpj[12] != str(digit1) or cnpj[13] != str(digit2):
-        return {"is_valid": False, "reason": "Invalid verification digits."}
+        return {"is_valid": False, "reason": INVALID_DIGITS_REASON}
 
     # Valid CNPJ
     return {"is_valid": True, "reason": ""}
 
 
+class CNPJArrays(NamedTuple):
+    """Validity and parts of a batch of CNPJ strings, aligned with the batch."""
+
+    is_valid: np.ndarray
+    reasons: np.ndarray
+    basicos: np.ndarray
+    ordens: np.ndarray
+    digitos_verificadores: np.ndarray
+
+
+def parse_cnpj_strs(cnpjs: Iterable[str]) -> CNPJArrays:
+    """
+    Validates and parses a batch of CNPJ strings in one pass.
+
+    The CNPJs become a matrix of digits, and both verification digits of the
+    whole batch come from two dot products with the digit weights.
+
+    Args:
+        cnpjs: The CNPJ numbers to validate (strings).
+
+    Returns:
+        The validity mask, the failure reasons (empty if valid) and the
+        basico, ordem and verification digits parts, which are only
+        meaningful where the mask is set.
+    """
+    cnpjs = list(cnpjs)
+    size = len(cnpjs)
+
+    lengths = np.fromiter(map(len, cnpjs), dtype=np.int64, count=size)
+    has_length = lengths == 14
+
+    # One row of code points per CNPJ, truncated or zero-padded to 14
+    if has_length.all():
+        cnpj_bytes = "".join(cnpjs).encode("utf-32-le")
+        codes = np.frombuffer(cnpj_bytes, dtype=np.uint32).reshape(size, 14)
+    else:
+        cnpj_array = np.array(cnpjs, dtype="U14").reshape(size)
+        codes = cnpj_array.view(np.uint32).reshape(size, 14)
+
+    # Non-digit code points wrap around to large unsigned values
+    digits = codes - ord("0")
+    is_numeric = has_length & (digits.max(axis=1) < 10)
+    digits = digits.astype(np.int64)
+
+    rest1 = digits[:, :12] @ CNPJ_WEIGHTS_1 % 11
+    digit1 = np.where(rest1 < 2, 0, 11 - rest1)
+    rest2 = digits[:, :13] @ CNPJ_WEIGHTS_2 % 11
+    digit2 = np.where(rest2 < 2, 0, 11 - rest2)
+
+    is_valid = is_numeric & (digits[:, 12] == digit1) & (digits[:, 13] == digit2)
+
+    reason_codes = np.select([~has_length, ~is_numeric, ~is_valid], [1, 2, 3], 0)
+    reasons = CNPJ_REASONS[reason_codes]
+
+    def part(start: int, end: int) -> np.ndarray:
+        part_codes = np.ascontiguousarray(codes[:, start:end])
+        return part_codes.view(f"U{end - start}").reshape(size)
+
+    return CNPJArrays(is_valid, reasons, part(0, 8), part(8, 12), part(12, 14))
+
+
 def are_cnpj_str_valid(cnpjs: List[str]) -> List[Dict[str, Union[bool, str]]]:
     """Check if a list of CNPJ strings are valid."""
-    return [is_cnpj_str_valid(cnpj) for cnpj in cnpjs]
+    cnpj_arrays = parse_cnpj_strs(cnpjs)
+
+    return [
+        {"is_valid": is_valid, "reason": reason}
+        for is_valid, reason in zip(
+            cnpj_arrays.is_valid.tolist(), cnpj_arrays.reasons.tolist())
+    ]
 
 
 def parse_cnpj_str(cnpj: str) -> List[str]:
@@ -116,5 +192,4 @@ def get_cnpj_code_description_entries(
     """Get all code-description entries from the specified table."""
     entries_result = session.execute(
         text(f"SELECT codigo, descricao FROM {table_name}")).fetchall()
-    entries_df = pd.DataFrame(entries_result, columns=["code", "text"])
-    return entries_df.to_dict(orient="records")
+    return rows_to_dicts(entries_result, ["code", "text"])
@@ -0,0 +1,218 @@
+import heapq
+import re
+import unicodedata
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+NON_ALPHANUMERIC_PATTERN = re.compile(r"[^a-z0-9]+")
+
+
+def fold_text(text: str) -> str:
+    """
+    Folds a text for matching: accents removed, lowercased and with single
+    spaces between words.
+
+    Args:
+        text (str): The text to fold.
+
+    Returns:
+        str: The folded text.
+    """
+    decomposed = unicodedata.normalize("NFKD", text)
+    unaccented = "".join(char for char in decomposed if not unicodedata.combining(char))
+
+    return NON_ALPHANUMERIC_PATTERN.sub(" ", unaccented.lower()).strip()
+
+
+def text_ngrams(text: str, size: int) -> set:
+    """
+    Gets the character n-grams of a folded text, padded at the word bounds.
+
+    Args:
+        text (str): The folded text.
+        size (int): The n-gram size.
+
+    Returns:
+        set: The distinct n-grams.
+    """
+    padded = f" {text} "
+
+    return {padded[index:index + size] for index in range(len(padded) - size + 1)}
+
+
+def bounded_edit_distance(
+    pattern_masks: Dict[str, int], pattern_length: int, text: str, max_distance: int
+) -> Optional[int]:
+    """
+    Computes the Levenshtein distance with the bit-parallel algorithm of Myers,
+    giving up as soon as it exceeds a bound.
+
+    Args:
+        pattern_masks (Dict[str, int]): The bit mask of positions of each
+            pattern character.
+        pattern_length (int): The pattern length.
+        text (str): The text to compare with the pattern.
+        max_distance (int): The bound on the distance.
+
+    Returns:
+        Optional[int]: The distance, or None if it exceeds the bound.
+    """
+    if abs(pattern_length - len(text)) > max_distance:
+        return None
+    if pattern_length == 0:
+        return len(text)
+
+    mask = (1 << pattern_length) - 1
+    last = 1 << (pattern_length - 1)
+    positive, negative = mask, 0
+    distance = pattern_length
+    remaining = len(text)
+
+    for char in text:
+        remaining -= 1
+        match = pattern_masks.get(char, 0)
+        diagonal = (((match & positive) + positive) ^ positive) | match | negative
+        horizontal_positive = negative | (~(diagonal | positive) & mask)
+        horizontal_negative = positive & diagonal
+
+        if horizontal_positive & last:
+            distance += 1
+        elif horizontal_negative & last:
+            distance -= 1
+
+        # Each remaining character lowers the distance by one at most
+        if distance - remaining > max_distance:
+            return None
+
+        horizontal_positive = ((horizontal_positive << 1) | 1) & mask
+        horizontal_negative = (horizontal_negative << 1) & mask
+        positive = horizontal_negative | (~(diagonal | horizontal_positive) & mask)
+        negative = horizontal_positive & diagonal
+
+    return distance if distance <= max_distance else None
+
+
+class FuzzyMatcher:
+    """
+    An in-memory fuzzy matcher over a fixed list of names.
+
+    Names are accent-folded and indexed by character n-gram. A query only
+    scores the names sharing n-grams with it, in order of a lower bound on
+    their edit distance, and stops once no remaining name can enter the top
+    results. Names sharing no n-gram with the query are never returned.
+    """
+
+    def __init__(
+        self, names: Iterable[str], ngram_size: int = 3, max_candidates: int = 48
+    ):
+        """
+        Args:
+            names (Iterable[str]): The names to match against, duplicates ignored.
+            ngram_size (int): The n-gram size of the blocking index.
+            max_candidates (int): The maximum number of names scored per query.
+        """
+        # Sorted, so that positions also break ties by name
+        self.names: List[str] = sorted(set(names))
+        self.folded_names: List[str] = [fold_text(name) for name in self.names]
+        self.ngram_size = ngram_size
+        self.max_candidates = max_candidates
+
+        index = defaultdict(list)
+        ngram_counts = []
+        for position, folded_name in enumerate(self.folded_names):
+            ngrams = text_ngrams(folded_name, ngram_size)
+            ngram_counts.append(len(ngrams))
+            for ngram in ngrams:
+                index[ngram].append(position)
+
+        self.max_length = max(map(len, self.folded_names), default=0)
+        self.ngram_counts = np.array(ngram_counts, dtype=np.int32)
+        self.lengths = np.array(list(map(len, self.folded_names)), dtype=np.int32)
+        self.index: Dict[str, np.ndarray] = {
+            ngram: np.array(positions, dtype=np.int32)
+            for ngram, positions in index.items()
+        }
+
+    def candidates(self, folded_query: str) -> List[Tuple[int, int, int]]:
+        """
+        Gets the names sharing n-grams with a query, in order of a lower bound
+        on their edit distance to it.
+
+        Each edit destroys at most ngram_size n-grams, so a name sharing s of
+        its n-grams with the query is at least ceil((max(n, m) - s) / ngram_size)
+        edits away, for n and m their distinct n-gram counts, and at least as
+        many edits as their lengths differ.
+
+        Args:
+            folded_query (str): The folded query.
+
+        Returns:
+            List[Tuple[int, int, int]]: The distance lower bound, the shared
+                n-gram count and the position of each candidate name.
+        """
+        query_ngrams = text_ngrams(folded_query, self.ngram_size)
+        postings = [
+            self.index[ngram] for ngram in query_ngrams if ngram in self.index]
+        if not postings:
+            return []
+
+        shared = np.bincount(np.concatenate(postings), minlength=len(self.names))
+        positions = np.flatnonzero(shared)
+        shared = shared[positions]
+        unshared = np.maximum(self.ngram_counts[positions], len(query_ngrams)) - shared
+        lower_bounds = np.maximum(
+            -(-unshared // self.ngram_size),
+            np.abs(self.lengths[positions] - len(folded_query)))
+
+        order = np.lexsort((positions, -shared, lower_bounds))[:self.max_candidates]
+
+        return list(zip(
+            lower_bounds[order].tolist(), shared[order].tolist(), positions[order].tolist()))
+
+    def top_k(self, query: str, limit_count: int) -> List[str]:
+        """
+        Finds the names closest to a query by edit distance.
+
+        Ties are broken by the number of shared n-grams, then by name.
+
+        Args:
+            query (str): The query (e.g., city name).
+            limit_count (int): The number of names to return.
+
+        Returns:
+            List[str]: The closest names, closest first.
+        """
+        if limit_count <= 0:
+            return []
+
+        folded_query = fold_text(query)
+
+        pattern_masks = {}
+        for position, char in enumerate(folded_query):
+            pattern_masks[char] = pattern_masks.get(char, 0) | (1 << position)
+
+        # Min-heap of the best names so far, the worst one at the root
+        best: List[Tuple[int, int, int]] = []
+        max_distance = len(folded_query) + self.max_length
+
+        for lower_bound, shared, position in self.candidates(folded_query):
+            if lower_bound > max_distance:
+                break
+
+            distance = bounded_edit_distance(
+                pattern_masks, len(folded_query), self.folded_names[position], max_distance)
+            if distance is None:
+                continue
+
+            entry = (-distance, shared, -position)
+            if len(best) < limit_count:
+                heapq.heappush(best, entry)
+            elif entry > best[0]:
+                heapq.heapreplace(best, entry)
+
+            if len(best) == limit_count:
+                max_distance = -best[0][0]
+
+        return [self.names[-position] for _, _, position in sorted(best, reverse=True)]
@@ -0,0 +1,188 @@
+import math
+from threading import Lock
+from time import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Quantiles reported for every histogram
+REPORTED_QUANTILES = (0.5, 0.9, 0.99)
+
+
+class LatencyHistogram:
+    """
+    A log-linear latency histogram, in the manner of HdrHistogram.
+
+    Latencies are counted in microsecond buckets: exact below
+    2 ** significant_bits, then 2 ** (significant_bits - 1) buckets per power
+    of two, so any recorded value is off by less than 2 ** (1 - significant_bits)
+    of itself. Memory only grows with the number of distinct buckets hit.
+    """
+
+    def __init__(self, significant_bits: int = 7):
+        """
+        Args:
+            significant_bits (int): The bits of precision kept of each value.
+        """
+        self.significant_bits = significant_bits
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def bucket_index(self, microseconds: int) -> int:
+        shift = max(microseconds.bit_length() - self.significant_bits, 0)
+
+        return (shift << (self.significant_bits - 1)) + (microseconds >> shift)
+
+    def bucket_upper_bound(self, index: int) -> int:
+        """Gets the highest microseconds value counted in a bucket."""
+        half = 1 << (self.significant_bits - 1)
+        shift = max((index >> (self.significant_bits - 1)) - 1, 0)
+
+        return ((index - (shift * half) + 1) << shift) - 1
+
+    def record(self, seconds: float) -> None:
+        """
+        Records a latency.
+
+        Args:
+            seconds (float): The latency, in seconds.
+        """
+        index = self.bucket_index(max(int(seconds * 1_000_000), 0))
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantiles(self, quantiles: Iterable[float]) -> List[float]:
+        """
+        Gets latency quantiles, as the highest value of their buckets.
+
+        Args:
+            quantiles (Iterable[float]): The quantiles, between 0 and 1.
+
+        Returns:
+            List[float]: The latency of each quantile, in seconds.
+        """
+        quantiles = list(quantiles)
+        if not self.count:
+            return [0.0] * len(quantiles)
+
+        # The rank of each quantile, answered in one pass over the buckets
+        ranks = sorted(
+            (max(math.ceil(quantile * self.count), 1), position)
+            for position, quantile in enumerate(quantiles))
+        values = [0.0] * len(quantiles)
+
+        seen, next_rank = 0, 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            while next_rank < len(ranks) and ranks[next_rank][0] <= seen:
+                value = self.bucket_upper_bound(index) / 1_000_000
+                values[ranks[next_rank][1]] = min(value, self.max)
+                next_rank += 1
+
+        return values
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Gets the histogram summary.
+
+        Returns:
+            Dict[str, Any]: The count, sum, max and quantiles, in seconds.
+        """
+        p50, p90, p99 = self.quantiles(REPORTED_QUANTILES)
+
+        return {
+            "count": self.count,
+            "sum_seconds": self.total,
+            "p50_seconds": p50,
+            "p90_seconds": p90,
+            "p99_seconds": p99,
+            "max_seconds": self.max,
+        }
+
+
+class LatencyRecorder:
+    """
+    Latency histograms per HTTP method and route.
+
+    Each latency is recorded twice: on the live histograms, kept since the
+    process started, and on the window histograms, handed over and reset on
+    every rollup.
+    """
+
+    def __init__(self, significant_bits: int = 7):
+        """
+        Args:
+            significant_bits (int): The bits of precision of the histograms.
+        """
+        self.significant_bits = significant_bits
+        self.lock = Lock()
+        self.started_at = time()
+        self.window_started_at = self.started_at
+        self.live: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self.window: Dict[Tuple[str, str], LatencyHistogram] = {}
+
+    def histogram(
+        self, histograms: Dict[Tuple[str, str], LatencyHistogram], key: Tuple[str, str]
+    ) -> LatencyHistogram:
+        histogram = histograms.get(key)
+        if histogram is None:
+            histogram = histograms[key] = LatencyHistogram(self.significant_bits)
+
+        return histogram
+
+    def record(self, method: str, route: str, seconds: float) -> None:
+        """
+        Records the latency of a request.
+
+        Args:
+            method (str): The HTTP method.
+            route (str): The route path template, not the requested path.
+            seconds (float): The latency, in seconds.
+        """
+        key = (method, route)
+        with self.lock:
+            self.histogram(self.live, key).record(seconds)
+            self.histogram(self.window, key).record(seconds)
+
+    def summaries(self) -> List[Dict[str, Any]]:
+        """
+        Gets the summary of the live histograms.
+
+        Returns:
+            List[Dict[str, Any]]: The method, route and histogram summary of
+                each route, slowest tail first.
+        """
+        with self.lock:
+            summaries = [
+                {"method": method, "route": route, **histogram.summary()}
+                for (method, route), histogram in self.live.items()
+            ]
+
+        return sorted(summaries, key=lambda summary: -summary["p99_seconds"])
+
+    def drain_window(
+        self, now: Optional[float] = None
+    ) -> Tuple[float, float, Dict[Tuple[str, str], LatencyHistogram]]:
+        """
+        Hands over the window histograms and starts a new window.
+
+        Args:
+            now (Optional[float]): The window end timestamp. Defaults to now.
+
+        Returns:
+            Tuple[float, float, Dict]: The window start and end timestamps and
+                its histograms, keyed by method and route.
+        """
+        now = time() if now is None else now
+        with self.lock:
+            window, self.window = self.window, {}
+            window_started_at, self.window_started_at = self.window_started_at, now
+
+        return window_started_at, now, window
+
+
+# Latencies of the API requests, per method and route
+request_latencies = LatencyRecorder()
@@ -1,35 +1,81 @@
 import time
 import re
+import json
+from base64 import urlsafe_b64encode, urlsafe_b64decode
 from functools import wraps
 from inspect import iscoroutinefunction
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 
 from backend.app.utils.misc import is_positive, is_non_negative
 from backend.app.api.constants import UNIT_MULTIPLIER, MAX_LIMIT
 
 
-def print_execution_time(func):
-    @wraps(func)
-    def sync_wrapper(*args, **kwargs):
-        start_time = time.time()
-        result = func(*args, **kwargs)
-        end_time = time.time()
-        execution_time = end_time - start_time
-        print(
-            f"Execution time of {func.__name__}: {execution_time:.4f} seconds")
-        return result
-
-    @wraps(func)
-    async def async_wrapper(*args, **kwargs):
-        start_time = time.time()
-        result = await func(*args, **kwargs)
-        end_time = time.time()
-        execution_time = end_time - start_time
-        print(
-            f"Execution time of {func.__name__}: {execution_time:.4f} seconds")
-        return result
+class ExecutionProfile:
+    """
+    Records the execution time of a sequence of steps, such as the application
+    startup, as a structured profile.
+    """
 
-    return async_wrapper if iscoroutinefunction(func) else sync_wrapper
+    def __init__(self, name: str, started_at: Optional[float] = None):
+        """
+        Args:
+            name (str): The profile name.
+            started_at (float, optional): The perf_counter start. Defaults to now.
+        """
+        self.name = name
+        self.started_at = time.perf_counter() if started_at is None else started_at
+        self.steps: List[Dict[str, Any]] = []
+
+    def record(self, step_name: str, duration: float) -> None:
+        """
+        Records the execution time of a step.
+
+        Args:
+            step_name (str): The step name.
+            duration (float): The execution time, in seconds.
+        """
+        self.steps.append({"step": step_name, "duration_ms": round(duration * 1000, 3)})
+
+    def timed(self, func):
+        """
+        Wraps a function, sync or async, to record its execution time as a step.
+
+        Args:
+            func (Callable): The function to wrap.
+
+        Returns:
+            Callable: The wrapped function.
+        """
+        @wraps(func)
+        def sync_wrapper(*args, **kwargs):
+            start_time = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.record(func.__name__, time.perf_counter() - start_time)
+
+        @wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            start_time = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                self.record(func.__name__, time.perf_counter() - start_time)
+
+        return async_wrapper if iscoroutinefunction(func) else sync_wrapper
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Gets the profile.
+
+        Returns:
+            Dict[str, Any]: The profile name, total time and steps, in milliseconds.
+        """
+        return {
+            "profile": self.name,
+            "total_ms": round((time.perf_counter() - self.started_at) * 1000, 3),
+            "steps": list(self.steps),
+        }
 
 
 def zfill_factory(n: int):
@@ -114,3 +160,48 @@ def paginate_dict(data_dict: Dict, page_size: int, page_number: int):
     paginated_dict = {key: data_dict[key] for key in page_keys}
 
     return paginated_dict
+
+
+def encode_cursor(key: Tuple[Any, ...]) -> str:
+    """
+    Encodes a keyset pagination key into an opaque cursor token.
+
+    Args:
+    - key (tuple): The key of the last row of the page.
+
+    Returns:
+    - str: The URL-safe cursor token.
+    """
+    key_json = json.dumps([str(value) for value in key])
+    return urlsafe_b64encode(key_json.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, key_size: int = 3) -> Tuple[str, ...]:
+    """
+    Decodes an opaque cursor token into its keyset pagination key.
+
+    Args:
+    - cursor (str): The cursor token.
+    - key_size (int): The expected number of key values.
+
+    Returns:
+    - tuple: The key of the last row of the previous page.
+
+    Raises:
+    - ValueError: If the cursor is malformed.
+    """
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        key = json.loads(urlsafe_b64decode(cursor + padding))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor {cursor}.") from e
+
+    is_valid = (
+        isinstance(key, list)
+        and len(key) == key_size
+        and all(isinstance(value, str) and value.isdigit() for value in key)
+    )
+    if not is_valid:
+        raise ValueError(f"Invalid cursor {cursor}.")
+
+    return tuple(key)
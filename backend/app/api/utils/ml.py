@@ -1,28 +1,52 @@
 from collections import Counter
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import List
-
-import nltk
-from nltk.corpus import stopwords
-from nltk.metrics import edit_distance
+from functools import lru_cache
+from typing import FrozenSet, List
 
 from backend.app.setup.logging import logger
 
+# NLTK datasets, by resource path
+NLTK_RESOURCES = {
+    "stopwords": "corpora/stopwords",
+    "punkt": "tokenizers/punkt",
+    "punkt_tab": "tokenizers/punkt_tab",
+}
+
 
 def init_nltk() -> None:
-    """Initializes NLTK by downloading necessary datasets."""
-    try:
-        nltk.download("stopwords")
-        nltk.download("punkt")
-        nltk.download("punkt_tab")
-    except Exception as e:
-        logger.error(f"Error downloading NLTK packages: {e}")
+    """
+    Initializes NLTK by downloading the necessary datasets that are missing.
+
+    NLTK is imported on first use, and datasets already in the NLTK data path
+    (e.g., bundled in the image) are never downloaded again.
+    """
+    import nltk
+
+    for package, resource in NLTK_RESOURCES.items():
+        try:
+            nltk.data.find(resource)
+        except LookupError:
+            try:
+                nltk.download(package)
+            except Exception as e:
+                logger.error(f"Error downloading NLTK package {package}: {e}")
+
+
+@lru_cache(maxsize=None)
+def get_stop_words(language: str = "english") -> FrozenSet[str]:
+    """Loads the NLTK stop words of a language, once."""
+    from nltk.corpus import stopwords
+
+    return frozenset(stopwords.words(language))
 
 
 def compute_token_score(
     name: str, processed_municipality: str, word_freq_municipality: Counter
 ) -> tuple[float, str]:
     """Helper function to compute the score for each eligible token."""
+    import nltk
+    from nltk.metrics import edit_distance
+
     # Calculate the edit distance
     distance = edit_distance(name.lower(), processed_municipality)
 
@@ -48,7 +72,9 @@ def find_most_possible_tokens(
     Returns:
         List[str]: The list of the most possible tokens.
     """
-    stop_words = set(stopwords.words("english"))
+    import nltk
+
+    stop_words = get_stop_words("english")
     processed_municipality = token.lower()
     token_words = nltk.word_tokenize(processed_municipality)
 
@@ -0,0 +1,87 @@
+from collections import defaultdict
+from typing import Dict, FrozenSet, List
+
+from backend.app.api.utils.fuzzy import fold_text
+
+
+class PrefixSearchIndex:
+    """
+    An in-memory inverted index over the text of code-description entries.
+
+    Texts are accent- and case-folded and split into words, and every prefix
+    of every word points to the entries holding it. A query matches the
+    entries holding a word starting with each of its words, in any order.
+    """
+
+    def __init__(self, entries: List[Dict], text_key: str = "text"):
+        """
+        Args:
+            entries (List[Dict]): The entries to search, such as CNAEs.
+            text_key (str): The entry key of the text to index.
+        """
+        self.entries = list(entries)
+        self.folded_texts: List[str] = [
+            fold_text(str(entry[text_key])) for entry in self.entries]
+        self.words: List[FrozenSet[str]] = [
+            frozenset(folded_text.split()) for folded_text in self.folded_texts]
+
+        index = defaultdict(set)
+        for position, words in enumerate(self.words):
+            for word in words:
+                for end in range(1, len(word) + 1):
+                    index[word[:end]].add(position)
+
+        self.index: Dict[str, FrozenSet[int]] = {
+            prefix: frozenset(positions) for prefix, positions in index.items()
+        }
+
+    def rank_key(self, position: int, query_words: List[str], folded_query: str):
+        """
+        Ranks entries with more whole-word matches first, then entries whose
+        text starts with the query, then the shorter texts.
+        """
+        folded_text = self.folded_texts[position]
+        partial_matches = sum(
+            word not in self.words[position] for word in query_words)
+
+        return (
+            partial_matches,
+            not folded_text.startswith(folded_query),
+            len(folded_text),
+            position,
+        )
+
+    def search(self, query: str) -> List[Dict]:
+        """
+        Searches the entries matching a query, best matches first.
+
+        Queries matching no word prefix fall back to a substring match on the
+        folded texts, so that word fragments still find their entries.
+
+        Args:
+            query (str): The search query, with one or more words.
+
+        Returns:
+            List[Dict]: The matching entries.
+        """
+        folded_query = fold_text(query)
+        query_words = folded_query.split()
+        if not query_words:
+            return []
+
+        postings = sorted(
+            (self.index.get(word, frozenset()) for word in query_words), key=len)
+        positions = postings[0].intersection(*postings[1:])
+
+        if not positions:
+            positions = {
+                position
+                for position, folded_text in enumerate(self.folded_texts)
+                if folded_query in folded_text
+            }
+
+        ranked = sorted(
+            positions,
+            key=lambda position: self.rank_key(position, query_words, folded_query))
+
+        return [self.entries[position] for position in ranked]
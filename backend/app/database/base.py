@@ -1,20 +1,102 @@
-from typing import Dict, Optional, ContextManager
-from contextlib import contextmanager
+from typing import (
+    Any, Dict, Iterable, List, Optional, Tuple, ContextManager, AsyncContextManager,
+)
+from contextlib import contextmanager, asynccontextmanager
+from threading import Lock
+from time import perf_counter
 from sqlalchemy.orm import Session
 
 from psycopg2 import OperationalError
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy import text, inspect, create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
+    AsyncEngine,
+    AsyncSession,
+    create_async_engine,
+    async_sessionmaker,
+)
 from sqlalchemy.engine.url import make_url
 
+from backend.app.api.utils.metrics import LatencyHistogram
 from backend.app.setup.config import settings
 
 
+# Driver of the asyncio engine, sharing the URI of the sync one. psycopg 3
+# implements the pipeline mode
+ASYNC_DRIVER_NAME = "postgresql+psycopg"
+
+
+async def execute_pipeline(
+    connection: AsyncConnection, statements: List[Tuple[str, Dict[str, Any]]]
+) -> List[List[Tuple]]:
+    """
+    Fetch the rows of statements sent back-to-back on a psycopg connection.
+
+    In psycopg pipeline mode every statement is sent before any result is
+    read, so the batch costs about one round trip instead of one each.
+
+    Parameters:
+    connection (AsyncConnection): A connection of a psycopg asyncio engine.
+    statements (List[Tuple[str, Dict[str, Any]]]): The SQL, with ':name'
+        binds, and the bound values of each statement.
+
+    Returns:
+    List[List[Tuple]]: The result rows of each statement, in order.
+    """
+    raw_connection = await connection.get_raw_connection()
+    driver_connection = raw_connection.driver_connection
+
+    cursors = []
+    async with driver_connection.pipeline():
+        for sql, params in statements:
+            compiled = text(sql).compile(dialect=connection.dialect)
+            cursor = driver_connection.cursor()
+            await cursor.execute(str(compiled), compiled.construct_params(params or {}))
+            cursors.append(cursor)
+
+    # Leaving the pipeline waited for all the results
+    return [await cursor.fetchall() for cursor in cursors]
+
+
+class RequestConnection:
+    """
+    The asyncio connection of a request, checked out on its first statement
+    and shared by every repository call until the request ends.
+
+    Requests served from memory never check a connection out.
+    """
+
+    def __init__(self, database: "Database"):
+        """
+        Parameters:
+        database (Database): The database to connect to.
+        """
+        self.database = database
+        self.connection: Optional[AsyncConnection] = None
+
+    async def get(self) -> AsyncConnection:
+        """Get the connection, checking it out of the pool on the first call."""
+        if self.connection is None:
+            self.connection = await self.database.checkout()
+
+        return self.connection
+
+    async def close(self):
+        """Return the connection to the pool, if checked out."""
+        if self.connection is not None:
+            connection, self.connection = self.connection, None
+            await connection.close()
+
+
 class BaseDatabase:
     def get_session(self) -> ContextManager:
         raise NotImplementedError()
 
+    def get_async_session(self) -> AsyncContextManager:
+        raise NotImplementedError()
+
     def create_database(self):
         raise NotImplementedError()
 
@@ -33,7 +115,13 @@ class Database(BaseDatabase):
     Database class for managing PostgreSQL database connections and operations.
     """
 
-    def __init__(self, uri: str):
+    def __init__(self, uri: str, with_async: bool = False):
+        """
+        Parameters:
+        uri (str): The database URI.
+        with_async (bool): Whether to create the asyncio engine too, for the
+            databases serving coroutine routes.
+        """
         if not uri:
             raise ValueError("Database URI must be provided.")
 
@@ -41,8 +129,8 @@ class Database(BaseDatabase):
         self.base = declarative_base()
         self.engine = create_engine(
             uri,
-            pool_size=30,
-            max_overflow=20,
+            pool_size=settings.POSTGRES_POOL_SIZE,
+            max_overflow=settings.POSTGRES_MAX_OVERFLOW,
             pool_timeout=60,
             pool_recycle=1800,
             pool_pre_ping=True,
@@ -50,6 +138,40 @@ class Database(BaseDatabase):
         )
         self.session_maker = sessionmaker(bind=self.engine)
 
+        # Native asyncio engine on psycopg 3, for coroutine routes
+        self.async_engine: Optional[AsyncEngine] = None
+        self.async_session_maker: Optional[async_sessionmaker] = None
+        if with_async:
+            self.async_engine = create_async_engine(
+                self.url.set(drivername=ASYNC_DRIVER_NAME),
+                pool_size=settings.POSTGRES_ASYNC_POOL_SIZE,
+                max_overflow=settings.POSTGRES_ASYNC_MAX_OVERFLOW,
+                pool_timeout=60,
+                pool_recycle=1800,
+                pool_pre_ping=True,
+                isolation_level="AUTOCOMMIT",
+                # psycopg prepares repeated statements unless told otherwise
+                connect_args=(
+                    {} if settings.POSTGRES_PREPARED_STATEMENTS
+                    else {"prepare_threshold": None}
+                ),
+            )
+            self.async_session_maker = async_sessionmaker(
+                bind=self.async_engine, expire_on_commit=False
+            )
+
+        # Seconds waited for the asyncio connections of the requests
+        self.checkout_lock = Lock()
+        self.checkout_wait = LatencyHistogram()
+
+    def get_async_engine(self) -> AsyncEngine:
+        """Get the asyncio engine, if the database has one."""
+        if self.async_engine is None:
+            raise RuntimeError(
+                f"Database {self.url.database} has no asyncio engine.")
+
+        return self.async_engine
+
     @contextmanager
     def get_session(self) -> ContextManager[Session]:
         """Context manager to get a database session."""
@@ -62,6 +184,76 @@ class Database(BaseDatabase):
         finally:
             session.close()
 
+    @asynccontextmanager
+    async def get_async_session(self) -> AsyncContextManager[AsyncSession]:
+        """Async context manager to get a database session on the asyncio engine."""
+        self.get_async_engine()
+        async with self.async_session_maker() as session:
+            try:
+                yield session
+            except Exception:
+                await session.rollback()
+                raise
+
+    async def fetch_pipelined(
+        self, statements: List[Tuple[str, Dict[str, Any]]]
+    ) -> List[List[Tuple]]:
+        """Fetch the rows of statements pipelined on a connection of its own."""
+        async with self.get_async_engine().connect() as connection:
+            return await execute_pipeline(connection, statements)
+
+    async def checkout(self) -> AsyncConnection:
+        """
+        Check an asyncio connection out of the pool, timing the wait.
+
+        Returns:
+        AsyncConnection: The connection, to be closed by the caller.
+        """
+        engine = self.get_async_engine()
+
+        start = perf_counter()
+        connection = await engine.connect()
+        with self.checkout_lock:
+            self.checkout_wait.record(perf_counter() - start)
+
+        return connection
+
+    @asynccontextmanager
+    async def request_connection(self) -> AsyncContextManager[RequestConnection]:
+        """Async context manager to share one connection across a request."""
+        request_connection = RequestConnection(self)
+        try:
+            yield request_connection
+        finally:
+            await request_connection.close()
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """
+        Get the pool occupancy and the asyncio connection checkout waits.
+
+        Returns:
+        Dict[str, Any]: The database name, the checked out and idle
+            connections of each pool, and the checkout wait summary.
+        """
+        engines = {"sync": self.engine, "async": self.async_engine}
+        with self.checkout_lock:
+            checkout_wait = self.checkout_wait.summary()
+
+        return {
+            "database": self.url.database,
+            "pools": {
+                name: {
+                    "size": engine.pool.size(),
+                    "checked_out": engine.pool.checkedout(),
+                    "idle": engine.pool.checkedin(),
+                    "overflow": engine.pool.overflow(),
+                }
+                for name, engine in engines.items()
+                if engine is not None
+            },
+            "checkout_wait": checkout_wait,
+        }
+
     def mask_sensitive_data(self) -> str:
         """Masks sensitive data in the database URI."""
         masked_uri = self.url.set(
@@ -132,6 +324,18 @@ class Database(BaseDatabase):
         except Exception as e:
             print(f"Error closing database connections: {e}")
 
+    async def disconnect_async(self):
+        """Close the connections of the asyncio engine."""
+        masked_uri = self.mask_sensitive_data()
+        try:
+            if self.async_engine is None:
+                return
+
+            await self.async_engine.dispose()
+            print(f"Database {masked_uri} async connections closed.")
+        except Exception as e:
+            print(f"Error closing database async connections: {e}")
+
     def __str__(self) -> str:
         return f"Database(uri={self.mask_sensitive_data()}, engine={self.engine})"
 
@@ -145,12 +349,21 @@ class MultiDatabase(BaseDatabase):
     This class represents a multi-database connection and session management object.
     """
 
-    def __init__(self, database_uris: Dict[str, str]):
+    def __init__(
+        self, database_uris: Dict[str, str], async_db_names: Iterable[str] = ()
+    ):
+        """
+        Parameters:
+        database_uris (Dict[str, str]): The URI of each database, by name.
+        async_db_names (Iterable[str]): The databases with an asyncio engine.
+        """
         if not database_uris:
             raise ValueError("Database URIs must be provided.")
 
+        async_db_names = set(async_db_names)
         self.databases = {
-            db_name: Database(uri) for db_name, uri in database_uris.items()
+            db_name: Database(uri, db_name in async_db_names)
+            for db_name, uri in database_uris.items()
         }
 
     @contextmanager
@@ -162,6 +375,28 @@ class MultiDatabase(BaseDatabase):
         with self.databases[db_name].get_session() as session:
             yield session
 
+    @asynccontextmanager
+    async def get_async_session(self, db_name: str) -> AsyncContextManager:
+        """Get an asyncio session for a specific database."""
+        if db_name not in self.databases:
+            raise ValueError(f"No such database: {db_name}")
+
+        async with self.databases[db_name].get_async_session() as session:
+            yield session
+
+    @asynccontextmanager
+    async def request_connection(self, db_name: str) -> AsyncContextManager:
+        """Get the shared request connection of a specific database."""
+        if db_name not in self.databases:
+            raise ValueError(f"No such database: {db_name}")
+
+        async with self.databases[db_name].request_connection() as connection:
+            yield connection
+
+    def pool_stats(self) -> List[Dict[str, Any]]:
+        """Get the pool stats of all databases."""
+        return [database.pool_stats() for database in self.databases.values()]
+
     def create_database(self):
         """Create databases for all configured databases."""
         for database in self.databases.values():
@@ -195,10 +430,16 @@ class MultiDatabase(BaseDatabase):
         for database in self.databases.values():
             database.disconnect()
 
+    async def disconnect_async(self):
+        """Disconnect the asyncio engines of all databases."""
+        for database in self.databases.values():
+            await database.disconnect_async()
+
 
 # Load environment variables from the .env file
+# Only the RFB database serves coroutine routes
 multi_database: Optional[MultiDatabase] = MultiDatabase(
-    settings.postgres_uris_dict)
+    settings.postgres_uris_dict, [settings.POSTGRES_DBNAME_RFB])
 
 
 def init_database():
@@ -218,3 +459,27 @@ def get_session(db_name: str) -> ContextManager:
     except SQLAlchemyError as e:
         print(f"Failed to get session for {db_name}: {e}")
         raise
+
+
+@asynccontextmanager
+async def get_async_session(db_name: str) -> AsyncContextManager:
+    """Define a dependency to create an asyncio database session."""
+    if multi_database is None:
+        init_database()
+
+    try:
+        async with multi_database.get_async_session(db_name) as session:
+            yield session
+    except SQLAlchemyError as e:
+        print(f"Failed to get async session for {db_name}: {e}")
+        raise
+
+
+@asynccontextmanager
+async def get_request_connection(db_name: str) -> AsyncContextManager:
+    """Define a dependency to share one asyncio connection across a request."""
+    if multi_database is None:
+        init_database()
+
+    async with multi_database.request_connection(db_name) as connection:
+        yield connection
@@ -22,12 +22,14 @@ logs_database = multi_database.databases[settings.POSTGRES_DBNAME_AUDIT]
 
 class RequestLog(logs_database.base):
     __tablename__ = "request_logs"
+    __table_args__ = {"postgresql_partition_by": "RANGE (relo_inserted_at)"}
 
     relo_id = Column(
         UUID(as_uuid=True), primary_key=True, index=True, default=uuid.uuid4
     )
+    # Partition key, so part of the primary key
     relo_inserted_at = Column(
-        DateTime(timezone=True), index=True, server_default=func.now()
+        DateTime(timezone=True), primary_key=True, index=True, server_default=func.now()
     )
     relo_method = Column(String, index=True)
     relo_url = Column(String, index=True)
@@ -76,6 +78,7 @@ class Task(logs_database.base):
 
 class TaskLog(logs_database.base):
     __tablename__ = "task_logs"
+    __table_args__ = {"postgresql_partition_by": "RANGE (talo_inserted_at)"}
 
     talo_id = Column(
         UUID(as_uuid=True), primary_key=True, index=True, default=uuid.uuid4
@@ -95,12 +98,16 @@ class TaskLog(logs_database.base):
     talo_details = Column(JSONB)
     talo_start_time = Column(DateTime(timezone=True), index=True)
     talo_end_time = Column(DateTime(timezone=True), index=True)
+    # Fire time of the schedule, the same on every replica for a cron tick
+    talo_scheduled_at = Column(DateTime(timezone=True), index=True)
     talo_success = Column(Boolean, default=False)
     talo_error_message = Column(Text, nullable=True)
     talo_error_trace = Column(Text, nullable=True)
+    # Partition key, so part of the primary key
     talo_inserted_at = Column(
         DateTime(
             timezone=True),
+        primary_key=True,
         server_default=func.now())
 
     task = relationship("Task", back_populates="logs")
@@ -128,13 +135,16 @@ class AppStartLog(logs_database.base):
 
 class DebugLog(logs_database.base):
     __tablename__ = "debug_logs"
+    __table_args__ = {"postgresql_partition_by": "RANGE (delo_created_at)"}
 
     delo_id = Column(
         UUID(as_uuid=True), primary_key=True, index=True, default=uuid.uuid4
     )
+    # Partition key, so part of the primary key
     delo_created_at = Column(
         DateTime(
             timezone=True),
+        primary_key=True,
         server_default=func.now())
     delo_environment = Column(String)
     delo_machine = Column(String)
@@ -147,14 +157,51 @@ class DebugLog(logs_database.base):
 
 class RequestTimingLog(logs_database.base):
     __tablename__ = "request_timing"
+    __table_args__ = {"postgresql_partition_by": "RANGE (rtlo_created_at)"}
 
     rtlo_id = Column(
         UUID(as_uuid=True), primary_key=True, index=True, default=uuid.uuid4
     )
+    # Partition key, so part of the primary key
     rtlo_created_at = Column(
         DateTime(
             timezone=True),
+        primary_key=True,
         server_default=func.now())
     rtlo_url_path = Column(String, index=True)
     rtlo_method = Column(String)
     rtlo_process_time = Column(Float)
+
+
+class RequestLatencyRollup(logs_database.base):
+    __tablename__ = "request_latency_rollups"
+
+    rlro_id = Column(
+        UUID(as_uuid=True), primary_key=True, index=True, default=uuid.uuid4
+    )
+    rlro_window_start = Column(DateTime(timezone=True), index=True)
+    rlro_window_end = Column(DateTime(timezone=True), index=True)
+    rlro_method = Column(String)
+    rlro_route = Column(String, index=True)
+    rlro_count = Column(Integer)
+    rlro_sum_seconds = Column(Float)
+    rlro_p50_seconds = Column(Float)
+    rlro_p90_seconds = Column(Float)
+    rlro_p99_seconds = Column(Float)
+    rlro_max_seconds = Column(Float)
+
+    def __repr__(self):
+        params = f"route={self.rlro_method} {self.rlro_route}, count={self.rlro_count}, p99={self.rlro_p99_seconds}"
+        return f"<RequestLatencyRollup({params})>"
+
+
+class IpInfo(logs_database.base):
+    __tablename__ = "ip_info_cache"
+
+    ipin_ip_address = Column(String, primary_key=True)
+    ipin_info = Column(JSONB)
+    ipin_resolved_at = Column(DateTime(timezone=True), index=True)
+
+    def __repr__(self):
+        params = f"ip={self.ipin_ip_address}, resolved_at={self.ipin_resolved_at}"
+        return f"<IpInfo({params})>"
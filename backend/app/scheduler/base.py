@@ -1,14 +1,17 @@
-from typing import Dict, List, Any
+from typing import Dict, Iterator, List, Any, Optional
+from concurrent.futures import CancelledError, Future
+from contextlib import ExitStack, contextmanager
 from datetime import datetime
+from uuid import UUID, uuid4
 import traceback
-import asyncio
-import inspect
+import hashlib
 
-from apscheduler import Scheduler, ScheduleLookupError
+from apscheduler import Scheduler, ScheduleLookupError, current_job
 from apscheduler.triggers.interval import IntervalTrigger
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.date import DateTrigger
 from apscheduler.datastores.memory import MemoryDataStore
+from sqlalchemy import select, text, update
 
 from backend.app.database.base import multi_database
 from backend.app.database.base import get_session
@@ -16,6 +19,7 @@ from backend.app.setup.logging import logger
 from backend.app.database.models.logs import TaskLog
 from backend.app.api.models.tasks import TaskConfig, TaskCreate
 from backend.app.api.repositories.tasks import TaskRepository
+from backend.app.scheduler.runner import TaskRunner
 from backend.app.setup.config import settings
 
 # Custom exception for invalid scheduling parameters
@@ -87,57 +91,237 @@ def create_scheduler(schedule_type):
         raise ValueError(f"Unsupported scheduler type: {schedule_type}")
 
 
+def get_task_lock_key(task_name: str) -> int:
+    """Gets the advisory lock key of a task, a signed 64-bit integer."""
+    digest = hashlib.blake2b(
+        f"scheduled_task:{task_name}".encode(), digest_size=8).digest()
+
+    return int.from_bytes(digest, "big", signed=True)
+
+
+@contextmanager
+def task_lock(task_name: str) -> Iterator[bool]:
+    """
+    Takes the advisory lock of a task on the audit database, if free.
+
+    The engine autocommits, so the lock is taken at session level on a
+    connection of its own, held until the block exits. It is released by the
+    server if the replica holding it dies.
+
+    Args:
+        task_name (str): The task name.
+
+    Yields:
+        bool: Whether the lock was taken, if not another replica holds it.
+    """
+    key = get_task_lock_key(task_name)
+
+    with audit_database.engine.connect() as connection:
+        locked = bool(connection.execute(
+            text("select pg_try_advisory_lock(:key)"), {"key": key}).scalar())
+        try:
+            yield locked
+        finally:
+            if locked:
+                try:
+                    connection.execute(
+                        text("select pg_advisory_unlock(:key)"), {"key": key})
+                except Exception as e:
+                    logger.error(f"Error releasing the lock of task {task_name}: {e}")
+                    # Closing the server session is the other way to release it
+                    connection.invalidate()
+
+
+def get_scheduled_time() -> Optional[datetime]:
+    """
+    Gets the schedule fire time of the running job, without jitter.
+
+    Returns:
+        Optional[datetime]: The fire time, or None if not run by the scheduler.
+    """
+    try:
+        return current_job.get().original_scheduled_time
+    except LookupError:
+        return None
+
+
 class ScheduledTask:
-    def __init__(self, task_config: TaskConfig):
+    def __init__(self, task_config: TaskConfig, runner: TaskRunner):
         self.task_config = task_config
+        self.runner = runner
 
     def run(self):
         """
         Run a task and log its execution details in the TaskLog table.
 
+        Every replica schedules the same tasks, so an exclusive task only runs
+        on the replica taking its advisory lock, and only if no replica ran
+        the same tick already. The other replicas log a skipped run, as does
+        this one when the task already runs max_concurrency times in it.
+
+        The run is handed to the task runner, so the scheduler thread returns
+        at once; the run slot and the lock are released when the run ends.
+        """
+        scheduled_at = get_scheduled_time()
+
+        with ExitStack() as stack:
+            if not stack.enter_context(self.runner.slot(self.task_config)):
+                self.log_skipped(scheduled_at, "concurrency limit reached")
+                return
+
+            if self.task_config.exclusive:
+                if not stack.enter_context(task_lock(self.task_config.task_name)):
+                    self.log_skipped(scheduled_at, "running on another replica")
+                    return
+
+                if self.is_tick_done(scheduled_at):
+                    self.log_skipped(
+                        scheduled_at, "tick already run by another replica")
+                    return
+
+            self.execute(scheduled_at, stack.pop_all())
+
+    def is_tick_done(self, scheduled_at: Optional[datetime]) -> bool:
+        """
+        Checks whether a replica already ran the task for a schedule fire time.
+
         Args:
-            task_name (str): The name of the task being executed.
-            task_type (str): The type of task (e.g., 'cleanup', 'data_processing').
-            task_details (Dict[str, Any]): Additional details about the task (e.g., parameters used).
-            task_callable (Callable): The function or method that executes the task logic.
-            *args: Positional arguments to pass to the task_callable.
-            **kwargs: Keyword  arguments to pass to the task_callable.
+            scheduled_at (Optional[datetime]): The schedule fire time.
+
+        Returns:
+            bool: Whether a run of the tick, not skipped, is logged.
         """
+        if scheduled_at is None:
+            return False
+
         with get_session(settings.POSTGRES_DBNAME_AUDIT) as session:
-            task_log = TaskLog(
+            return session.execute(
+                select(TaskLog.talo_id)
+                .where(
+                    TaskLog.talo_name == self.task_config.task_name,
+                    TaskLog.talo_scheduled_at == scheduled_at,
+                    TaskLog.talo_status != "skipped",
+                )
+                .limit(1)
+            ).first() is not None
+
+    def log_skipped(self, scheduled_at: Optional[datetime], reason: str):
+        """
+        Log a run skipped by this replica.
+
+        Args:
+            scheduled_at (Optional[datetime]): The schedule fire time.
+            reason (str): Why the run was skipped.
+        """
+        now = datetime.now()
+        with get_session(settings.POSTGRES_DBNAME_AUDIT) as session:
+            session.add(TaskLog(
                 talo_task_id=self.task_config.task_id,
                 talo_name=self.task_config.task_name,
                 talo_type=self.task_config.task_type,
-                talo_details=self.task_config.task_details,
+                talo_details={**self.task_config.task_details, "reason": reason},
+                talo_start_time=now,
+                talo_end_time=now,
+                talo_scheduled_at=scheduled_at,
+                talo_status="skipped",
+            ))
+            session.commit()
+
+    def execute(
+        self, scheduled_at: Optional[datetime], release: Optional[ExitStack] = None
+    ) -> Future:
+        """
+        Submit the task callable to the task runner and log its execution
+        details, the start now and the end once the run is over.
+
+        Args:
+            scheduled_at (Optional[datetime]): The schedule fire time.
+            release (Optional[ExitStack]): The run slot and lock, released
+                when the run ends.
+
+        Returns:
+            Future: The future of the callable result.
+        """
+        release = ExitStack() if release is None else release
+
+        try:
+            task_log_id = self.log_start(scheduled_at)
+            future = self.runner.submit(self.task_config)
+        except BaseException:
+            release.close()
+            raise
+
+        def finished(future_: Future):
+            try:
+                self.log_end(task_log_id, future_)
+            except Exception as e:
+                logger.error(
+                    f"Error logging the end of task {self.task_config.task_name}: {e}")
+            finally:
+                release.close()
+
+        future.add_done_callback(finished)
+
+        return future
+
+    def log_start(self, scheduled_at: Optional[datetime]) -> UUID:
+        """
+        Log the start of a run, in a session of its own.
+
+        Args:
+            scheduled_at (Optional[datetime]): The schedule fire time.
+
+        Returns:
+            UUID: The id of the run log.
+        """
+        task_log_id = uuid4()
+        with get_session(settings.POSTGRES_DBNAME_AUDIT) as session:
+            session.add(TaskLog(
+                talo_id=task_log_id,
+                talo_task_id=self.task_config.task_id,
+                talo_name=self.task_config.task_name,
+                talo_type=self.task_config.task_type,
+                talo_details=dict(self.task_config.task_details),
                 talo_start_time=datetime.now(),
+                talo_scheduled_at=scheduled_at,
                 talo_status="running",
-            )
-            session.add(task_log)
+            ))
             session.commit()
 
-            try:
-                if inspect.iscoroutinefunction(self.task_config.task_callable):
-                    result = asyncio.run(
-                        self.task_config.task_callable(
-                            *self.task_config.task_args,
-                            **self.task_config.task_details))
-                else:
-                    result = self.task_config.task_callable(
-                        *self.task_config.task_args, **self.task_config.task_details)
-
-                task_log.talo_success = True
-                task_log.talo_status = "success"
-                task_log.talo_details["result"] = result
+        return task_log_id
 
-            except Exception as e:
-                task_log.talo_success = False
-                task_log.talo_status = "failed"
-                task_log.talo_error_message = str(e)
-                task_log.talo_error_trace = traceback.format_exc()
+    def log_end(self, task_log_id: UUID, future: Future):
+        """
+        Log the end of a run and its result or error, in a session of its own.
 
-            finally:
-                task_log.talo_end_time = datetime.now()
-                session.commit()
+        Args:
+            task_log_id (UUID): The id of the run log.
+            future (Future): The finished future of the callable result.
+        """
+        error = CancelledError() if future.cancelled() else future.exception()
+        values = {"talo_end_time": datetime.now()}
+
+        if error is None:
+            values.update(
+                talo_success=True,
+                talo_status="success",
+                talo_details={
+                    **self.task_config.task_details, "result": future.result()},
+            )
+        else:
+            values.update(
+                talo_success=False,
+                talo_status="failed",
+                talo_error_message=str(error),
+                talo_error_trace="".join(traceback.format_exception(
+                    type(error), error, error.__traceback__)),
+            )
+
+        with get_session(settings.POSTGRES_DBNAME_AUDIT) as session:
+            session.execute(
+                update(TaskLog).where(TaskLog.talo_id == task_log_id).values(**values)
+            )
+            session.commit()
 
     # Generic function to set up scheduler
     def get_scheduler_trigger(self):
@@ -173,7 +357,8 @@ class ScheduledTask:
     def schedule(self, scheduler: Scheduler):
         trigger = self.get_scheduler_trigger()
         id_ = str(self.task_config.task_id)
-        scheduler.add_schedule(self.run, trigger, id=id_)
+        # Every schedule shares the ScheduledTask.run task, the runner caps each
+        scheduler.add_schedule(self.run, trigger, id=id_, max_running_jobs=None)
 
 
 class TaskOrchestrator:
@@ -181,18 +366,21 @@ class TaskOrchestrator:
         self.schedulers = {
             "background": create_scheduler("background"),
         }
+        self.runner = TaskRunner(settings.TASK_WORKERS)
 
     async def start(self):
+        self.runner.start()
         self.schedulers["background"].start_in_background()
 
     async def shutdown(self):
         self.schedulers["background"].remove_schedule("")
+        self.runner.stop()
 
     async def add_task(self, task_config: TaskConfig):
         scheduler = self.schedulers.get(task_config.schedule_type, None)
 
         if scheduler:
-            task = ScheduledTask(task_config)
+            task = ScheduledTask(task_config, self.runner)
             task.schedule(scheduler)
 
         else:
@@ -0,0 +1,216 @@
+import asyncio
+import inspect
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from threading import Lock, Thread
+from time import perf_counter
+from typing import Any, Dict, Iterator, List, Optional
+
+from backend.app.api.models.tasks import TaskConfig
+from backend.app.api.utils.metrics import LatencyHistogram
+
+
+class TaskRunStats:
+    """The run counters and timings of a task, in this process."""
+
+    def __init__(self, max_concurrency: int):
+        self.max_concurrency = max_concurrency
+        # Runs holding a slot, from their checks to their logs
+        self.active = 0
+        self.queued = 0
+        self.running = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.rejected = 0
+        self.queue_wait = LatencyHistogram()
+        self.run_time = LatencyHistogram()
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "queued": self.queued,
+            "running": self.running,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "queue_wait": self.queue_wait.summary(),
+            "run_time": self.run_time.summary(),
+        }
+
+
+class TaskRunner:
+    """
+    Runs the task callables away from the request threads.
+
+    Coroutine functions run on one long-lived event loop, so that their
+    asyncio connection pools outlive a single run, and plain functions on a
+    thread pool of max_workers threads. Each task runs at most
+    max_concurrency times at once in this process, further runs are rejected.
+    """
+
+    def __init__(self, max_workers: int = 4):
+        """
+        Args:
+            max_workers (int): The number of threads running plain functions.
+        """
+        self.max_workers = max_workers
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.loop_thread: Optional[Thread] = None
+        self.lock = Lock()
+        self.stats: Dict[str, TaskRunStats] = {}
+
+    def start(self) -> None:
+        """Starts the event loop thread and the thread pool, if not running."""
+        if self.loop is not None:
+            return
+
+        self.executor = ThreadPoolExecutor(
+            self.max_workers, thread_name_prefix="task-worker")
+        self.loop = asyncio.new_event_loop()
+        self.loop_thread = Thread(
+            target=self.loop.run_forever, name="task-loop", daemon=True)
+        self.loop_thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Stops the event loop and the thread pool, once the running tasks end.
+
+        Args:
+            timeout (Optional[float]): The maximum seconds to wait for the loop.
+        """
+        if self.loop is None:
+            return
+
+        self.executor.shutdown(wait=True)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.loop_thread.join(timeout)
+        if not self.loop.is_running():
+            self.loop.close()
+
+        self.executor, self.loop, self.loop_thread = None, None, None
+
+    def get_stats(self, task_config: TaskConfig) -> TaskRunStats:
+        stats = self.stats.get(task_config.task_name)
+        if stats is None:
+            stats = self.stats[task_config.task_name] = TaskRunStats(
+                task_config.max_concurrency)
+
+        return stats
+
+    @contextmanager
+    def slot(self, task_config: TaskConfig) -> Iterator[bool]:
+        """
+        Takes a run slot of a task, if it runs less than max_concurrency times.
+
+        Args:
+            task_config (TaskConfig): The task configuration.
+
+        Yields:
+            bool: Whether the slot was taken.
+        """
+        with self.lock:
+            stats = self.get_stats(task_config)
+            acquired = stats.active < task_config.max_concurrency
+            if acquired:
+                stats.active += 1
+            else:
+                stats.rejected += 1
+
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                with self.lock:
+                    stats.active -= 1
+
+    def submit(self, task_config: TaskConfig) -> Future:
+        """
+        Submits a run of a task callable, on the event loop or the thread pool.
+
+        Args:
+            task_config (TaskConfig): The task configuration.
+
+        Returns:
+            Future: The future of the callable result.
+        """
+        if self.loop is None:
+            raise RuntimeError("The task runner is not started.")
+
+        with self.lock:
+            stats = self.get_stats(task_config)
+            stats.queued += 1
+        submitted_at = perf_counter()
+
+        def started() -> float:
+            started_at = perf_counter()
+            with self.lock:
+                stats.queued -= 1
+                stats.running += 1
+                stats.queue_wait.record(started_at - submitted_at)
+
+            return started_at
+
+        def finished(started_at: float, success: bool) -> None:
+            with self.lock:
+                stats.running -= 1
+                stats.run_time.record(perf_counter() - started_at)
+                if success:
+                    stats.succeeded += 1
+                else:
+                    stats.failed += 1
+
+        callable_ = task_config.task_callable
+        args, kwargs = task_config.task_args, task_config.task_details
+
+        if inspect.iscoroutinefunction(callable_):
+            async def run_coroutine():
+                started_at = started()
+                try:
+                    result = await callable_(*args, **kwargs)
+                except BaseException:
+                    finished(started_at, False)
+                    raise
+                finished(started_at, True)
+
+                return result
+
+            return asyncio.run_coroutine_threadsafe(run_coroutine(), self.loop)
+
+        def run_function():
+            started_at = started()
+            try:
+                result = callable_(*args, **kwargs)
+            except BaseException:
+                finished(started_at, False)
+                raise
+            finished(started_at, True)
+
+            return result
+
+        return self.executor.submit(run_function)
+
+    def run(self, task_config: TaskConfig) -> Any:
+        """
+        Runs a task callable and waits for its result.
+
+        Args:
+            task_config (TaskConfig): The task configuration.
+
+        Returns:
+            Any: The callable result, its exceptions are raised.
+        """
+        return self.submit(task_config).result()
+
+    def summaries(self) -> List[Dict[str, Any]]:
+        """
+        Gets the run stats of the tasks.
+
+        Returns:
+            List[Dict[str, Any]]: The task name and run stats of each task.
+        """
+        with self.lock:
+            return [
+                {"task_name": task_name, **stats.summary()}
+                for task_name, stats in sorted(self.stats.items())
+            ]
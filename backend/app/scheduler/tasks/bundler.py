@@ -1,13 +1,21 @@
 from backend.app.scheduler.tasks.logs import (
-    cleanup_request_config,
-    cleanup_task_config,
-    cleanup_debug_config,
+    maintain_audit_partitions_config,
+    lookup_and_update_ip_info_config,
 )
+from backend.app.scheduler.tasks.metrics import (
+    rollup_request_latencies_config,
+    cleanup_latency_config,
+)
+from backend.app.scheduler.tasks.release import refresh_data_release_config
+from backend.app.setup.config import settings
 
 task_configs = [
-    cleanup_request_config,
-    cleanup_task_config,
-    cleanup_debug_config,
-    # # API consumption
-    # lookup_and_update_ip_info_config,
+    maintain_audit_partitions_config,
+    refresh_data_release_config,
+    rollup_request_latencies_config,
+    cleanup_latency_config,
 ]
+
+# API consumption
+if settings.IP_LOOKUP_ENABLED:
+    task_configs.append(lookup_and_update_ip_info_config)
@@ -1,121 +1,109 @@
-from datetime import timedelta
+from datetime import datetime, timezone
 
 from backend.app.database.base import get_session
-from backend.app.api.repositories.logs import (
-    RequestLogRepository,
-    TaskLogRepository,
-    DebuggingDatabaseHandler,
+from backend.app.api.repositories.logs import RequestLogRepository
+from backend.app.api.repositories.partitions import (
+    PartitionRepository,
+    PartitionSpec,
 )
 from backend.app.api.models.tasks import TaskConfig
 from backend.app.setup.config import settings
+from backend.app.setup.logging import logger
+
+# Audit tables partitioned by time, with the retention of their rows
+AUDIT_PARTITIONS = [
+    PartitionSpec(
+        "request_logs", "relo_inserted_at",
+        settings.AUDIT_PARTITION_PERIOD, settings.REQUEST_CLEANUP_AGE),
+    PartitionSpec(
+        "task_logs", "talo_inserted_at",
+        settings.AUDIT_PARTITION_PERIOD, settings.REQUEST_CLEANUP_AGE),
+    PartitionSpec(
+        "debug_logs", "delo_created_at",
+        settings.AUDIT_PARTITION_PERIOD, settings.DEBUG_CLEANUP_AGE),
+    PartitionSpec(
+        "request_timing", "rtlo_created_at",
+        settings.AUDIT_PARTITION_PERIOD, settings.REQUEST_CLEANUP_AGE),
+]
+
+# Suffix of the plain tables renamed by the partitioning migration
+UNPARTITIONED_SUFFIX = "_unpartitioned"
+
+
+def maintain_audit_partitions():
+    """
+    Creates the partitions of the audit tables ahead of time and drops the
+    expired ones.
 
+    Dropping a partition removes its rows at once, with no row scans, no dead
+    tuples to vacuum and only a brief lock on the table. Tables not migrated
+    yet still have their expired rows deleted, and the tables renamed by the
+    migration are dropped once all their rows expire.
 
-def cleanup_request_logs(time_delta: timedelta, max_rows: int = None):
+    Returns:
+        dict: The created and dropped partitions, or the deleted rows, of
+            each table.
     """
-    Cleans up requests logs based on either time or table row count.
+    results = {}
 
-    Args:
-        time_delta (timedelta): The time difference from now. Logs older than
-        this will be deleted.
-        max_rows (int, optional): The maximum number of rows to retain. If specified,
-        logs will be deleted based on their creation time and this count.
-    """
     with get_session(settings.POSTGRES_DBNAME_AUDIT) as db_session:
-        request_log_repository = RequestLogRepository(db_session)
-        if max_rows is not None:
-            request_log_repository.delete_excess_logs(max_rows)
-        else:
-            request_log_repository.delete_old_logs(time_delta)
+        partition_repository = PartitionRepository(db_session)
+
+        for spec in AUDIT_PARTITIONS:
+            cutoff = datetime.now(timezone.utc) - spec.retention
+
+            try:
+                if partition_repository.is_partitioned(spec.table):
+                    results[spec.table] = partition_repository.maintain(
+                        spec, settings.AUDIT_PARTITIONS_AHEAD)
+                else:
+                    logger.warning(
+                        f"Table {spec.table} is not partitioned, deleting its "
+                        "expired rows instead, see "
+                        "data/migrations/audit/0001_audit_tables_partitioned.sql."
+                    )
+                    results[spec.table] = {
+                        "deleted": partition_repository.delete_expired(
+                            spec.table, spec.column, cutoff),
+                    }
+
+                unpartitioned_table = spec.table + UNPARTITIONED_SUFFIX
+                if partition_repository.drop_table_if_expired(
+                        unpartitioned_table, spec.column, cutoff):
+                    results[unpartitioned_table] = {"dropped": [unpartitioned_table]}
+            except Exception as e:
+                # Another worker may be maintaining the same partitions
+                db_session.rollback()
+                logger.error(f"Error maintaining partitions of {spec.table}: {e}")
+
+    return results
 
 
 def lookup_and_update_ip_info_task():
     """
-    Cleans up requests logs based on either time or table row count.
+    Sets the IP information of the request logs missing it.
 
-    Args:
-        time_delta (timedelta): The time difference from now. Logs older than this
-        will be deleted.
-        max_rows (int, optional): The maximum number of rows to retain. If specified,
-        logs will be deleted based on their creation time and this count.
+    Returns:
+        dict: The number of addresses from the cache, resolved and not public,
+            and of updated logs.
     """
     with get_session(settings.POSTGRES_DBNAME_AUDIT) as db_session:
         request_log_repository = RequestLogRepository(db_session)
-        request_log_repository.lookup_and_update_ip_info()
-
-
-def cleanup_task_logs(time_delta: timedelta, max_rows: int = None):
-    """
-    Cleans up tasks logs based on either time or table row count.
-
-    Args:
-        time_delta (timedelta): The time difference from now. Logs older than this
-        will be deleted.
-        max_rows (int, optional): The maximum number of rows to retain. If specified,
-        logs will be deleted based on their creation time and this count.
-    """
-    with get_session(settings.POSTGRES_DBNAME_AUDIT) as db_session:
-        task_log_repository = TaskLogRepository(db_session)
-        if max_rows is not None:
-            task_log_repository.delete_excess_logs(max_rows)
-        else:
-            task_log_repository.delete_old_logs(time_delta)
+        return request_log_repository.lookup_and_update_ip_info(
+            batch_size=settings.IP_LOOKUP_BATCH_SIZE,
+            max_workers=settings.IP_LOOKUP_MAX_WORKERS,
+            ttl=settings.IP_INFO_TTL,
+        )
 
 
-def cleanup_debug_logs(time_delta: timedelta, max_rows: int = None):
-    """
-    Cleans up tasks logs based on either time or table row count.
-
-    Args:
-        time_delta (timedelta): The time difference from now. Logs older than
-        this will be deleted.
-        max_rows (int, optional): The maximum number of rows to retain. If specified,
-        logs will be deleted based on their creation time and this count.
-    """
-    with get_session(settings.POSTGRES_DBNAME_AUDIT) as db_session:
-        debug_log_repository = DebuggingDatabaseHandler(db_session)
-        if max_rows is not None:
-            debug_log_repository.delete_excess_logs(max_rows)
-        else:
-            debug_log_repository.delete_old_logs(time_delta)
-
-
-# Schedule the task to run at regular intervals
-cleanup_request_config = TaskConfig(
-    schedule_type="background",
-    schedule_params=settings.CLEANUP_CRON_KWARGS,
-    task_name="Cleanup request logs",
-    task_type="cron",
-    task_callable=cleanup_request_logs,
-    task_args=[
-        settings.REQUEST_CLEANUP_AGE,
-        settings.CLEANUP_MAX_ROWS,
-    ],
-)
-
-# Schedule the task to run at regular intervals
-cleanup_task_config = TaskConfig(
-    schedule_type="background",
-    schedule_params=settings.CLEANUP_CRON_KWARGS,
-    task_name="Cleanup task logs",
-    task_type="cron",
-    task_callable=cleanup_task_logs,
-    task_args=[
-        settings.REQUEST_CLEANUP_AGE,
-        settings.CLEANUP_MAX_ROWS,
-    ],
-)
-
 # Schedule the task to run at regular intervals
-cleanup_debug_config = TaskConfig(
+maintain_audit_partitions_config = TaskConfig(
     schedule_type="background",
     schedule_params=settings.CLEANUP_CRON_KWARGS,
-    task_name="Cleanup debug logs",
+    task_name="Maintain audit partitions",
     task_type="cron",
-    task_callable=cleanup_debug_logs,
-    task_args=[
-        settings.DEBUG_CLEANUP_AGE,
-        settings.CLEANUP_MAX_ROWS,
-    ],
+    task_callable=maintain_audit_partitions,
+    exclusive=True,
 )
 
 # Augment IPs with metadata
@@ -125,4 +113,5 @@ lookup_and_update_ip_info_config = TaskConfig(
     task_name="Augment IPs with metadata",
     task_type="cron",
     task_callable=lookup_and_update_ip_info_task,
+    exclusive=True,
 )
@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta, timezone
+
+from backend.app.database.base import get_session
+from backend.app.api.repositories.logs import RequestLatencyRollupRepository
+from backend.app.api.utils.metrics import request_latencies
+from backend.app.api.models.tasks import TaskConfig
+from backend.app.setup.config import settings
+
+
+def rollup_request_latencies():
+    """
+    Writes one aggregated row per method and route with the latencies
+    recorded since the previous rollup.
+
+    Returns:
+        dict: The number of rows written.
+    """
+    window_start, window_end, histograms = request_latencies.drain_window()
+
+    rollups = [
+        {
+            "rlro_window_start": datetime.fromtimestamp(window_start, timezone.utc),
+            "rlro_window_end": datetime.fromtimestamp(window_end, timezone.utc),
+            "rlro_method": method,
+            "rlro_route": route,
+            **{
+                f"rlro_{key}": value
+                for key, value in histogram.summary().items()
+            },
+        }
+        for (method, route), histogram in histograms.items()
+    ]
+
+    with get_session(settings.POSTGRES_DBNAME_AUDIT) as db_session:
+        written = RequestLatencyRollupRepository(db_session).create_many(rollups)
+
+    return {"rows": written}
+
+
+def cleanup_latency_rollups(time_delta: timedelta):
+    """
+    Cleans up latency rollups older than a time difference from now.
+
+    Args:
+        time_delta (timedelta): Rollups of windows older than this will be deleted.
+    """
+    with get_session(settings.POSTGRES_DBNAME_AUDIT) as db_session:
+        RequestLatencyRollupRepository(db_session).delete_old_logs(time_delta)
+
+
+# Roll the request latencies up at regular intervals
+rollup_request_latencies_config = TaskConfig(
+    schedule_type="background",
+    schedule_params=settings.LATENCY_ROLLUP_CRON_KWARGS,
+    task_name="Roll up request latencies",
+    task_type="cron",
+    task_callable=rollup_request_latencies,
+    # Every replica rolls up the latencies it recorded
+    exclusive=False,
+)
+
+# Schedule the task to run at regular intervals
+cleanup_latency_config = TaskConfig(
+    schedule_type="background",
+    schedule_params=settings.CLEANUP_CRON_KWARGS,
+    task_name="Cleanup latency rollups",
+    task_type="cron",
+    task_callable=cleanup_latency_rollups,
+    task_args=[settings.REQUEST_CLEANUP_AGE],
+    exclusive=True,
+)
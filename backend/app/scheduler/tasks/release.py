@@ -0,0 +1,67 @@
+from threading import Thread
+
+from backend.app.api.repositories.cache import cnpj_info_cache
+from backend.app.api.services.scrapper import CNPJScrapService
+from backend.app.api.models.tasks import TaskConfig
+from backend.app.setup.config import settings
+from backend.app.setup.logging import logger
+
+
+def refresh_data_release():
+    """
+    Sets the RFB data release on the CNPJ cache.
+
+    The release is the update date of the most recent RFB file, so a new
+    release invalidates every cached CNPJ profile at once.
+
+    Returns:
+        dict: The current release and whether it changed.
+    """
+    max_date = CNPJScrapService().max_update_at(settings.DATA_RELEASE_TIMEOUT)
+    release = max_date.isoformat()
+
+    return {
+        "release": release,
+        "changed": cnpj_info_cache.set_release(release),
+    }
+
+
+def fetch_data_release():
+    """
+    Sets the RFB data release on the CNPJ cache, logging a failure.
+
+    Until a release is set the cache is bypassed, so the scheduled refresh
+    sets it later on.
+    """
+    try:
+        refresh_data_release()
+    except Exception as e:
+        logger.error(f"Error fetching the data release, CNPJ cache disabled: {e}")
+
+
+def init_data_release() -> Thread:
+    """
+    Fetches the RFB data release for the CNPJ cache in the background.
+
+    The scrape waits on the RFB site, so requests are served meanwhile with
+    the cache bypassed until the release is set.
+
+    Returns:
+        Thread: The thread fetching the release.
+    """
+    thread = Thread(target=fetch_data_release, name="data-release", daemon=True)
+    thread.start()
+
+    return thread
+
+
+# Refresh the data release of the cache at regular intervals
+refresh_data_release_config = TaskConfig(
+    schedule_type="background",
+    schedule_params=settings.DATA_RELEASE_CRON_KWARGS,
+    task_name="Refresh data release",
+    task_type="cron",
+    task_callable=refresh_data_release,
+    # Every replica sets the release on its own cache
+    exclusive=False,
+)
@@ -1,6 +1,8 @@
 from datetime import timedelta
 from warnings import warn
 import platform
+import tempfile
+import os
 
 from typing import Optional, Dict, Literal, List, Any, Union
 
@@ -116,6 +118,46 @@ class Settings(BaseSettings):
     POSTGRES_DBNAME_RFB: str = ""
     POSTGRES_DBNAME_AUDIT: str = ""
 
+    # Connection pool of each sync engine, serving startup, tasks and audit logs
+    POSTGRES_POOL_SIZE: int = 10
+    POSTGRES_MAX_OVERFLOW: int = 10
+
+    # Connection pool of the asyncio engine of the RFB database, serving the
+    # CNPJ routes
+    POSTGRES_ASYNC_POOL_SIZE: int = 20
+    POSTGRES_ASYNC_MAX_OVERFLOW: int = 10
+
+    # Server-side prepared statements, disable behind transaction poolers
+    POSTGRES_PREPARED_STATEMENTS: bool = True
+
+    # Profile sections sent back-to-back on one connection, in pipeline mode
+    POSTGRES_PIPELINE: bool = True
+
+    # Maximum number of CNPJ profiles cached in process
+    CNPJ_CACHE_MAX_SIZE: int = 10000
+
+    # Import heavy modules on first use ("lazy") or preload them on startup ("eager")
+    STARTUP_MODE: Literal["lazy", "eager"] = "lazy"
+
+    # Lookup tables snapshot, memory-mapped by all workers of a host
+    LOOKUP_SNAPSHOT_ENABLED: bool = True
+    LOOKUP_SNAPSHOT_PATH: str = os.path.join(
+        tempfile.gettempdir(), "cnpj_api_lookups.snapshot")
+    LOOKUP_SNAPSHOT_MAX_AGE: timedelta = timedelta(days=1)
+
+    # Request logs, written to the audit database in batches
+    REQUEST_LOG_BATCH_SIZE: int = 500
+    REQUEST_LOG_FLUSH_INTERVAL: float = 1.0
+    REQUEST_LOG_QUEUE_SIZE: int = 10000
+
+    # Debug logs, written to the audit database in batches
+    DEBUG_LOG_BATCH_SIZE: int = 200
+    DEBUG_LOG_FLUSH_INTERVAL: float = 2.0
+    DEBUG_LOG_QUEUE_SIZE: int = 10000
+
+    # Scheduled tasks, functions run on a thread pool, coroutines on one loop
+    TASK_WORKERS: int = 4
+
     DEFAULT_RATE_LIMIT: str
     DEFAULT_BURST_RATE_LIMIT: str
     DEFAULT_RATE_LIMITS: List[str] = Field(default_factory=list)
@@ -137,6 +179,37 @@ class Settings(BaseSettings):
         "day_of_week": "*",  # Every day of the week
     }
 
+    # Request logs IP information, resolved over RDAP and cached per address
+    IP_LOOKUP_ENABLED: bool = False
+    IP_LOOKUP_BATCH_SIZE: int = 500
+    IP_LOOKUP_MAX_WORKERS: int = 8
+    IP_INFO_TTL: timedelta = timedelta(days=30)
+
+    # Define cron parameters for the RFB data release check
+    DATA_RELEASE_CRON_KWARGS: Dict[str, str] = {
+        "minute": "0",
+        "hour": "*/6",  # Runs every 6 hours
+        "day": "*",
+        "month": "*",
+        "day_of_week": "*",
+    }
+
+    # Seconds to wait for the RFB website when checking the data release
+    DATA_RELEASE_TIMEOUT: float = 10.0
+
+    # Define cron parameters for the request latency rollups
+    LATENCY_ROLLUP_CRON_KWARGS: Dict[str, str] = {
+        "minute": "*",  # Runs every minute
+        "hour": "*",
+        "day": "*",
+        "month": "*",
+        "day_of_week": "*",
+    }
+
+    # Audit tables partitions: their period and how many are created ahead
+    AUDIT_PARTITION_PERIOD: Literal["day", "month"] = "day"
+    AUDIT_PARTITIONS_AHEAD: int = 3
+
     # Define the age of request logs to be cleaned up
     REQUEST_CLEANUP_AGE: timedelta = timedelta(days=30)
 
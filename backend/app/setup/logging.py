@@ -6,6 +6,7 @@ from pythonjsonlogger import jsonlogger
 
 from backend.app.setup.config import settings
 from backend.app.api.dependencies.logs import get_debug_logs_handler
+from backend.app.api.repositories.logs import DebuggingDatabaseHandler
 
 # Advanced logger
 logger = logging.getLogger(__name__)
@@ -67,4 +68,12 @@ async def setup_logger():
             handlers=[stderr_stream_handler])
 
 
+def shutdown_logger():
+    """Removes the database logging handlers, once their records are written."""
+    for handler in list(logger.handlers):
+        if isinstance(handler, DebuggingDatabaseHandler):
+            logger.removeHandler(handler)
+            handler.close()
+
+
 logger.info("Logging started.")
@@ -3,8 +3,19 @@ from datetime import datetime
 import json
 import re
 
+from backend.app.utils.rows import map_column
+
 NumberList = List[Union[int, float]]
 
+# Patterns of humanize_string, compiled once
+SYMBOL_NUMBER_PATTERN = re.compile(r"(\W+)(\d+)")
+LETTER_NUMBER_PATTERN = re.compile(r"([A-Za-z]+)(\d+)")
+LEADING_ZEROS_PATTERN = re.compile(r"\b0+(\d+)")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+# Matches digits with an optional decimal part
+NUMBER_PATTERN = re.compile(r"^\d+(\.\d+)?$")
+
 
 def are(args: List[Any], validation_map: callable) -> bool:
     """
@@ -107,14 +118,14 @@ def humanize_string(s):
     """
 
     # Step 1: Separate letters and special characters from numbers
-    s = re.sub(r"(\W+)(\d+)", r"\1 \2", s)
-    s = re.sub(r"([A-Za-z]+)(\d+)", r"\1 \2", s)
+    s = SYMBOL_NUMBER_PATTERN.sub(r"\1 \2", s)
+    s = LETTER_NUMBER_PATTERN.sub(r"\1 \2", s)
 
     # Step 2: Remove leading zeros from numbers
-    s = re.sub(r"\b0+(\d+)", r"\1", s)
+    s = LEADING_ZEROS_PATTERN.sub(r"\1", s)
 
     # Step 3: Replace multiple spaces with a single space
-    s = re.sub(r"\s+", " ", s).strip()
+    s = WHITESPACE_PATTERN.sub(" ", s).strip()
 
     # Step 4: Capitalize the first letter of each word
     s = s.title()
@@ -149,9 +160,7 @@ def is_number(text: str) -> bool:
         bool: Whether the string is a number.
     """
 
-    # Matches digits with an optional decimal part
-    pattern = r"^\d+(\.\d+)?$"
-    return bool(re.match(pattern, text))
+    return bool(NUMBER_PATTERN.match(text))
 
 
 def are_numbers(lst: List[Union[str, int, float]],
@@ -378,6 +387,30 @@ def replace_spaces_on_list_tuple(lst: List[Tuple]) -> List[str]:
     return operate_on_list_tuple(lst, clean_spaces_map)
 
 
+def clean_columns(columns: Dict[str, List]) -> Dict[str, List]:
+    """
+    Replaces invalid fields with empty strings and multiple consecutive
+    spaces with a single space, column by column.
+
+    The column counterpart of replace_invalid_fields_on_list_tuple followed
+    by replace_spaces_on_list_tuple, evaluated once per distinct value.
+
+    Args:
+        columns (Dict[str, List]): The values of each column.
+
+    Returns:
+        The cleaned columns.
+    """
+
+    def clean_field_map(el):
+        return " ".join(str("" if not is_field_valid(el) else el).split())
+
+    return {
+        column: map_column(clean_field_map, values)
+        for column, values in columns.items()
+    }
+
+
 def replace_spaces(text):
     """
     This function replaces multiple consecutive spaces with a single space.
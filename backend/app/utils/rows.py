@@ -0,0 +1,118 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+
+def rows_to_dicts(rows: Iterable[Sequence], columns: List[str]) -> List[Dict]:
+    """
+    Maps database rows to dictionaries keyed by column name.
+
+    Args:
+        rows (Iterable[Sequence]): The fetched rows, in column order.
+        columns (List[str]): The column names.
+
+    Returns:
+        List[Dict]: One dictionary per row.
+    """
+    return [dict(zip(columns, row)) for row in rows]
+
+
+def rows_to_nested_dict(
+    rows: Iterable[Sequence],
+    columns: List[str],
+    index_col: str,
+    index_map: Optional[Callable[[Any], Any]] = None,
+) -> Dict[Any, Dict]:
+    """
+    Maps database rows to a dictionary with nested structure.
+
+    The row-based counterpart of dataframe_to_nested_dict: later rows with
+    the same index value replace earlier ones.
+
+    Args:
+        rows (Iterable[Sequence]): The fetched rows, in column order.
+        columns (List[str]): The column names.
+        index_col (str): The column to use as the key.
+        index_map (Callable, optional): Applied to the key. Defaults to None.
+
+    Returns:
+        dict: A dictionary with keys as values from the index column,
+            and values as dictionaries containing other columns as key-value pairs.
+
+    Raises:
+        ValueError: If the provided index_col is not one of the columns.
+    """
+    if index_col not in columns:
+        raise ValueError(f"Column '{index_col}' does not exist in the columns.")
+
+    index = columns.index(index_col)
+    other_columns = [
+        (position, column)
+        for position, column in enumerate(columns)
+        if position != index
+    ]
+
+    result = {}
+
+    for row in rows:
+        key = row[index] if index_map is None else index_map(row[index])
+        result[key] = {column: row[position] for position, column in other_columns}
+
+    return result
+
+
+def rows_to_columns(
+    rows: Iterable[Sequence], columns: List[str]
+) -> Dict[str, List]:
+    """
+    Transposes database rows into one list of values per column.
+
+    Args:
+        rows (Iterable[Sequence]): The fetched rows, in column order.
+        columns (List[str]): The column names.
+
+    Returns:
+        Dict[str, List]: The values of each column, in row order.
+    """
+    values = list(zip(*rows))
+    values = values if values else [()] * len(columns)
+
+    return {column: list(column_values) for column, column_values in zip(columns, values)}
+
+
+def columns_to_dicts(columns: Dict[str, List]) -> List[Dict]:
+    """
+    Transposes columns of values back into one dictionary per row.
+
+    Args:
+        columns (Dict[str, List]): The values of each column, in row order.
+
+    Returns:
+        List[Dict]: One dictionary per row, with keys in column order.
+    """
+    names = list(columns)
+
+    return [dict(zip(names, row)) for row in zip(*columns.values())]
+
+
+def map_column(func: Callable[[Any], Any], column: Iterable) -> List:
+    """
+    Applies a function to a column, once per distinct value.
+
+    Result columns repeat values a lot (cities, dates, codes), so the
+    function runs on the distinct values only.
+
+    Args:
+        func (Callable): The function to apply. It must be deterministic.
+        column (Iterable): The hashable column values.
+
+    Returns:
+        List: The mapped values, in column order.
+    """
+    cache = {}
+
+    def cached_func(value):
+        if value not in cache:
+            cache[value] = func(value)
+
+        return cache[value]
+
+    return [cached_func(value) for value in column]
@@ -0,0 +1,195 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+from backend.app.api.middlewares.logs import (
+    RequestTrackingMiddleware,
+    UNMATCHED_ROUTE,
+    build_request_log,
+)
+from backend.app.api.utils.metrics import LatencyRecorder
+
+CHUNKS = [b"a" * 1000, b"b" * 500, b"c"]
+
+
+async def stream_chunks(request):
+    async def chunks():
+        for chunk in CHUNKS:
+            yield chunk
+
+    return StreamingResponse(chunks(), media_type="text/plain")
+
+
+async def small_json(request):
+    return JSONResponse({"status": "OK"}, status_code=201)
+
+
+async def failing(request):
+    raise RuntimeError("boom")
+
+
+app = Starlette(routes=[
+    Route("/stream", stream_chunks),
+    Route("/json", small_json, methods=["POST"]),
+    Route("/fail", failing),
+])
+
+
+@pytest.fixture
+def submit_log(mocker):
+    return mocker.patch(
+        "backend.app.api.middlewares.logs.submit_request_log")
+
+
+@pytest.fixture(autouse=True)
+def latencies(mocker):
+    recorder = LatencyRecorder()
+    mocker.patch("backend.app.api.middlewares.logs.request_latencies", recorder)
+    return recorder
+
+
+async def call(path, method="GET", headers=()):
+    """Calls the middleware directly and returns the sent messages."""
+    scope = {
+        "type": "http",
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"q=1",
+        "root_path": "",
+        "headers": [
+            (b"host", b"testserver"), (b"user-agent", b"pytest"), *headers],
+        "client": ("10.0.0.1", 1234),
+        "server": ("testserver", 80),
+    }
+    messages = []
+    requests = [{"type": "http.request", "body": b"", "more_body": False}]
+
+    async def receive():
+        # Then wait, as if the client stayed connected
+        if requests:
+            return requests.pop()
+        await asyncio.Event().wait()
+
+    async def send(message):
+        messages.append(message)
+
+    await RequestTrackingMiddleware(app)(scope, receive, send)
+
+    return messages
+
+
+@pytest.mark.asyncio
+async def test_streams_chunks_through_and_counts_bytes(submit_log):
+    """Tests that chunks are sent as they come and their sizes added up."""
+    messages = await call("/stream")
+
+    bodies = [m["body"] for m in messages if m["type"] == "http.response.body"]
+    assert [body for body in bodies if body] == CHUNKS
+
+    request_data, response_data, process_time = submit_log.call_args.args
+    assert response_data["status_code"] == 200
+    assert response_data["response_size"] == sum(map(len, CHUNKS))
+    assert request_data["url"] == "http://testserver/stream?q=1"
+    assert request_data["client_host"] == "10.0.0.1"
+    assert request_data["user_agent"] == "pytest"
+    assert process_time >= 0
+
+
+@pytest.mark.asyncio
+async def test_logs_status_and_size_of_plain_responses(submit_log):
+    """Tests plain responses, sent in a single body message."""
+    messages = await call("/json", method="POST")
+
+    assert messages[-1]["body"] == b'{"status":"OK"}'
+
+    _, response_data, _ = submit_log.call_args.args
+    assert response_data["status_code"] == 201
+    assert response_data["response_size"] == len(b'{"status":"OK"}')
+
+
+@pytest.mark.asyncio
+async def test_logs_failed_requests(submit_log):
+    """Tests that unhandled errors propagate and are still logged."""
+    with pytest.raises(RuntimeError):
+        await call("/fail")
+
+    _, response_data, _ = submit_log.call_args.args
+    assert response_data["status_code"] == 500
+    assert response_data["response_size"] == len(b"Internal Server Error")
+
+
+def response_headers(messages):
+    start = next(m for m in messages if m["type"] == "http.response.start")
+    return dict(start["headers"])
+
+
+@pytest.mark.asyncio
+async def test_sets_request_id(submit_log):
+    """Tests that responses carry a new request identifier."""
+    messages = await call("/json", method="POST")
+
+    request_id = response_headers(messages)[b"x-request-id"].decode()
+    assert len(request_id) == 32
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("given_id, is_kept", [
+    (b"3f2c9a1e-client-7", True),
+    (b"not valid!", False),
+    (b"a" * 129, False),
+])
+async def test_keeps_well_formed_client_request_id(submit_log, given_id, is_kept):
+    """Tests that well-formed identifiers given by clients are kept."""
+    messages = await call("/json", method="POST", headers=[(b"x-request-id", given_id)])
+
+    request_id = response_headers(messages)[b"x-request-id"]
+    assert (request_id == given_id) is is_kept
+
+
+def test_records_latency_per_route_template(submit_log, latencies):
+    """Tests that latencies are keyed by route template, not by path."""
+    fastapi_app = FastAPI()
+    fastapi_app.add_middleware(RequestTrackingMiddleware)
+
+    @fastapi_app.get("/cnpjs/{cnpj}")
+    async def get_cnpj(cnpj: str):
+        return {"cnpj": cnpj}
+
+    with TestClient(fastapi_app) as client:
+        client.get("/cnpjs/11222333000181")
+        client.get("/cnpjs/33000167000101")
+        client.get("/missing")
+
+    _, _, window = latencies.drain_window()
+    assert window[("GET", "/cnpjs/{cnpj}")].count == 2
+    assert window[("GET", UNMATCHED_ROUTE)].count == 1
+    assert submit_log.call_count == 3
+
+
+def test_build_request_log():
+    """Tests the request log built from the request and response data."""
+    request_data = {
+        "method": "GET",
+        "url": "http://testserver/stream?q=1",
+        "headers": {"host": "testserver"},
+        "client_host": "10.0.0.1",
+        "user_agent": "pytest",
+        "request_url": "http://testserver/stream?q=1",
+    }
+    response_data = {"status_code": 200, "headers": {}, "response_size": 1501}
+
+    log = build_request_log(request_data, response_data, 0.1234567)
+
+    assert log.relo_method == "GET"
+    assert log.relo_status_code == 200
+    assert log.relo_ip_address == "10.0.0.1"
+    assert log.relo_response_size == 1501
+    assert log.relo_request_duration_seconds == 0.123457
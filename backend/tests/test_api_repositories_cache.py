@@ -0,0 +1,110 @@
+from backend.app.api.repositories.cache import (
+    InMemorySharedCache,
+    LRUCache,
+    ReleaseCache,
+    SharedCache,
+)
+
+
+def test_lru_cache_evicts_least_recently_used():
+    """Tests that reads refresh keys and the oldest key is evicted."""
+    cache = LRUCache(2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert "a" in cache and "c" in cache
+    assert "b" not in cache
+    assert len(cache) == 2
+    assert cache.evictions == 1
+
+
+def test_release_cache_splits_found_and_missing_keys():
+    """Tests that cached keys are returned, including cached None values."""
+    cache = ReleaseCache("test", 10)
+    cache.set_release("2024-04-01")
+    cache.set_many({"a": {"x": 1}, "b": None})
+
+    found, missing = cache.get_many(["a", "b", "c"])
+
+    assert found == {"a": {"x": 1}, "b": None}
+    assert missing == ["c"]
+
+
+def test_release_cache_invalidates_on_new_release():
+    """Tests that a new release drops the entries, and the same one does not."""
+    cache = ReleaseCache("test", 10)
+    assert cache.set_release("2024-04-01") is True
+    cache.set_many({"a": 1})
+
+    assert cache.set_release("2024-04-01") is False
+    assert cache.get_many(["a"]) == ({"a": 1}, [])
+
+    assert cache.set_release("2024-05-01") is True
+    assert cache.get_many(["a"]) == ({}, ["a"])
+
+
+def test_release_cache_falls_back_to_shared_tier():
+    """Tests that another process' entries are read and kept locally."""
+    shared = InMemorySharedCache()
+    writer = ReleaseCache("test", 10, shared)
+    reader = ReleaseCache("test", 10, shared)
+    for cache in (writer, reader):
+        cache.set_release("2024-04-01")
+
+    writer.set_many({"a": 1})
+
+    assert shared.items == {"test:2024-04-01:a": 1}
+    assert reader.get_many(["a", "b"]) == ({"a": 1}, ["b"])
+    assert reader.get_many(["a"]) == ({"a": 1}, [])
+    assert reader.stats()["shared_hits"] == 1
+    assert reader.stats()["local_hits"] == 1
+
+
+def test_release_cache_bypassed_without_release():
+    """Tests that nothing is cached on either tier until a release is set."""
+    shared = InMemorySharedCache()
+    cache = ReleaseCache("test", 10, shared)
+    cache.set_many({"a": 1})
+
+    assert cache.get_many(["a"]) == ({}, ["a"])
+    assert shared.items == {}
+    assert cache.stats()["size"] == 0
+    assert cache.stats()["misses"] == 1
+
+
+def test_release_cache_ignores_shared_tier_errors():
+    """Tests that a failing shared tier degrades to the in-process tier."""
+    class BrokenSharedCache(SharedCache):
+        def get_many(self, keys):
+            raise ConnectionError("unreachable")
+
+        def set_many(self, items):
+            raise ConnectionError("unreachable")
+
+    cache = ReleaseCache("test", 10, BrokenSharedCache())
+    cache.set_release("2024-04-01")
+    cache.set_many({"a": 1})
+
+    assert cache.get_many(["a", "b"]) == ({"a": 1}, ["b"])
+
+
+def test_release_cache_stats():
+    """Tests the hit, miss and eviction counters."""
+    cache = ReleaseCache("test", 1)
+    cache.set_release("2024-04-01")
+    cache.set_many({"a": 1, "b": 2})
+    cache.get_many(["a", "b"])
+
+    assert cache.stats() == {
+        "name": "test",
+        "release": "2024-04-01",
+        "size": 1,
+        "max_size": 1,
+        "local_hits": 1,
+        "shared_hits": 0,
+        "misses": 1,
+        "evictions": 1,
+        "releases": 1,
+    }
@@ -0,0 +1,586 @@
+import inspect
+from unittest import mock
+
+import pytest
+from sqlalchemy.exc import ProgrammingError
+
+from backend.app.api.models.cnpj import CNPJ
+from backend.app.setup.config import settings
+from backend.app.api.utils.misc import encode_cursor
+from backend.app.api.utils.fuzzy import FuzzyMatcher
+from backend.app.api.utils.search import PrefixSearchIndex
+from backend.app.api.repositories.cache import ReleaseCache
+from backend.app.database.base import Database
+from backend.app.api.repositories.cnpj import (
+    CNPJRepository,
+    AsyncCNPJRepository,
+    ESTABLISHMENT_COLUMNS,
+    CNAE_SIDE_CODES_COLUMN,
+    CNAE_SIDE_CODES_EXPRESSION,
+)
+
+
+@pytest.fixture(autouse=True)
+def info_cache(mocker):
+    """Replaces the CNPJ information cache with an empty one per test."""
+    cache = ReleaseCache("cnpj_info", 100)
+    cache.set_release("2024-04-12T00:00:00")
+    mocker.patch("backend.app.api.repositories.cnpj.cnpj_info_cache", cache)
+
+    return cache
+
+
+@pytest.fixture
+def profile_session(mocker):
+    """Returns a mocked session, for the repository session."""
+    mocker.patch.object(settings, "POSTGRES_PREPARED_STATEMENTS", False)
+
+    return mock.MagicMock()
+
+
+def test_get_cnpjs_profile_runs_a_single_query(profile_session):
+    """Tests that all profile sections come from one statement on one session."""
+    establishment_row = ("12345678", "9012", "30") + \
+        ("",) * (len(ESTABLISHMENT_COLUMNS) - 3)
+    company_row = ("12345678", "ACME", "", "1", "10.0", "2062-Sociedade")
+    partners_row = ("12345678", [{"nome": "FULANO", "qual": "49-Socio"}])
+    simples_row = ("12345678", {"optante": "true"}, {"optante": "false"})
+    profile_session.execute.return_value.fetchall.return_value = [
+        establishment_row + company_row + partners_row + simples_row,
+    ]
+
+    repository = CNPJRepository(profile_session)
+    profile = repository.get_cnpjs_profile([CNPJ("12345678", "9012", "30")])
+
+    assert profile_session.execute.call_count == 1
+    assert profile["establishment"] == [establishment_row]
+    assert profile["company"] == [company_row]
+    assert profile["partners"] == [partners_row]
+    assert profile["simples_simei"] == [simples_row]
+
+
+def test_get_cnpjs_profile_binds_composite_keys(profile_session):
+    """Tests that CNPJs are matched on exact (basico, ordem, dv) rows."""
+    profile_session.execute.return_value.fetchall.return_value = []
+
+    repository = CNPJRepository(profile_session)
+    repository.get_cnpjs_profile(
+        [CNPJ("12345678", "9012", "30"), CNPJ("00000001", "0001", "05")],
+        ["establishment"])
+
+    query, params = profile_session.execute.call_args.args
+    assert "unnest" in str(query)
+    assert "in (select" not in str(query)
+    assert params == {
+        "cnpj_basicos": ["12345678", "1"],
+        "cnpj_ordens": ["9012", "1"],
+        "cnpj_dvs": ["30", "5"],
+    }
+
+
+def test_get_cnpjs_profile_skips_missing_sections(profile_session):
+    """Tests that sections without a match are left empty."""
+    company_row = ("12345678", "ACME", "", "1", "10.0", "2062-Sociedade")
+    profile_session.execute.return_value.fetchall.return_value = [
+        company_row + (None, None),
+    ]
+
+    repository = CNPJRepository(profile_session)
+    profile = repository.get_cnpjs_profile(
+        [CNPJ("12345678", "9012", "30")], ["company", "partners"])
+
+    assert list(profile.keys()) == ["company", "partners"]
+    assert profile["company"] == [company_row]
+    assert profile["partners"] == []
+
+
+def test_get_cnpjs_profile_empty_list(profile_session):
+    """Tests that an empty batch does not hit the database."""
+    repository = CNPJRepository(profile_session)
+    profile = repository.get_cnpjs_profile([])
+
+    profile_session.execute.assert_not_called()
+    assert all(rows == [] for rows in profile.values())
+
+
+def test_sync_lookups_use_the_repository_session(mocker, profile_session):
+    """Tests that the CNPJ lookups run on the session the repository was given."""
+    mocker.patch.object(CNPJRepository, "_build_establishments", return_value=[])
+    mocker.patch.object(CNPJRepository, "_build_activities", return_value={})
+    profile_session.execute.return_value.fetchall.return_value = []
+
+    repository = CNPJRepository(profile_session)
+    repository.get_cnpj_establishments(CNPJ("12345678", "9012", "30"))
+    repository.get_cnpj_activities(CNPJ("12345678", "9012", "30"))
+
+    assert profile_session.execute.call_count == 2
+
+
+def test_keyset_condition_without_cursor():
+    """Tests that offset pagination is kept when no cursor is given."""
+    condition, offset, params = CNPJRepository.keyset_condition(None, 20)
+
+    assert condition == "1=1"
+    assert offset == 20
+    assert params == {}
+
+
+def test_keyset_condition_with_cursor():
+    """Tests that a cursor replaces the offset by a bound row comparison."""
+    cursor = encode_cursor(("12345678", "1", "30"))
+    condition, offset, params = CNPJRepository.keyset_condition(cursor, 20)
+
+    assert condition.startswith("(cnpj_basico, cnpj_ordem, cnpj_dv) >")
+    assert offset == 0
+    assert params == {
+        "cursor_basico": "12345678",
+        "cursor_ordem": "1",
+        "cursor_dv": "30",
+    }
+
+
+def test_keyset_condition_distinct_base():
+    """Tests that base-distinct queries page on the CNPJ base only."""
+    cursor = encode_cursor(("12345678", "1", "30"))
+    condition, _, _ = CNPJRepository.keyset_condition(
+        cursor, 0, distinct_base=True)
+
+    assert condition == "cnpj_basico > :cursor_basico"
+
+
+def test_next_cursor():
+    """Tests that only full pages produce a next cursor."""
+    keys = [("1", "1", "10"), ("2", "1", "20")]
+
+    assert CNPJRepository.next_cursor(keys, 2) == encode_cursor(keys[-1])
+    assert CNPJRepository.next_cursor(keys, 3) is None
+
+
+def test_cnae_condition_uses_secondary_cnae_array():
+    """Tests that secondary CNAEs are matched on the indexed array column."""
+    condition, params = CNPJRepository.cnae_condition(["0111301", "6201501"])
+
+    assert condition == (
+        "(cnae_fiscal_principal = any(cast(:cnae_main_codes as text[])) or "
+        "cnae_fiscal_secundaria_array && cast(:cnae_side_codes as int[]))"
+    )
+    assert params == {
+        "cnae_main_codes": ["111301", "6201501"],
+        "cnae_side_codes": [111301, 6201501],
+    }
+
+
+def test_cnae_condition_main_only():
+    """Tests that the main CNAE filter skips secondary CNAEs."""
+    condition, params = CNPJRepository.cnae_condition(["6201501"], False)
+
+    assert condition == (
+        "(cnae_fiscal_principal = any(cast(:cnae_main_codes as text[])))"
+    )
+    assert params == {"cnae_main_codes": ["6201501"]}
+
+
+def test_cnae_condition_without_secondary_cnae_array(mocker):
+    """Tests that secondary CNAEs fall back to the text column when the array is missing."""
+    mocker.patch.object(CNPJRepository, "cnae_side_codes_sql", CNAE_SIDE_CODES_COLUMN)
+    CNPJRepository.use_cnae_side_codes_column(False)
+
+    condition, _ = CNPJRepository.cnae_condition(["6201501"])
+
+    assert "cnae_fiscal_secundaria_array" not in condition
+    assert f"{CNAE_SIDE_CODES_EXPRESSION} && cast(:cnae_side_codes" in condition
+    assert "cnae_fiscal_secundaria_array" not in CNPJRepository.get_activities_query()
+
+
+def test_execute_query_falls_back_on_missing_array_column(mocker):
+    """Tests that an undefined array column switches the queries to the text column."""
+    mocker.patch.object(settings, "POSTGRES_PREPARED_STATEMENTS", False)
+    mocker.patch.object(CNPJRepository, "cnae_side_codes_sql", CNAE_SIDE_CODES_COLUMN)
+    orig = Exception('column est.cnae_fiscal_secundaria_array does not exist')
+    orig.pgcode = "42703"
+    session = mock.MagicMock()
+    session.execute.side_effect = ProgrammingError("select", {}, orig)
+
+    with pytest.raises(ProgrammingError):
+        CNPJRepository.execute_query(
+            session,
+            "cnpj_activities",
+            CNPJRepository.get_activities_query(),
+            {"cnpj_basico": ["12345678"]},
+        )
+
+    assert CNPJRepository.cnae_side_codes_sql == CNAE_SIDE_CODES_EXPRESSION
+
+
+def test_cnae_condition_invalid_code():
+    """Tests that non-numeric codes are rejected before reaching the query."""
+    with pytest.raises(ValueError):
+        CNPJRepository.cnae_condition(["6201501' or '1'='1"])
+
+
+def test_get_cnpjs_by_states_binds_values(mocker):
+    """Tests that batch values and pagination are bound, not inlined."""
+    mocker.patch.object(settings, "POSTGRES_PREPARED_STATEMENTS", False)
+    mocker.patch.object(CNPJRepository, "get_cnpjs_info", return_value={})
+    session = mock.MagicMock()
+    session.execute.return_value.fetchall.return_value = []
+
+    repository = CNPJRepository(session)
+    repository.get_cnpjs_by_states(["SP", "RJ"], limit=5, offset=10)
+
+    query, params = session.execute.call_args.args
+    assert "'SP'" not in str(query)
+    assert params == {"states": ["SP", "RJ"], "limit": 5, "offset": 10}
+
+
+@pytest.fixture
+def async_profile_session():
+    """Returns a mocked asyncio connection, for the request connection."""
+    session = mock.MagicMock()
+    session.execute = mock.AsyncMock(return_value=mock.MagicMock())
+
+    return session
+
+
+@pytest.mark.asyncio
+async def test_async_get_cnpjs_info_single_statement_without_pipeline(
+        mocker, async_profile_session):
+    """Tests that without pipelining the profile is one statement on the request connection."""
+    mocker.patch.object(settings, "POSTGRES_PIPELINE", False)
+    build_info = mocker.patch.object(
+        AsyncCNPJRepository, "_build_cnpjs_info", return_value=[])
+    async_profile_session.execute.return_value.fetchall.return_value = []
+    request_connection = mock.MagicMock()
+    request_connection.get = mock.AsyncMock(return_value=async_profile_session)
+
+    repository = AsyncCNPJRepository(request_connection)
+    await repository.get_cnpjs_info([CNPJ("12345678", "9012", "30")])
+
+    assert async_profile_session.execute.await_count == 1
+    request_connection.get.assert_awaited_once()
+
+    profile, _ = build_info.call_args.args
+    assert list(profile.keys()) == [
+        "establishment", "company", "partners", "simples_simei"]
+
+
+@pytest.mark.asyncio
+async def test_async_get_cnpjs_info_pipelines_sections(mocker):
+    """Tests that the profile sections are pipelined in one batch, in order."""
+    mocker.patch.object(settings, "POSTGRES_PIPELINE", True)
+    build_info = mocker.patch.object(
+        AsyncCNPJRepository, "_build_cnpjs_info", return_value=[])
+    company_row = ("12345678", "ACME", "", "1", "10.0", "2062-Sociedade")
+    fetch = mocker.patch(
+        "backend.app.api.repositories.cnpj.execute_pipeline",
+        mock.AsyncMock(return_value=[[], [company_row, company_row], [], []]))
+    request_connection = mock.MagicMock()
+    request_connection.get = mock.AsyncMock()
+
+    repository = AsyncCNPJRepository(request_connection)
+    await repository.get_cnpjs_info([CNPJ("12345678", "9012", "30")])
+
+    connection, statements = fetch.await_args.args
+    assert connection is request_connection.get.return_value
+    assert len(statements) == 4
+    assert all(params["cnpj_basicos"] == ["12345678"] for _, params in statements)
+
+    profile, _ = build_info.call_args.args
+    assert profile == {
+        "establishment": [],
+        "company": [company_row],
+        "partners": [],
+        "simples_simei": [],
+    }
+
+
+@pytest.mark.asyncio
+async def test_async_get_cnpjs_profile_shares_the_row_split(async_profile_session):
+    """Tests that the asyncio profile splits rows like the sync variant."""
+    company_row = ("12345678", "ACME", "", "1", "10.0", "2062-Sociedade")
+    async_profile_session.execute.return_value.fetchall.return_value = [
+        company_row + (None, None),
+    ]
+
+    request_connection = mock.MagicMock()
+    request_connection.get = mock.AsyncMock(return_value=async_profile_session)
+
+    repository = AsyncCNPJRepository(request_connection)
+    profile = await repository.get_cnpjs_profile(
+        [CNPJ("12345678", "9012", "30")], ["company", "partners"])
+
+    query, params = async_profile_session.execute.call_args.args
+    assert "unnest" in str(query)
+    assert params["cnpj_basicos"] == ["12345678"]
+    assert profile == {"company": [company_row], "partners": []}
+
+
+@pytest.mark.asyncio
+async def test_async_lookups_share_the_request_connection():
+    """Tests that the lookups of a request check out a single connection."""
+    connection = mock.MagicMock()
+    connection.execute = mock.AsyncMock(return_value=mock.MagicMock())
+    connection.close = mock.AsyncMock()
+    database = mock.MagicMock()
+    database.checkout = mock.AsyncMock(return_value=connection)
+
+    async with Database.request_connection(database) as request_connection:
+        repository = AsyncCNPJRepository(request_connection)
+        await repository.city_exists("SAO PAULO")
+        await repository.city_exists("CAMPINAS")
+
+    assert database.checkout.await_count == 1
+    assert connection.execute.await_count == 2
+    connection.close.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_request_connection_unused():
+    """Tests that requests without lookups do not check a connection out."""
+    database = mock.MagicMock()
+    database.checkout = mock.AsyncMock()
+
+    async with Database.request_connection(database):
+        pass
+
+    database.checkout.assert_not_awaited()
+
+
+def test_build_partners_maps_rows_by_cnpj():
+    """Tests that partner rows are keyed by the requested raw CNPJs."""
+    repository = CNPJRepository(mock.MagicMock())
+    partners_row = ("12345678", "[{'nome': 'FULANO', 'qual': '49-Socio'}]")
+
+    partners = repository._build_partners(
+        [partners_row],
+        [CNPJ("12345678", "9012", "30"), CNPJ("00000001", "0001", "05")])
+
+    assert partners == {
+        "12345678901230": {"qsa": [{"nome": "FULANO", "qual": "49-Socio"}]},
+    }
+
+
+def test_build_activities_without_side_activities():
+    """Tests that an empty secondary CNAE list is returned as empty."""
+    repository = CNPJRepository(mock.MagicMock())
+    activities_row = (
+        "12345678", "{'code': '6201501', 'text': 'Software'}", "[{}]")
+
+    activities = repository._build_activities([activities_row])
+
+    assert activities == {
+        "atividade_principal": {"code": "6201501", "text": "Software"},
+        "atividades_secundarias": [],
+    }
+
+
+@pytest.fixture
+def lookup_repository(mocker):
+    """Returns a repository with minimal code lookup tables."""
+    lookups = {
+        "cnaes_dict": {"6201501": {"code": "6201501", "text": "Software"}},
+        "cities_dict": {"7107": {"code": "7107", "text": "SAO PAULO"}},
+        "registration_statuses_dict": {"1": {"code": "1", "text": "Extinta"}},
+        "company_situation_dict": {"2": "ATIVA"},
+        "establishment_type_dict": {"1": "MATRIZ", "2": "FILIAL"},
+    }
+    for name, lookup in lookups.items():
+        mocker.patch.object(CNPJRepository, name, lookup, create=True)
+
+    return CNPJRepository(mock.MagicMock())
+
+
+def establishment_row(**fields):
+    """Builds an establishment row, in ESTABLISHMENT_COLUMNS order."""
+    row = dict.fromkeys(ESTABLISHMENT_COLUMNS, None)
+    row.update({
+        "cnpj_basico": "12345678",
+        "situacao_cadastral": "2",
+        "identificador_matriz_filial": "1",
+        "municipio": "7107",
+    })
+    row.update(fields)
+
+    return tuple(row[column] for column in ESTABLISHMENT_COLUMNS)
+
+
+def test_build_establishments_formats_columns_in_branch_order(lookup_repository):
+    """Tests that branches are sorted by order and formatted column-wise."""
+    rows = [
+        establishment_row(
+            cnpj_ordem="0002", cnpj_dv="11", identificador_matriz_filial="2",
+            nome_fantasia="LOJA  02", cep="1310100", data_inicio_atividade="20200131",
+            cnae_fiscal_secundaria="6201501,9999999"),
+        establishment_row(
+            cnpj_ordem="0001", cnpj_dv="30", nome_fantasia="nan",
+            tipo_logradouro="RUA", logradouro="DAS FLORES",
+            cnae_fiscal_principal="6201501"),
+    ]
+
+    establishments = lookup_repository._build_establishments(rows)
+
+    assert [establishment["cnpj"] for establishment in establishments] == [
+        "12.345.678/0001-30", "12.345.678/0002-11"]
+    matriz, filial = establishments
+    assert matriz["tipo"] == "MATRIZ"
+    assert matriz["fantasia"] == ""
+    assert matriz["logradouro"] == "Rua Das Flores"
+    assert matriz["municipio"] == "Sao Paulo"
+    assert matriz["atividade_principal"] == {"code": "6201501", "text": "Software"}
+    assert filial["tipo"] == "FILIAL"
+    assert filial["fantasia"] == "Loja 2"
+    assert filial["cep"] == "01.310-100"
+    assert filial["abertura"] == "31/01/2020"
+    assert filial["situacao"] == "ATIVA"
+    assert filial["atividades_secundarias"] == [
+        {"code": "6201501", "text": "Software"}]
+
+
+def test_build_establishment_keeps_last_row_per_cnpj(lookup_repository):
+    """Tests that duplicated CNPJ rows collapse into the last one."""
+    rows = [
+        establishment_row(cnpj_ordem="1", cnpj_dv="30", nome_fantasia="OLD"),
+        establishment_row(cnpj_ordem="2", cnpj_dv="11"),
+        establishment_row(
+            cnpj_ordem="1", cnpj_dv="30", nome_fantasia="NEW",
+            motivo_situacao_cadastral="1"),
+    ]
+
+    establishments = lookup_repository._build_establishment(rows)
+
+    assert list(establishments) == ["12345678000130", "12345678000211"]
+    establishment = establishments["12345678000130"]
+    assert establishment["fantasia"] == "New"
+    assert establishment["motivo_situacao"] == {"code": "1", "text": "Extinta"}
+
+
+def test_get_cnpjs_info_reads_through_the_cache(mocker, info_cache):
+    """Tests that only uncached CNPJs are fetched, and unknown ones once."""
+    found, unknown = CNPJ("12345678", "9012", "30"), CNPJ("00000001", "0001", "05")
+    found_info = {"cnpj_raw": found.to_raw(), "cnpj": "12.345.678/9012-30"}
+    get_profile = mocker.patch.object(
+        CNPJRepository, "get_cnpjs_profile", return_value={})
+    build_info = mocker.patch.object(
+        CNPJRepository, "_build_cnpjs_info",
+        return_value=[found_info, {"cnpj_raw": unknown.to_raw(), "qsa": []}])
+
+    repository = CNPJRepository(mock.MagicMock())
+
+    assert repository.get_cnpjs_info([found, unknown, found]) == [found_info]
+    assert repository.get_cnpjs_info([unknown, found]) == [found_info]
+    assert repository.get_cnpjs_info([unknown]) == {}
+
+    assert get_profile.call_count == 1
+    assert build_info.call_args.args[1] == [found, unknown, found]
+    assert info_cache.stats()["local_hits"] == 3
+
+
+def test_get_cnpjs_info_refetches_on_new_release(mocker, info_cache):
+    """Tests that a new data release invalidates the cached CNPJs."""
+    cnpj = CNPJ("12345678", "9012", "30")
+    mocker.patch.object(CNPJRepository, "get_cnpjs_profile", return_value={})
+    build_info = mocker.patch.object(
+        CNPJRepository, "_build_cnpjs_info",
+        return_value=[{"cnpj_raw": cnpj.to_raw(), "cnpj": "12.345.678/9012-30"}])
+
+    repository = CNPJRepository(mock.MagicMock())
+    repository.get_cnpjs_info([cnpj])
+    info_cache.set_release("2024-05-12T00:00:00")
+    repository.get_cnpjs_info([cnpj])
+
+    assert build_info.call_count == 2
+
+
+def test_get_city_candidates_uses_the_city_matcher(mocker):
+    """Tests that candidates are matched against the prebuilt city index."""
+    mocker.patch.object(
+        CNPJRepository, "city_matcher",
+        FuzzyMatcher(["SAO PAULO", "SAO PEDRO", "CURITIBA"]), create=True)
+
+    repository = CNPJRepository(mock.MagicMock())
+
+    assert repository.get_city_candidates(["curitba", "sao paolo", "curitba"]) == {
+        "curitba": ["CURITIBA"],
+        "sao paolo": ["SAO PAULO", "SAO PEDRO"],
+    }
+
+
+def test_get_cnae_by_token_searches_the_index(mocker):
+    """Tests that CNAE search is served from the index, without queries."""
+    cnaes = [
+        {"code": 5611201, "text": "Restaurantes e similares"},
+        {"code": 5620104, "text": "Fornecimento de alimentos preparados"},
+    ]
+    mocker.patch.object(
+        CNPJRepository, "cnae_index", PrefixSearchIndex(cnaes), create=True)
+    session = mock.MagicMock()
+
+    repository = CNPJRepository(session)
+
+    assert repository.get_cnae_by_token("Alimentos") == [cnaes[1]]
+    assert repository.get_cnae_by_token("") == []
+    session.query.assert_not_called()
+
+
+@pytest.fixture
+def lookup_queries(mocker):
+    """Patches the lookup table queries and returns their mocks."""
+    entries = {
+        "get_cnaes": [{"code": "6201501", "text": "Desenvolvimento de software"}],
+        "get_legal_natures": [{"code": "2062", "text": "Sociedade Limitada"}],
+        "get_registration_statuses": [{"code": "00", "text": "Sem motivo"}],
+        "get_cities": [{"code": "7107", "text": "SAO PAULO"}],
+    }
+
+    return {
+        name: mocker.patch.object(CNPJRepository, name, return_value=rows)
+        for name, rows in entries.items()
+    }
+
+
+def test_get_lookup_tables_writes_and_reuses_the_snapshot(
+        mocker, tmp_path, lookup_queries):
+    """Tests that the database is queried only while the snapshot is missing."""
+    mocker.patch.object(
+        settings, "LOOKUP_SNAPSHOT_PATH", str(tmp_path / "lookups.snapshot"))
+
+    first_tables = CNPJRepository.get_lookup_tables(mock.MagicMock())
+    second_tables = CNPJRepository.get_lookup_tables(mock.MagicMock())
+
+    assert all(query.call_count == 1 for query in lookup_queries.values())
+    assert dict(second_tables["munic"]) == dict(first_tables["munic"]) == {
+        "7107": {"code": "7107", "text": "SAO PAULO"}}
+
+
+def test_get_lookup_tables_without_snapshot(mocker, lookup_queries):
+    """Tests that disabling the snapshot reads the tables into dictionaries."""
+    mocker.patch.object(settings, "LOOKUP_SNAPSHOT_ENABLED", False)
+
+    tables = CNPJRepository.get_lookup_tables(mock.MagicMock())
+
+    assert tables["cnae"] == {
+        "6201501": {"code": "6201501", "text": "Desenvolvimento de software"}}
+    assert lookup_queries["get_cnaes"].call_count == 1
+
+
+def test_async_repository_overrides_the_session_lookups():
+    """Tests that every sync lookup using the session is a coroutine on the async repository."""
+    session_lookups = [
+        name for name, method in vars(CNPJRepository).items()
+        if inspect.isfunction(method) and name != "__init__"
+        and "self.session" in inspect.getsource(method)
+    ]
+
+    assert session_lookups
+    assert all(
+        inspect.iscoroutinefunction(vars(AsyncCNPJRepository).get(name))
+        for name in session_lookups
+    )
+
+
+def test_async_repository_has_no_sync_session():
+    """Tests that reaching the sync session fails explicitly."""
+    repository = AsyncCNPJRepository(mock.MagicMock())
+
+    with pytest.raises(NotImplementedError):
+        repository.session
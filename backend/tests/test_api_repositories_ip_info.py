@@ -0,0 +1,113 @@
+import threading
+from datetime import timedelta
+
+import pytest
+
+from backend.app.api.repositories.ip_info import (
+    IpInfoRepository,
+    NON_PUBLIC_IP_INFO,
+    is_public_ip,
+    resolve_ips,
+)
+from backend.app.api.repositories.logs import RequestLogRepository
+
+
+class FakeResolver:
+    """Resolves addresses offline, recording the calls and their concurrency."""
+
+    def __init__(self, failing=()):
+        self.calls = []
+        self.failing = set(failing)
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, ip):
+        with self.lock:
+            self.calls.append(ip)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            threading.Event().wait(0.01)
+            if ip in self.failing:
+                raise TimeoutError("RDAP timeout")
+            return {"asn": f"AS-{ip}"}
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+@pytest.mark.parametrize("ip, expected", [
+    ("8.8.8.8", True),
+    ("2001:4860:4860::8888", True),
+    ("10.0.0.1", False),
+    ("127.0.0.1", False),
+    ("not an ip", False),
+])
+def test_is_public_ip(ip, expected):
+    assert is_public_ip(ip) is expected
+
+
+def test_resolve_ips_bounded_concurrency(mocker):
+    warning = mocker.patch("backend.app.setup.logging.logger.warning")
+    resolver = FakeResolver(failing=["1.1.1.1"])
+    ips = ["1.1.1.1"] + [f"8.8.8.{index}" for index in range(20)]
+
+    infos = resolve_ips(ips, resolver, max_workers=4)
+
+    warning.assert_called_once_with(
+        "Error looking up IP 1.1.1.1: RDAP timeout", extra={"ip": "1.1.1.1"})
+    assert resolver.max_active <= 4
+    assert sorted(resolver.calls) == sorted(ips)
+    assert infos["8.8.8.3"] == {"asn": "AS-8.8.8.3"}
+    assert infos["1.1.1.1"] == {"error": "RDAP timeout"}
+
+
+@pytest.fixture
+def repositories(mocker):
+    log_repository = RequestLogRepository(mocker.Mock())
+    mocker.patch.object(log_repository, "update_ip_info", side_effect=len)
+    get_fresh = mocker.patch.object(
+        IpInfoRepository, "get_fresh",
+        side_effect=lambda ips, ttl: {ip: {"asn": "cached"} for ip in ips if ip == "8.8.4.4"})
+    upsert_many = mocker.patch.object(IpInfoRepository, "upsert_many")
+    return log_repository, get_fresh, upsert_many
+
+
+def test_lookup_and_update_ip_info(repositories, mocker):
+    log_repository, get_fresh, upsert_many = repositories
+    mocker.patch.object(log_repository, "get_ips_without_info", side_effect=[
+        ["8.8.8.8", "8.8.4.4", "10.0.0.1", "1.1.1.1"],
+        ["9.9.9.9"],
+        [],
+    ])
+    resolver = FakeResolver(failing=["1.1.1.1"])
+
+    counts = log_repository.lookup_and_update_ip_info(
+        resolver=resolver, batch_size=4, ttl=timedelta(days=1))
+
+    assert sorted(resolver.calls) == ["1.1.1.1", "8.8.8.8", "9.9.9.9"]
+    assert counts == {"cached": 1, "resolved": 3, "not_public": 1, "updated_logs": 5}
+
+    # Only successful lookups are cached
+    assert upsert_many.call_args_list[0].args[0] == {"8.8.8.8": {"asn": "AS-8.8.8.8"}}
+
+    # One update per batch, with every address of the batch
+    first_update = log_repository.update_ip_info.call_args_list[0].args[0]
+    assert first_update == {
+        "8.8.8.8": {"asn": "AS-8.8.8.8"},
+        "8.8.4.4": {"asn": "cached"},
+        "10.0.0.1": NON_PUBLIC_IP_INFO,
+        "1.1.1.1": {"error": "RDAP timeout"},
+    }
+
+
+def test_lookup_stops_when_nothing_updated(repositories, mocker):
+    log_repository, _, _ = repositories
+    log_repository.update_ip_info.side_effect = lambda infos: 0
+    get_ips = mocker.patch.object(
+        log_repository, "get_ips_without_info", return_value=["10.0.0.1"])
+
+    log_repository.lookup_and_update_ip_info(resolver=FakeResolver())
+
+    assert get_ips.call_count == 1
@@ -0,0 +1,87 @@
+import logging
+import threading
+from time import perf_counter
+
+import pytest
+
+from backend.app.api.repositories.logs import (
+    DebuggingDatabaseHandler,
+    DebugLogRepository,
+    RequestLogRepository,
+)
+from backend.app.api.models.logs import RequestLogCreate
+
+
+@pytest.fixture
+def debug_logger():
+    test_logger = logging.getLogger("test_debug_logs")
+    test_logger.setLevel(logging.INFO)
+    test_logger.propagate = False
+    yield test_logger
+    test_logger.handlers.clear()
+
+
+def test_debug_handler_writes_batches_on_close(debug_logger):
+    """Tests that records are written in batches once the handler closes."""
+    batches = []
+    handler = DebuggingDatabaseHandler(
+        batch_size=2, flush_interval=60, write_batch=batches.append)
+    debug_logger.addHandler(handler)
+
+    for index in range(3):
+        debug_logger.info(f"message {index}")
+    handler.close()
+
+    assert [len(batch) for batch in batches] == [2, 1]
+    assert [row["delo_message"] for batch in batches for row in batch] == [
+        "message 0", "message 1", "message 2"]
+    assert batches[0][0]["delo_level"] == "INFO"
+    assert batches[0][0]["delo_func_name"] == "test_debug_handler_writes_batches_on_close"
+
+
+def test_debug_handler_never_blocks_on_slow_database(debug_logger):
+    """Tests that logging drops records instead of waiting on the writes."""
+    release = threading.Event()
+    handler = DebuggingDatabaseHandler(
+        batch_size=1, flush_interval=60, max_queue_size=5,
+        write_batch=lambda batch: release.wait())
+    debug_logger.addHandler(handler)
+
+    start = perf_counter()
+    for index in range(100):
+        debug_logger.info(f"message {index}")
+    elapsed = perf_counter() - start
+
+    release.set()
+    handler.close()
+
+    stats = handler.writer.stats()
+    assert elapsed < 1
+    assert stats["dropped"] > 0
+    assert stats["submitted"] + stats["dropped"] == 100
+
+
+def test_debug_log_repository_create_many(mocker):
+    session = mocker.Mock()
+    rows = [{"delo_message": "a"}, {"delo_message": "b"}]
+
+    assert DebugLogRepository(session).create_many(rows) == 2
+    assert session.execute.call_args.args[1] == rows
+    session.commit.assert_called_once()
+
+    assert DebugLogRepository(session).create_many([]) == 0
+    session.commit.assert_called_once()
+
+
+def test_request_log_repository_create_many(mocker):
+    session = mocker.Mock()
+    log = RequestLogCreate(
+        relo_method="GET",
+        relo_url="http://testserver/api/cnaes",
+        relo_headers={},
+        relo_status_code=200,
+    )
+
+    assert RequestLogRepository(session).create_many([log, log]) == 2
+    assert session.execute.call_args.args[1][0]["relo_method"] == "GET"
+    session.commit.assert_called_once()
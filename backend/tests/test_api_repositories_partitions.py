@@ -0,0 +1,149 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from backend.app.api.repositories.partitions import (
+    PartitionRepository,
+    PartitionSpec,
+    next_period_start,
+    partition_name,
+    partition_start,
+    period_start,
+)
+
+NOW = datetime(2026, 12, 30, 15, 45, tzinfo=timezone.utc)
+
+
+def test_period_bounds():
+    assert period_start(NOW, "day") == datetime(2026, 12, 30, tzinfo=timezone.utc)
+    assert period_start(NOW, "month") == datetime(2026, 12, 1, tzinfo=timezone.utc)
+
+    assert next_period_start(datetime(2026, 12, 31, tzinfo=timezone.utc), "day") == \
+        datetime(2027, 1, 1, tzinfo=timezone.utc)
+    assert next_period_start(datetime(2026, 1, 1, tzinfo=timezone.utc), "month") == \
+        datetime(2026, 2, 1, tzinfo=timezone.utc)
+    assert next_period_start(datetime(2026, 12, 1, tzinfo=timezone.utc), "month") == \
+        datetime(2027, 1, 1, tzinfo=timezone.utc)
+
+
+def test_period_start_in_utc():
+    """Tests that period bounds do not depend on the moment timezone."""
+    moment = datetime(2026, 12, 30, 22, 0, tzinfo=timezone(timedelta(hours=-3)))
+
+    assert period_start(moment, "day") == datetime(2026, 12, 31, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize("period", ["day", "month"])
+def test_partition_name_round_trip(period):
+    start = period_start(NOW, period)
+    name = partition_name("request_logs", start, period)
+
+    assert partition_start("request_logs", name, period) == start
+
+
+def test_partition_start_of_other_names():
+    assert partition_start("request_logs", "request_logs_default", "day") is None
+    assert partition_start("request_logs", "debug_logs_p20261230", "day") is None
+
+
+@pytest.fixture
+def repository(mocker):
+    repository = PartitionRepository(mocker.Mock())
+    mocker.patch.object(repository, "create_default_partition")
+    mocker.patch.object(repository, "create_partition")
+    mocker.patch.object(repository, "drop_partition")
+    mocker.patch.object(repository, "delete_expired")
+    return repository
+
+
+def test_maintain_creates_ahead_and_drops_expired(repository, mocker):
+    mocker.patch.object(repository, "get_partitions", return_value=[
+        "request_logs_p20261120",
+        "request_logs_p20261129",
+        "request_logs_p20261130",
+        "request_logs_p20261230",
+        "request_logs_default",
+    ])
+    spec = PartitionSpec("request_logs", "relo_inserted_at", "day", timedelta(days=30))
+
+    result = repository.maintain(spec, ahead=2, now=NOW)
+
+    assert result["created"] == ["request_logs_p20261231", "request_logs_p20270101"]
+    # The partition of Nov 30 still holds rows within the retention
+    assert result["dropped"] == ["request_logs_p20261120", "request_logs_p20261129"]
+    repository.create_default_partition.assert_not_called()
+    repository.delete_expired.assert_called_once_with(
+        "request_logs_default", "relo_inserted_at", NOW - timedelta(days=30))
+
+    start, end = repository.create_partition.call_args_list[1].args[2:]
+    assert start == datetime(2027, 1, 1, tzinfo=timezone.utc)
+    assert end == datetime(2027, 1, 2, tzinfo=timezone.utc)
+    assert repository.drop_partition.call_count == 2
+
+
+def test_maintain_monthly(repository, mocker):
+    mocker.patch.object(repository, "get_partitions", return_value=[
+        "task_logs_p202609", "task_logs_p202610", "task_logs_p202612"])
+    spec = PartitionSpec("task_logs", "talo_inserted_at", "month", timedelta(days=60))
+
+    result = repository.maintain(spec, ahead=1, now=NOW)
+
+    assert result == {
+        "created": ["task_logs_default", "task_logs_p202701"],
+        "dropped": ["task_logs_p202609"],
+    }
+    repository.create_default_partition.assert_called_once_with("task_logs")
+    repository.delete_expired.assert_not_called()
+
+
+def test_create_partition_moves_default_rows(mocker):
+    """Tests that the rows of the range leave the default partition before attaching."""
+    session = mocker.Mock()
+    repository = PartitionRepository(session)
+    spec = PartitionSpec("request_logs", "relo_inserted_at", "day", timedelta(days=30))
+
+    repository.create_partition(
+        spec, "request_logs_p20261231",
+        datetime(2026, 12, 31, tzinfo=timezone.utc), datetime(2027, 1, 1, tzinfo=timezone.utc))
+
+    sql = str(session.execute.call_args.args[0])
+    statements = [
+        'create table "request_logs_p20261231"',
+        'insert into "request_logs_p20261231" select * from "request_logs_default"',
+        'delete from "request_logs_default"',
+        'attach partition "request_logs_p20261231"',
+    ]
+    positions = [sql.index(statement) for statement in statements]
+    assert positions == sorted(positions)
+    assert "'2026-12-31T00:00:00+00:00'" in sql
+
+
+def test_drop_table_if_expired(mocker):
+    session = mocker.Mock()
+    session.execute.return_value.scalar.side_effect = [True, False]
+    repository = PartitionRepository(session)
+
+    assert repository.drop_table_if_expired("task_logs_unpartitioned", "talo_inserted_at", NOW)
+
+    drop_sql = str(session.execute.call_args_list[-1].args[0])
+    assert drop_sql == 'drop table "task_logs_unpartitioned"'
+
+
+def test_drop_table_if_expired_keeps_recent_rows(mocker):
+    session = mocker.Mock()
+    session.execute.return_value.scalar.side_effect = [True, True]
+    repository = PartitionRepository(session)
+
+    assert not repository.drop_table_if_expired(
+        "task_logs_unpartitioned", "talo_inserted_at", NOW)
+    assert session.execute.call_count == 2
+
+
+def test_drop_table_if_expired_missing_table(mocker):
+    session = mocker.Mock()
+    session.execute.return_value.scalar.return_value = False
+    repository = PartitionRepository(session)
+
+    assert not repository.drop_table_if_expired(
+        "task_logs_unpartitioned", "talo_inserted_at", NOW)
+    assert session.execute.call_count == 1
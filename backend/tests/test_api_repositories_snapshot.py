@@ -0,0 +1,83 @@
+import json
+from datetime import timedelta
+
+import pytest
+
+from backend.app.api.repositories.snapshot import (
+    LookupSnapshot,
+    SNAPSHOT_PREFIX,
+)
+
+TABLES = {
+    "cnae": [
+        {"code": "6201501", "text": "Desenvolvimento de programas de computador"},
+        {"code": "1011201", "text": "Frigorífico - abate de bovinos"},
+    ],
+    "moti": [
+        {"code": "01", "text": "Extinção por encerramento"},
+        {"code": "00", "text": "Sem motivo"},
+    ],
+    "natju": [],
+}
+
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    """Writes the sample tables to a snapshot and returns its path."""
+    path = str(tmp_path / "lookups.snapshot")
+    LookupSnapshot.write(path, TABLES)
+
+    return path
+
+
+def test_snapshot_round_trip(snapshot_path):
+    """Tests that the mapped tables hold the written entries, sorted by code."""
+    snapshot = LookupSnapshot.open(snapshot_path, timedelta(days=1))
+
+    cnaes = snapshot.tables["cnae"]
+    assert list(cnaes) == ["1011201", "6201501"]
+    assert cnaes["1011201"] == {
+        "code": "1011201", "text": "Frigorífico - abate de bovinos"}
+    assert dict(snapshot.tables["moti"]) == {
+        entry["code"]: entry for entry in TABLES["moti"]}
+    assert len(snapshot.tables["natju"]) == 0
+
+
+def test_snapshot_table_behaves_as_a_mapping(snapshot_path):
+    """Tests lookups of missing and malformed codes, and the full scans."""
+    cnaes = LookupSnapshot.open(snapshot_path, timedelta(days=1)).tables["cnae"]
+
+    assert "6201501" in cnaes
+    assert "620150" not in cnaes and "62015010" not in cnaes and 6201501 not in cnaes
+    assert cnaes.get("9999999") is None
+    with pytest.raises(KeyError):
+        cnaes["9999999"]
+
+    assert [entry["code"] for entry in cnaes.values()] == ["1011201", "6201501"]
+    assert cnaes.items()[0] == ("1011201", cnaes["1011201"])
+    assert cnaes["6201501"] is cnaes["6201501"]
+
+
+def test_snapshot_missing_or_stale(snapshot_path, tmp_path):
+    """Tests that missing, stale and foreign files are not used."""
+    assert LookupSnapshot.open(str(tmp_path / "missing"), timedelta(days=1)) is None
+    assert LookupSnapshot.open(snapshot_path, timedelta(seconds=-1)) is None
+
+    (tmp_path / "foreign").write_bytes(b"not a snapshot at all")
+    assert LookupSnapshot.open(str(tmp_path / "foreign"), timedelta(days=1)) is None
+
+
+def test_snapshot_of_another_format_version(snapshot_path):
+    """Tests that snapshots written by other versions are not used."""
+    with open(snapshot_path, "rb") as file:
+        data = file.read()
+    magic, header_size = SNAPSHOT_PREFIX.unpack_from(data)
+    header_end = SNAPSHOT_PREFIX.size + header_size
+    header = json.loads(data[SNAPSHOT_PREFIX.size:header_end])
+    header["version"] += 1
+    encoded_header = json.dumps(header).encode().ljust(header_size)
+
+    with open(snapshot_path, "wb") as file:
+        file.write(data[:SNAPSHOT_PREFIX.size] + encoded_header + data[header_end:])
+
+    assert LookupSnapshot.open(snapshot_path, timedelta(days=1)) is None
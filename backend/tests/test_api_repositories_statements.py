@@ -0,0 +1,94 @@
+from unittest import mock
+
+import pytest
+from sqlalchemy.exc import ProgrammingError
+
+from backend.app.setup.config import settings
+from backend.app.api.repositories.statements import (
+    Statement,
+    get_statement,
+    execute_statement,
+    PREPARED_STATEMENTS_KEY,
+)
+
+
+@pytest.fixture
+def session(mocker):
+    """Returns a mocked session whose connection keeps a real info dict."""
+    mocker.patch.object(settings, "POSTGRES_PREPARED_STATEMENTS", True)
+    session = mock.MagicMock()
+    session.connection.return_value.connection.info = {}
+    return session
+
+
+def test_statement_positional_sql():
+    """Tests that named binds become positional parameters, keeping casts."""
+    statement = Statement(
+        "by_base",
+        "select 1 from t where a::text = :base and "
+        "b = any(cast(:codes as text[])) and c = :base",
+        {"base": "text", "codes": "text[]"},
+    )
+
+    assert str(statement.prepare_query) == (
+        "prepare by_base (text, text[]) as "
+        "select 1 from t where a::text = $1 and "
+        "b = any(cast($2 as text[])) and c = $1"
+    )
+    assert str(statement.execute_query) == "execute by_base (:base, :codes)"
+
+
+def test_statement_without_params():
+    """Tests statements without bound parameters."""
+    statement = Statement("everything", "select 1")
+
+    assert str(statement.prepare_query) == "prepare everything  as select 1"
+    assert str(statement.execute_query) == "execute everything "
+
+
+def test_get_statement_caches_by_shape():
+    """Tests that statements are shared by shape and named apart otherwise."""
+    first = get_statement("lookup", "select :a", {"a": "int"})
+    second = get_statement("lookup", "select :a", {"a": "int"})
+    other = get_statement("lookup", "select :a + 1", {"a": "int"})
+
+    assert first is second
+    assert first.name.startswith("lookup_")
+    assert other.name != first.name
+
+
+def test_execute_statement_prepares_once_per_connection(session):
+    """Tests that a statement is prepared on first use of a connection only."""
+    statement = get_statement("once", "select :a", {"a": "int"})
+
+    execute_statement(session, statement, {"a": 1})
+    execute_statement(session, statement, {"a": 2})
+
+    connection = session.connection.return_value
+    connection.execute.assert_called_once_with(statement.prepare_query)
+    assert session.execute.call_count == 2
+    session.execute.assert_called_with(statement.execute_query, {"a": 2})
+    assert statement.name in connection.connection.info[PREPARED_STATEMENTS_KEY]
+
+
+def test_execute_statement_tolerates_existing_statement(session):
+    """Tests that a statement prepared by a previous owner is reused."""
+    orig = mock.Mock(pgcode="42P05")
+    session.connection.return_value.execute.side_effect = ProgrammingError(
+        "prepare", {}, orig)
+    statement = get_statement("existing", "select :a", {"a": "int"})
+
+    execute_statement(session, statement, {"a": 1})
+
+    session.execute.assert_called_once_with(statement.execute_query, {"a": 1})
+
+
+def test_execute_statement_disabled(mocker, session):
+    """Tests that disabling prepared statements runs the plain query."""
+    mocker.patch.object(settings, "POSTGRES_PREPARED_STATEMENTS", False)
+    statement = get_statement("plain", "select :a", {"a": "int"})
+
+    execute_statement(session, statement, {"a": 1})
+
+    session.connection.assert_not_called()
+    session.execute.assert_called_once_with(statement.query, {"a": 1})
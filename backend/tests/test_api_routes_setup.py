@@ -2,6 +2,9 @@ import pytest
 
 from fastapi.testclient import TestClient
 from backend.app.api.routes.setup import router
+from backend.app.api.models.tasks import TaskConfig
+from backend.app.api.utils.metrics import LatencyHistogram, LatencyRecorder
+from backend.app.scheduler.runner import TaskRunner
 from backend.app.setup.config import settings
 from backend.app.utils.security import create_token
 
@@ -49,3 +52,89 @@ async def test_info():
             response = client.get("/info", headers=headers)
             assert response.status_code == 200
             assert response.json() == info_dict
+
+
+@pytest.mark.asyncio
+async def test_cache_stats():
+    signature_dict = {"message": "Suas Vendas rocks!"}
+    token = create_token(signature_dict)
+
+    headers = {"Authorization": f"Bearer {token}"}
+
+    with TestClient(app=router) as client:
+        response = client.get("/cache", headers=headers)
+        assert response.status_code == 200
+        assert response.json()["name"] == "cnpj_info"
+        assert "evictions" in response.json()
+
+
+@pytest.mark.asyncio
+async def test_latency_stats(mocker):
+    signature_dict = {"message": "Suas Vendas rocks!"}
+    token = create_token(signature_dict)
+
+    headers = {"Authorization": f"Bearer {token}"}
+
+    recorder = LatencyRecorder()
+    recorder.record("GET", "/api/cnaes", 0.010)
+    recorder.record("GET", "/api/cnpjs", 0.500)
+    mocker.patch("backend.app.api.routes.setup.request_latencies", recorder)
+
+    with TestClient(app=router) as client:
+        response = client.get("/latencies", headers=headers)
+        assert response.status_code == 200
+        assert [stats["route"] for stats in response.json()] == [
+            "/api/cnpjs", "/api/cnaes"]
+        assert response.json()[0]["count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_task_run_stats(mocker):
+    signature_dict = {"message": "Suas Vendas rocks!"}
+    token = create_token(signature_dict)
+
+    headers = {"Authorization": f"Bearer {token}"}
+
+    runner = TaskRunner(max_workers=1)
+    runner.start()
+    runner.run(TaskConfig(
+        schedule_type="background",
+        task_name="Cleanup",
+        task_type="cron",
+        task_callable=lambda: None,
+    ))
+    runner.stop()
+    mocker.patch("backend.app.api.routes.setup.task_orchestrator.runner", runner)
+
+    with TestClient(app=router) as client:
+        response = client.get("/task-runs", headers=headers)
+        assert response.status_code == 200
+        assert response.json()[0]["task_name"] == "Cleanup"
+        assert response.json()[0]["succeeded"] == 1
+        assert response.json()[0]["run_time"]["count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_pool_stats(mocker):
+    signature_dict = {"message": "Suas Vendas rocks!"}
+    token = create_token(signature_dict)
+
+    headers = {"Authorization": f"Bearer {token}"}
+
+    pool = {"size": 30, "checked_out": 1, "idle": 0, "overflow": -29}
+    checkout_wait = LatencyHistogram()
+    checkout_wait.record(0.002)
+    mocker.patch(
+        "backend.app.api.routes.setup.multi_database.pool_stats",
+        return_value=[{
+            "database": "rfb",
+            "pools": {"async": pool},
+            "checkout_wait": checkout_wait.summary(),
+        }],
+    )
+
+    with TestClient(app=router) as client:
+        response = client.get("/pools", headers=headers)
+        assert response.status_code == 200
+        assert response.json()[0]["pools"]["async"] == pool
+        assert response.json()[0]["checkout_wait"]["count"] == 1
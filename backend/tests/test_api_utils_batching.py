@@ -0,0 +1,102 @@
+import threading
+
+import pytest
+
+from backend.app.api.utils.batching import BatchWriter
+
+
+class RecordingSink:
+    """Collects the written batches, failing or blocking on demand."""
+
+    def __init__(self):
+        self.batches = []
+        self.fail = False
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self, batch):
+        self.release.wait()
+        if self.fail:
+            raise RuntimeError("audit database down")
+        self.batches.append(list(batch))
+
+
+@pytest.fixture
+def sink():
+    return RecordingSink()
+
+
+def test_writes_full_batches(sink):
+    """Tests that records are written in batches of at most batch_size."""
+    writer = BatchWriter("test", sink, batch_size=3, flush_interval=60)
+    for record in range(7):
+        writer.submit(record)
+
+    writer.start()
+    writer.stop(timeout=5)
+
+    assert [len(batch) for batch in sink.batches] == [3, 3, 1]
+    assert sum(sink.batches, []) == list(range(7))
+    assert writer.stats()["written"] == 7
+    assert writer.stats()["batches"] == 3
+
+
+def test_flushes_partial_batches_after_interval(sink):
+    """Tests that a partial batch is written once its interval elapses."""
+    writer = BatchWriter("test", sink, batch_size=100, flush_interval=0.05)
+    writer.start()
+    try:
+        writer.submit("record")
+        for _ in range(100):
+            if sink.batches:
+                break
+            threading.Event().wait(0.02)
+    finally:
+        writer.stop(timeout=5)
+
+    assert sink.batches == [["record"]]
+
+
+def test_drops_records_when_full(sink):
+    """Tests that submitting to a full queue drops and counts the records."""
+    writer = BatchWriter("test", sink, batch_size=10, max_queue_size=2)
+
+    assert writer.submit(1)
+    assert writer.submit(2)
+    assert not writer.submit(3)
+
+    stats = writer.stats()
+    assert stats["submitted"] == 2
+    assert stats["dropped"] == 1
+    assert stats["queued"] == 2
+
+
+def test_counts_failed_batches(sink, capsys):
+    """Tests that failed writes are counted and do not stop the writer."""
+    sink.fail = True
+    writer = BatchWriter("test", sink, batch_size=2, flush_interval=60)
+    for record in range(3):
+        writer.submit(record)
+
+    writer.start()
+    writer.stop(timeout=5)
+
+    stats = writer.stats()
+    assert stats["failed"] == 3
+    assert stats["written"] == 0
+    assert "audit database down" in capsys.readouterr().err
+
+
+def test_stop_writes_pending_records(sink):
+    """Tests that records queued while writing are written on stop."""
+    sink.release.clear()
+    writer = BatchWriter("test", sink, batch_size=1, flush_interval=60)
+    writer.start()
+    writer.submit("first")
+    writer.submit("second")
+
+    sink.release.set()
+    writer.stop(timeout=5)
+
+    assert sink.batches == [["first"], ["second"]]
+    assert writer.thread is None
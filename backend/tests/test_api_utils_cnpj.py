@@ -6,6 +6,7 @@ from backend.app.api.utils.cnpj import (
     format_cnpj,
     calculate_cnpj_verification_digits,
     are_cnpj_str_valid,
+    parse_cnpj_strs,
 )
 
 
@@ -109,3 +110,39 @@ def test_format_cnpj_invalid_cnpj():
     with pytest.raises(ValueError) as e:
         format_cnpj(invalid_cnpj)
     assert str(e.value) == "CNPJ contains non-numeric characters."
+
+
+def test_parse_cnpj_strs_matches_scalar_validation():
+    """Test parse_cnpj_strs against is_cnpj_str_valid on mixed CNPJs."""
+    cnpjs = [
+        "12345678901230",
+        "123456789012345",
+        "",
+        "1234567890123a",
+        "12345678901231",
+        "123456789012.4",
+        "00000000000000",
+    ]
+    cnpj_arrays = parse_cnpj_strs(cnpjs)
+
+    assert cnpj_arrays.is_valid.tolist() == [
+        is_cnpj_str_valid(cnpj)["is_valid"] for cnpj in cnpjs]
+    assert cnpj_arrays.reasons.tolist() == [
+        is_cnpj_str_valid(cnpj)["reason"] for cnpj in cnpjs]
+
+
+def test_parse_cnpj_strs_parts():
+    """Test parse_cnpj_strs splits CNPJs into basico, ordem and digits."""
+    cnpj_arrays = parse_cnpj_strs(["12345678901230", "34111019000191"])
+
+    assert cnpj_arrays.basicos.tolist() == ["12345678", "34111019"]
+    assert cnpj_arrays.ordens.tolist() == ["9012", "0001"]
+    assert cnpj_arrays.digitos_verificadores.tolist() == ["30", "91"]
+
+
+def test_parse_cnpj_strs_empty_batch():
+    """Test parse_cnpj_strs with an empty batch."""
+    cnpj_arrays = parse_cnpj_strs([])
+
+    assert cnpj_arrays.is_valid.tolist() == []
+    assert cnpj_arrays.basicos.tolist() == []
@@ -0,0 +1,70 @@
+from nltk.metrics import edit_distance
+
+from backend.app.api.utils.fuzzy import (
+    FuzzyMatcher,
+    bounded_edit_distance,
+    fold_text,
+)
+
+CITY_NAMES = [
+    "SAO PAULO",
+    "SAO PEDRO",
+    "SAO CARLOS",
+    "RIO DE JANEIRO",
+    "CURITIBA",
+    "MURITIBA",
+    "BRASILIA",
+    "BRASILEIA",
+]
+
+
+def pattern_masks(pattern):
+    masks = {}
+    for position, char in enumerate(pattern):
+        masks[char] = masks.get(char, 0) | (1 << position)
+
+    return masks
+
+
+def test_fold_text():
+    """Tests that accents, case and punctuation are folded."""
+    assert fold_text("  São-Paulo d'Oeste ") == "sao paulo d oeste"
+
+
+def test_bounded_edit_distance_matches_levenshtein():
+    """Tests the distance against the NLTK implementation, within the bound."""
+    pairs = [
+        ("sao paulo", "sao pedro"),
+        ("curitba", "curitiba"),
+        ("", "abc"),
+        ("kitten", "sitting"),
+        ("brasilia", "brasileia"),
+    ]
+
+    for pattern, text in pairs:
+        distance = bounded_edit_distance(
+            pattern_masks(pattern), len(pattern), text, 10)
+        assert distance == edit_distance(pattern, text)
+
+
+def test_bounded_edit_distance_gives_up_past_the_bound():
+    """Tests that distances over the bound are not returned."""
+    assert bounded_edit_distance(pattern_masks("kitten"), 6, "sitting", 2) is None
+    assert bounded_edit_distance(pattern_masks("abc"), 3, "abcdefgh", 4) is None
+
+
+def test_top_k_ranks_by_edit_distance():
+    """Tests that the closest names come first, regardless of accents."""
+    matcher = FuzzyMatcher(CITY_NAMES)
+
+    assert matcher.top_k("São Paolo", 3) == ["SAO PAULO", "SAO PEDRO", "SAO CARLOS"]
+    assert matcher.top_k("curitba", 2) == ["CURITIBA", "MURITIBA"]
+
+
+def test_top_k_ignores_duplicates_and_unrelated_queries():
+    """Tests that names are returned once and unmatched queries are empty."""
+    matcher = FuzzyMatcher(CITY_NAMES + ["BRASILIA"])
+
+    assert matcher.top_k("Brasília", 3) == ["BRASILIA", "BRASILEIA"]
+    assert matcher.top_k("xyz", 3) == []
+    assert matcher.top_k("brasilia", 0) == []
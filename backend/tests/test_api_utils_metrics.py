@@ -0,0 +1,75 @@
+import random
+
+import pytest
+
+from backend.app.api.utils.metrics import LatencyHistogram, LatencyRecorder
+
+
+def test_bucket_bounds_cover_every_value():
+    """Tests that each value falls in a bucket bounding it within precision."""
+    histogram = LatencyHistogram(significant_bits=5)
+
+    previous_index = -1
+    for microseconds in range(0, 5000):
+        index = histogram.bucket_index(microseconds)
+        upper_bound = histogram.bucket_upper_bound(index)
+
+        assert index >= previous_index
+        assert microseconds <= upper_bound
+        assert upper_bound - microseconds <= microseconds / 2 ** 4
+        previous_index = index
+
+
+def test_quantiles_within_precision():
+    """Tests the quantiles against the exact ones of a sample."""
+    random.seed(7)
+    latencies = [random.lognormvariate(-4, 1) for _ in range(10000)]
+    histogram = LatencyHistogram()
+    for latency in latencies:
+        histogram.record(latency)
+
+    latencies.sort()
+    for quantile, value in zip((0.5, 0.9, 0.99), histogram.quantiles((0.5, 0.9, 0.99))):
+        exact = latencies[int(quantile * len(latencies)) - 1]
+        assert value == pytest.approx(exact, rel=0.02, abs=1e-6)
+
+    summary = histogram.summary()
+    assert summary["count"] == 10000
+    assert summary["sum_seconds"] == pytest.approx(sum(latencies))
+    assert summary["max_seconds"] == latencies[-1]
+
+
+def test_quantiles_of_empty_histogram():
+    assert LatencyHistogram().quantiles((0.5, 0.99)) == [0.0, 0.0]
+
+
+def test_quantiles_capped_at_max():
+    """Tests that no quantile exceeds the largest recorded value."""
+    histogram = LatencyHistogram()
+    histogram.record(1.2345)
+
+    assert histogram.quantiles((0.5, 0.99)) == [1.2345, 1.2345]
+
+
+def test_recorder_drains_window_and_keeps_live():
+    """Tests that a rollup resets the window histograms only."""
+    recorder = LatencyRecorder()
+    recorder.record("GET", "/api/cnaes", 0.01)
+    recorder.record("GET", "/api/cnaes", 0.02)
+    recorder.record("POST", "/api/cnpjs", 0.5)
+
+    start, end, window = recorder.drain_window(now=recorder.started_at + 60)
+
+    assert end - start == 60
+    assert window[("GET", "/api/cnaes")].count == 2
+    assert window[("POST", "/api/cnpjs")].count == 1
+
+    recorder.record("GET", "/api/cnaes", 0.03)
+    _, _, window = recorder.drain_window()
+
+    assert list(window) == [("GET", "/api/cnaes")]
+    assert window[("GET", "/api/cnaes")].count == 1
+
+    summaries = recorder.summaries()
+    assert [summary["route"] for summary in summaries] == ["/api/cnpjs", "/api/cnaes"]
+    assert summaries[1]["count"] == 3
@@ -3,6 +3,9 @@ import pytest
 from backend.app.api.utils.misc import (
     check_limit_and_offset,
     convert_to_bytes,
+    encode_cursor,
+    decode_cursor,
+    ExecutionProfile,
     MAX_LIMIT,
 )
 
@@ -50,3 +53,58 @@ def test_convert_to_bytes_invalid_format():
 
 def test_convert_to_bytes_empty_string():
     assert convert_to_bytes("") == 0
+
+
+def test_cursor_round_trip():
+    key = ("12345678", "1", "30")
+    cursor = encode_cursor(key)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == key
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    ["not-a-cursor", encode_cursor(("1", "2")), encode_cursor(("1", "2", "x"))],
+)
+def test_decode_cursor_invalid(cursor):
+    with pytest.raises(ValueError) as excinfo:
+        decode_cursor(cursor)
+
+    assert "Invalid cursor" in str(excinfo.value)
+
+
+@pytest.mark.asyncio
+async def test_execution_profile_records_sync_and_async_steps():
+    """Tests that each timed call is recorded as a step, in call order."""
+    profile = ExecutionProfile("startup")
+
+    def init_database():
+        return "database"
+
+    async def setup_logger():
+        return "logger"
+
+    profile.record("imports", 0.25)
+    assert profile.timed(init_database)() == "database"
+    assert await profile.timed(setup_logger)() == "logger"
+
+    result = profile.to_dict()
+    assert result["profile"] == "startup"
+    assert [step["step"] for step in result["steps"]] == [
+        "imports", "init_database", "setup_logger"]
+    assert result["steps"][0]["duration_ms"] == 250.0
+    assert result["total_ms"] >= 0
+
+
+def test_execution_profile_records_failed_steps():
+    """Tests that a step is recorded even if it raises."""
+    profile = ExecutionProfile("startup")
+
+    def add_tasks():
+        raise RuntimeError("scheduler down")
+
+    with pytest.raises(RuntimeError):
+        profile.timed(add_tasks)()
+
+    assert profile.to_dict()["steps"][0]["step"] == "add_tasks"
@@ -1,6 +1,6 @@
 import nltk
 
-from backend.app.api.utils.ml import find_most_possible_tokens
+from backend.app.api.utils.ml import find_most_possible_tokens, init_nltk
 
 
 def test_find_most_possible_tokens():
@@ -18,3 +18,17 @@ def test_find_most_possible_tokens():
     )
 
     assert most_possible_cities == expected
+
+
+def test_init_nltk_skips_available_datasets(mocker):
+    """Tests that datasets already on the NLTK data path are not downloaded."""
+    def find(resource):
+        if resource == "tokenizers/punkt_tab":
+            raise LookupError(resource)
+
+    mocker.patch("nltk.data.find", side_effect=find)
+    download = mocker.patch("nltk.download")
+
+    init_nltk()
+
+    download.assert_called_once_with("punkt_tab")
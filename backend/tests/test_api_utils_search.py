@@ -0,0 +1,48 @@
+from backend.app.api.utils.search import PrefixSearchIndex
+
+CNAES = [
+    {"code": 6201501, "text": "Desenvolvimento de programas de computador sob encomenda"},
+    {"code": 6203100, "text": "Desenvolvimento e licenciamento de programas de computador não-customizáveis"},
+    {"code": 4751201, "text": "Comércio varejista especializado de equipamentos de informática"},
+    {"code": 5611201, "text": "Restaurantes e similares"},
+    {"code": 161001, "text": "Serviço de pulverização e controle de pragas agrícolas"},
+]
+
+
+def codes(entries):
+    return [entry["code"] for entry in entries]
+
+
+def test_search_folds_accents_and_case():
+    """Tests that accents and case are ignored on both sides."""
+    index = PrefixSearchIndex(CNAES)
+
+    assert codes(index.search("COMERCIO Varejista")) == [4751201]
+    assert codes(index.search("agricolas")) == [161001]
+
+
+def test_search_matches_all_words_by_prefix():
+    """Tests that every query word must start a word of the text."""
+    index = PrefixSearchIndex(CNAES)
+
+    assert codes(index.search("desenv prog")) == [6201501, 6203100]
+    assert codes(index.search("programas restaurantes")) == []
+
+
+def test_search_ranks_whole_words_first():
+    """Tests that whole-word matches rank above prefix matches."""
+    index = PrefixSearchIndex(CNAES)
+
+    assert codes(index.search("e")) == [
+        5611201, 161001, 6203100, 6201501, 4751201]
+    assert codes(index.search("de")) == [
+        6201501, 6203100, 161001, 4751201]
+
+
+def test_search_falls_back_to_substrings():
+    """Tests that word fragments still match inside words."""
+    index = PrefixSearchIndex(CNAES)
+
+    assert codes(index.search("taurante")) == [5611201]
+    assert index.search("xyz") == []
+    assert index.search("  ") == []
@@ -0,0 +1,192 @@
+from contextlib import ExitStack, contextmanager
+from datetime import datetime, timezone
+from threading import Event
+from unittest import mock
+
+import pytest
+
+from backend.app.api.models.tasks import TaskConfig, get_task_id
+from backend.app.scheduler import base
+from backend.app.scheduler.base import ScheduledTask, get_task_lock_key
+from backend.app.scheduler.runner import TaskRunner
+from backend.app.scheduler.tasks.logs import (
+    lookup_and_update_ip_info_config,
+    maintain_audit_partitions_config,
+)
+from backend.app.scheduler.tasks.metrics import (
+    cleanup_latency_config,
+    rollup_request_latencies_config,
+)
+from backend.app.scheduler.tasks.release import refresh_data_release_config
+
+SCHEDULED_AT = datetime(2026, 10, 18, 3, 0, tzinfo=timezone.utc)
+
+
+def make_config(callable_, exclusive=True):
+    return TaskConfig(
+        schedule_type="background",
+        schedule_params={"hour": 3},
+        task_name="Cleanup",
+        task_type="cron",
+        task_callable=callable_,
+        exclusive=exclusive,
+    )
+
+
+def test_task_id_from_name():
+    config = make_config(print)
+
+    assert config.task_id == get_task_id("Cleanup")
+    assert make_config(len).task_id == config.task_id
+    assert get_task_id("Other") != config.task_id
+
+
+def test_task_lock_key_is_signed_64_bits():
+    key = get_task_lock_key("Cleanup")
+
+    assert key == get_task_lock_key("Cleanup")
+    assert -2 ** 63 <= key < 2 ** 63
+    assert key != get_task_lock_key("Other")
+
+
+@pytest.fixture
+def task_run(mocker):
+    """Patches the lock and the logs of a task run, returning the calls."""
+    state = {"locked": True, "done": False}
+    mocker.patch.object(base, "get_scheduled_time", return_value=SCHEDULED_AT)
+
+    @contextmanager
+    def task_lock(task_name):
+        yield state["locked"]
+
+    mocker.patch.object(base, "task_lock", task_lock)
+    mocker.patch.object(
+        ScheduledTask, "is_tick_done", side_effect=lambda scheduled_at: state["done"])
+    state["skipped"] = mocker.patch.object(ScheduledTask, "log_skipped")
+    state["executed"] = mocker.patch.object(ScheduledTask, "execute")
+
+    return state
+
+
+def test_run_with_lock(task_run):
+    ScheduledTask(make_config(print), TaskRunner()).run()
+
+    task_run["executed"].assert_called_once_with(SCHEDULED_AT, mock.ANY)
+    task_run["skipped"].assert_not_called()
+
+
+def test_run_skipped_when_locked_elsewhere(task_run):
+    task_run["locked"] = False
+    ScheduledTask(make_config(print), TaskRunner()).run()
+
+    task_run["executed"].assert_not_called()
+    task_run["skipped"].assert_called_once_with(
+        SCHEDULED_AT, "running on another replica")
+
+
+def test_run_skipped_when_tick_done(task_run):
+    task_run["done"] = True
+    ScheduledTask(make_config(print), TaskRunner()).run()
+
+    task_run["executed"].assert_not_called()
+    task_run["skipped"].assert_called_once_with(
+        SCHEDULED_AT, "tick already run by another replica")
+
+
+def test_run_not_exclusive(task_run):
+    task_run["locked"] = False
+    ScheduledTask(make_config(print, exclusive=False), TaskRunner()).run()
+
+    task_run["executed"].assert_called_once_with(SCHEDULED_AT, mock.ANY)
+    task_run["skipped"].assert_not_called()
+
+
+def test_per_process_tasks_run_on_every_replica(task_run):
+    task_run["locked"] = False
+    task_run["done"] = True
+    ScheduledTask(refresh_data_release_config, TaskRunner()).run()
+    ScheduledTask(rollup_request_latencies_config, TaskRunner()).run()
+
+    assert task_run["executed"].call_count == 2
+    task_run["skipped"].assert_not_called()
+
+
+def test_database_jobs_are_exclusive():
+    assert not make_config(print, exclusive=False).exclusive
+    assert all(
+        config.exclusive
+        for config in [
+            maintain_audit_partitions_config,
+            lookup_and_update_ip_info_config,
+            cleanup_latency_config,
+        ]
+    )
+
+
+def test_run_skipped_at_concurrency_limit(task_run):
+    config = make_config(print)
+    runner = TaskRunner()
+
+    with runner.slot(config):
+        ScheduledTask(config, runner).run()
+
+    task_run["executed"].assert_not_called()
+    task_run["skipped"].assert_called_once_with(
+        SCHEDULED_AT, "concurrency limit reached")
+
+
+@pytest.fixture
+def task_logs(mocker):
+    """Patches the run logs, returning the log_end mock."""
+    mocker.patch.object(base, "get_scheduled_time", return_value=SCHEDULED_AT)
+    mocker.patch.object(ScheduledTask, "log_start", return_value="log-id")
+    mocker.patch.object(ScheduledTask, "log_skipped")
+
+    return mocker.patch.object(ScheduledTask, "log_end")
+
+
+def test_run_returns_before_the_task_ends(task_logs):
+    """Tests that the scheduler thread is freed and the slot held until the run ends."""
+    started, release = Event(), Event()
+
+    def wait():
+        started.set()
+        release.wait(5)
+
+    config = make_config(wait, exclusive=False)
+    runner = TaskRunner(max_workers=1)
+    runner.start()
+    try:
+        task = ScheduledTask(config, runner)
+        task.run()
+        assert started.wait(5)
+        task_logs.assert_not_called()
+
+        task.run()
+        ScheduledTask.log_skipped.assert_called_once_with(
+            SCHEDULED_AT, "concurrency limit reached")
+
+        release.set()
+    finally:
+        runner.stop(timeout=5)
+
+    task_logs.assert_called_once()
+    task_log_id, future = task_logs.call_args.args
+    assert task_log_id == "log-id" and future.done()
+    assert runner.get_stats(config).active == 0
+
+
+def test_execute_releases_on_submit_error(task_logs, mocker):
+    """Tests that the slot and lock are released when the run cannot start."""
+    release = mock.MagicMock()
+    stack = ExitStack()
+    stack.callback(release)
+
+    with pytest.raises(RuntimeError):
+        ScheduledTask(make_config(print), TaskRunner()).execute(SCHEDULED_AT, stack)
+
+    release.assert_called_once()
+
+
+def test_scheduled_time_outside_jobs():
+    assert base.get_scheduled_time() is None
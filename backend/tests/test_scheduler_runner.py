@@ -0,0 +1,100 @@
+import asyncio
+from threading import Event
+
+import pytest
+
+from backend.app.api.models.tasks import TaskConfig
+from backend.app.scheduler.runner import TaskRunner
+
+
+def make_config(callable_, **kwargs):
+    return TaskConfig(
+        schedule_type="background",
+        task_name=callable_.__name__,
+        task_type="cron",
+        task_callable=callable_,
+        **kwargs,
+    )
+
+
+@pytest.fixture
+def runner():
+    runner = TaskRunner(max_workers=2)
+    runner.start()
+    yield runner
+    runner.stop(timeout=5)
+
+
+def test_run_function(runner):
+    def add(first, second):
+        return first + second
+
+    assert runner.run(make_config(add, task_args=[1, 2])) == 3
+
+    stats = runner.summaries()[0]
+    assert stats["task_name"] == "add"
+    assert (stats["queued"], stats["running"], stats["succeeded"]) == (0, 0, 1)
+    assert stats["run_time"]["count"] == 1
+
+
+def test_run_coroutines_on_one_loop(runner):
+    async def current_loop():
+        await asyncio.sleep(0)
+        return asyncio.get_running_loop()
+
+    config = make_config(current_loop)
+
+    assert runner.run(config) is runner.run(config)
+    assert runner.summaries()[0]["succeeded"] == 2
+
+
+def test_run_failure(runner):
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError, match="boom"):
+        runner.run(make_config(fail))
+
+    assert runner.summaries()[0]["failed"] == 1
+
+
+def test_run_not_started():
+    with pytest.raises(RuntimeError):
+        TaskRunner().run(make_config(print))
+
+
+def test_slot_concurrency_limit():
+    runner = TaskRunner()
+    config = make_config(print, max_concurrency=2)
+
+    with runner.slot(config) as first, runner.slot(config) as second:
+        with runner.slot(config) as third:
+            assert (first, second, third) == (True, True, False)
+
+    with runner.slot(config) as again:
+        assert again
+
+    assert runner.summaries()[0]["rejected"] == 1
+
+
+def test_queue_depth(runner):
+    release = Event()
+
+    def wait():
+        release.wait(5)
+
+    config = make_config(wait)
+    futures = [runner.submit(config) for _ in range(3)]
+
+    # Two workers, so one run waits in the queue
+    stats = runner.summaries()[0]
+    assert stats["queued"] + stats["running"] == 3
+    assert stats["queued"] >= 1
+
+    release.set()
+    for future in futures:
+        future.result()
+
+    stats = runner.summaries()[0]
+    assert (stats["queued"], stats["running"], stats["succeeded"]) == (0, 0, 3)
+    assert stats["queue_wait"]["count"] == 3
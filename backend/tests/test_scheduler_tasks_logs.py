@@ -0,0 +1,51 @@
+from contextlib import contextmanager
+
+import pytest
+
+from backend.app.api.repositories.partitions import PartitionRepository
+from backend.app.scheduler.tasks import logs
+from backend.app.scheduler.tasks.logs import AUDIT_PARTITIONS, maintain_audit_partitions
+
+
+@pytest.fixture
+def partition_repository(mocker):
+    """Patches the audit session and the partition repository methods."""
+    @contextmanager
+    def get_session_mock(db_name):
+        yield mocker.Mock()
+
+    mocker.patch.object(logs, "get_session", get_session_mock)
+    mocker.patch.object(
+        PartitionRepository, "maintain", return_value={"created": [], "dropped": []})
+    mocker.patch.object(PartitionRepository, "delete_expired", return_value=3)
+    mocker.patch.object(PartitionRepository, "drop_table_if_expired", return_value=False)
+
+    return PartitionRepository
+
+
+def test_unpartitioned_tables_deleted_row_by_row(mocker, partition_repository):
+    """Tests that tables not migrated yet still have their expired rows deleted."""
+    mocker.patch.object(
+        PartitionRepository, "is_partitioned",
+        side_effect=lambda table: table != "debug_logs")
+
+    results = maintain_audit_partitions()
+
+    assert results["debug_logs"] == {"deleted": 3}
+    assert partition_repository.maintain.call_count == len(AUDIT_PARTITIONS) - 1
+    table, column, _ = partition_repository.delete_expired.call_args.args
+    assert (table, column) == ("debug_logs", "delo_created_at")
+
+
+def test_expired_unpartitioned_tables_dropped(mocker, partition_repository):
+    """Tests that the tables renamed by the migration are dropped once expired."""
+    mocker.patch.object(PartitionRepository, "is_partitioned", return_value=True)
+    partition_repository.drop_table_if_expired.side_effect = (
+        lambda table, column, cutoff: table == "request_logs_unpartitioned")
+
+    results = maintain_audit_partitions()
+
+    assert results["request_logs_unpartitioned"] == {
+        "dropped": ["request_logs_unpartitioned"]}
+    assert "task_logs_unpartitioned" not in results
+    partition_repository.delete_expired.assert_not_called()
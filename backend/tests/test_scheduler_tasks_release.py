@@ -0,0 +1,51 @@
+from datetime import datetime
+from threading import Event
+
+import pytest
+
+from backend.app.api.repositories.cache import ReleaseCache
+from backend.app.api.services.scrapper import CNPJScrapService
+from backend.app.scheduler.tasks import release
+from backend.app.scheduler.tasks.release import init_data_release
+
+
+@pytest.fixture
+def info_cache(mocker):
+    """Replaces the CNPJ information cache with one without release."""
+    cache = ReleaseCache("cnpj_info", 100)
+    mocker.patch.object(release, "cnpj_info_cache", cache)
+
+    return cache
+
+
+def test_init_data_release_does_not_wait_on_the_scrape(mocker, info_cache):
+    """Tests that startup goes on with the cache bypassed while the release is fetched."""
+    scraped = Event()
+
+    def max_update_at(self, timeout):
+        scraped.wait(5)
+        return datetime(2024, 4, 12)
+
+    mocker.patch.object(CNPJScrapService, "max_update_at", max_update_at)
+
+    thread = init_data_release()
+
+    assert thread.is_alive()
+    assert info_cache.release is None
+
+    scraped.set()
+    thread.join(5)
+
+    assert info_cache.release == "2024-04-12T00:00:00"
+
+
+def test_init_data_release_logs_errors(mocker, info_cache):
+    """Tests that a failed scrape is logged and leaves the cache bypassed."""
+    mocker.patch.object(
+        CNPJScrapService, "max_update_at", side_effect=ConnectionError("reset"))
+    error = mocker.patch.object(release.logger, "error")
+
+    init_data_release().join(5)
+
+    error.assert_called_once()
+    assert info_cache.release is None
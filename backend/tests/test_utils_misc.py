@@ -8,6 +8,7 @@ from backend.app.utils.misc import (
     replace_spaces_on_list_tuple,
     replace_invalid_fields_on_list_tuple,
     replace_invalid_fields_on_list_dict,
+    clean_columns,
     replace_spaces,
     remove_leading_zeros,
     is_number,
@@ -127,6 +128,14 @@ def test_replace_invalid_fields_on_list_dict():
     assert replace_invalid_fields_on_list_dict(data) == expected
 
 
+def test_clean_columns():
+    """Tests the clean_columns function."""
+
+    data = {"A": ["  text  ", None, "nan"], "B": [" multiple   spaces", "NULL", 1]}
+    expected = {"A": ["text", "", ""], "B": ["multiple spaces", "", "1"]}
+    assert clean_columns(data) == expected
+
+
 def test_replace_nan_on_list_tuple():
     """Tests the replace_nan_on_list_tuple function."""
 
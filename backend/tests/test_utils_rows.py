@@ -0,0 +1,78 @@
+import pytest
+
+from backend.app.utils.rows import (
+    rows_to_dicts,
+    rows_to_nested_dict,
+    rows_to_columns,
+    columns_to_dicts,
+    map_column,
+)
+
+
+def test_maps_rows_to_dicts():
+    """Tests mapping rows to dictionaries keyed by column name."""
+    rows = [(1, "a"), (2, "b")]
+
+    result = rows_to_dicts(rows, ["A", "B"])
+
+    assert result == [{"A": 1, "B": "a"}, {"A": 2, "B": "b"}]
+
+
+def test_maps_rows_to_nested_dict():
+    """Tests mapping rows to a dictionary keyed by the index column."""
+    rows = [(1, "a", 10), (2, "b", 20), (3, "c", 30)]
+    expected_result = {
+        1: {"B": "a", "C": 10},
+        2: {"B": "b", "C": 20},
+        3: {"B": "c", "C": 30},
+    }
+
+    result = rows_to_nested_dict(rows, ["A", "B", "C"], index_col="A")
+
+    assert result == expected_result
+
+
+def test_maps_index_values_and_keeps_last_duplicate():
+    """Tests that keys are mapped and later rows replace earlier ones."""
+    rows = [("1", "a"), ("01", "b"), ("2", "c")]
+
+    result = rows_to_nested_dict(
+        rows, ["A", "B"], index_col="A", index_map=lambda key: key.zfill(3))
+
+    assert result == {"001": {"B": "b"}, "002": {"B": "c"}}
+
+
+def test_raises_error_for_missing_index_col():
+    """Tests that a non-existent index column raises an error."""
+    with pytest.raises(ValueError):
+        rows_to_nested_dict([(1, "a")], ["A", "B"], index_col="D")
+
+
+def test_transposes_rows_to_columns_and_back():
+    """Tests that rows survive a round trip through columns."""
+    rows = [(1, "a"), (2, "b")]
+
+    columns = rows_to_columns(rows, ["A", "B"])
+
+    assert columns == {"A": [1, 2], "B": ["a", "b"]}
+    assert columns_to_dicts(columns) == rows_to_dicts(rows, ["A", "B"])
+
+
+def test_transposes_no_rows_to_empty_columns():
+    """Tests that an empty result keeps all columns."""
+    assert rows_to_columns([], ["A", "B"]) == {"A": [], "B": []}
+    assert columns_to_dicts({"A": [], "B": []}) == []
+
+
+def test_maps_column_once_per_distinct_value():
+    """Tests that the function runs once per distinct value, in order."""
+    calls = []
+
+    def upper(value):
+        calls.append(value)
+        return value.upper()
+
+    result = map_column(upper, ["a", "b", "a", "a"])
+
+    assert result == ["A", "B", "A", "A"]
+    assert calls == ["a", "b"]
@@ -0,0 +1,28 @@
+-- Normalized secondary CNAE codes for indexed CNAE search.
+--
+-- The RFB dump stores secondary CNAEs as a comma separated text column, which
+-- only supports 'like' scans. The generated column keeps an int[] copy in sync
+-- with every (re)load of the table and the GIN index serves the '&&'/'@>'
+-- operators used by the CNAE search queries.
+--
+-- Note: adding a stored generated column rewrites the table once. The script
+-- is idempotent and may be re-applied after each RFB release load.
+
+alter table public.estabelecimento
+    add column if not exists cnae_fiscal_secundaria_array int[]
+    generated always as (
+        coalesce(
+            string_to_array(
+                nullif(nullif(trim(cnae_fiscal_secundaria), ''), 'nan'), ','
+            )::int[],
+            '{}'::int[]
+        )
+    ) stored;
+
+create index concurrently if not exists estabelecimento_cnae_fiscal_secundaria_array
+    on public.estabelecimento using gin (cnae_fiscal_secundaria_array);
+
+create index concurrently if not exists estabelecimento_cnae_fiscal_principal
+    on public.estabelecimento using btree (cnae_fiscal_principal);
+
+analyze public.estabelecimento;
@@ -0,0 +1,25 @@
+-- Composite key for exact CNPJ lookups.
+--
+-- Batch establishment lookups join the requested (cnpj_basico, cnpj_ordem,
+-- cnpj_dv) rows to the table, so each requested CNPJ costs a single probe on
+-- this index instead of intersecting the per-column indexes.
+--
+-- The loaded table has duplicated establishment rows, and a reload may bring
+-- them back, so the index is not unique: the profile keeps one row per CNPJ.
+-- Run with psql, \gexec drops a build left INVALID by an interrupted run.
+
+-- Unique index of an earlier version of this migration, possibly INVALID
+drop index concurrently if exists public.estabelecimento_cnpj;
+
+select 'drop index concurrently public.estabelecimento_cnpj_key'
+from pg_index i
+join pg_class c on c.oid = i.indexrelid
+where c.relname = 'estabelecimento_cnpj_key'
+  and pg_table_is_visible(c.oid)
+  and not i.indisvalid
+\gexec
+
+create index concurrently if not exists estabelecimento_cnpj_key
+    on public.estabelecimento using btree (cnpj_basico, cnpj_ordem, cnpj_dv);
+
+analyze public.estabelecimento;
@@ -0,0 +1,43 @@
+-- Range-partitioned audit tables.
+--
+-- request_logs, task_logs, debug_logs and request_timing are partitioned by
+-- their insertion time, so that retention drops whole partitions instead of
+-- deleting rows. Existing tables cannot be partitioned in place: they are
+-- renamed, with their indexes, to *_unpartitioned. On its next startup the
+-- application creates the partitioned tables and their partitions.
+--
+-- The old rows stay in the *_unpartitioned tables, which the partition
+-- maintenance task drops once all their rows are past the retention. Run on
+-- the audit database; running it again is a no-op.
+
+do $$
+declare
+    audit_table text;
+    audit_index text;
+begin
+    foreach audit_table in array array[
+        'request_logs', 'task_logs', 'debug_logs', 'request_timing'
+    ] loop
+        -- Only plain tables, partitioned ones are already migrated
+        if exists (
+            select 1 from pg_class
+            where relname = audit_table
+              and relkind = 'r'
+              and pg_table_is_visible(oid)
+        ) then
+            for audit_index in
+                select indexname from pg_indexes
+                where schemaname = current_schema() and tablename = audit_table
+            loop
+                execute format(
+                    'alter index %I rename to %I',
+                    audit_index, left(audit_index, 49) || '_unpartitioned');
+            end loop;
+
+            execute format(
+                'alter table %I rename to %I',
+                audit_table, audit_table || '_unpartitioned');
+        end if;
+    end loop;
+end
+$$;
@@ -0,0 +1,11 @@
+-- Schedule fire time of the task runs.
+--
+-- Each scheduled run records the fire time of its schedule, so that a run of
+-- a tick already done by another replica is skipped. Run on the audit
+-- database; running it again is a no-op.
+
+alter table if exists task_logs
+    add column if not exists talo_scheduled_at timestamptz;
+
+create index if not exists ix_task_logs_talo_scheduled_at
+    on task_logs (talo_scheduled_at);
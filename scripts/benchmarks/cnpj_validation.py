@@ -0,0 +1,89 @@
+"""
+Benchmark the CNPJ batch validation against the per-CNPJ validation.
+
+Each batch mixes valid CNPJs with CNPJs of wrong verification digits, wrong
+length and non-numeric characters, and both validators must agree on all of
+them.
+
+Usage:
+    PYTHONPATH=. python scripts/benchmarks/cnpj_validation.py --batch-sizes 100 10000 100000
+"""
+
+import argparse
+import random
+from time import perf_counter
+from typing import List
+
+from backend.app.api.utils.cnpj import (
+    calculate_cnpj_verification_digits,
+    is_cnpj_str_valid,
+    parse_cnpj_strs,
+)
+
+
+def random_cnpj() -> str:
+    """Generate a random valid CNPJ string."""
+    prefix = "".join(random.choices("0123456789", k=12))
+    digit1, _ = calculate_cnpj_verification_digits(f"{prefix}00")
+    _, digit2 = calculate_cnpj_verification_digits(f"{prefix}{digit1}0")
+
+    return f"{prefix}{digit1}{digit2}"
+
+
+def sample_batch(batch_size: int) -> List[str]:
+    """Generate a batch of CNPJ strings, about a fifth of them invalid."""
+    batch = [random_cnpj() for _ in range(batch_size)]
+
+    for index in random.sample(range(batch_size), batch_size // 5):
+        cnpj = batch[index]
+        batch[index] = random.choice([
+            cnpj[:13] + str((int(cnpj[13]) + 1) % 10),
+            cnpj[:13],
+            cnpj[:5] + "a" + cnpj[6:],
+        ])
+
+    return batch
+
+
+def run(batch_sizes: List[int], runs: int):
+    """
+    Run the benchmark.
+
+    Args:
+        batch_sizes (List[int]): The number of CNPJs per batch.
+        runs (int): The number of runs per batch size, the best is reported.
+    """
+    for batch_size in batch_sizes:
+        batch = sample_batch(batch_size)
+
+        scalar_time = float("inf")
+        for _ in range(runs):
+            start = perf_counter()
+            scalar_result = [is_cnpj_str_valid(cnpj) for cnpj in batch]
+            scalar_time = min(scalar_time, perf_counter() - start)
+
+        batch_time = float("inf")
+        for _ in range(runs):
+            start = perf_counter()
+            cnpj_arrays = parse_cnpj_strs(batch)
+            batch_time = min(batch_time, perf_counter() - start)
+
+        assert cnpj_arrays.is_valid.tolist() == [
+            result["is_valid"] for result in scalar_result]
+
+        print(
+            f"{batch_size:>7} CNPJs: per-CNPJ {scalar_time * 1000:9.2f} ms | "
+            f"batch {batch_time * 1000:8.2f} ms | "
+            f"speed-up {scalar_time / batch_time:6.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--batch-sizes", type=int, nargs="+", default=[100, 10000, 100000],
+        help="CNPJs per batch.")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per size.")
+    args = parser.parse_args()
+
+    run(args.batch_sizes, args.runs)
@@ -0,0 +1,164 @@
+"""
+Benchmark the requests per second of an empty route through the middleware stacks.
+
+The previous stack times requests in a BaseHTTPMiddleware and logs them in
+another, around the gzip middleware; the current one handles the request
+identifier, timing and logging in a single pure ASGI middleware. Requests are
+sent in process, straight to the ASGI application, so that only the
+middlewares and routing are measured, and request logs are dropped.
+
+Usage:
+    PYTHONPATH=. python scripts/benchmarks/middleware_stack.py --requests 20000
+"""
+
+import argparse
+import asyncio
+from time import perf_counter
+
+from fastapi import FastAPI, Request, Response
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.middleware.gzip import GZipMiddleware
+
+from backend.app.api.middlewares import logs
+from backend.app.api.middlewares.logs import (
+    RequestTrackingMiddleware,
+    UNMATCHED_ROUTE,
+    submit_request_log,
+)
+from backend.app.api.utils.batching import BatchWriter
+from backend.app.api.utils.metrics import request_latencies
+
+
+class LegacyTimingMiddleware(BaseHTTPMiddleware):
+    """The timing middleware as a BaseHTTPMiddleware, as it was."""
+
+    async def dispatch(self, request: Request, call_next):
+        start_time = perf_counter()
+        response = await call_next(request)
+        route = getattr(request.scope.get("route"), "path", UNMATCHED_ROUTE)
+        request_latencies.record(request.method, route, perf_counter() - start_time)
+
+        return response
+
+
+class LegacyLoggingMiddleware(BaseHTTPMiddleware):
+    """The request logging middleware as the BaseHTTPMiddleware it used to be."""
+
+    async def dispatch(self, request: Request, call_next):
+        start_time = perf_counter()
+        response = await call_next(request)
+        process_time = perf_counter() - start_time
+
+        request_data = {
+            "method": request.method,
+            "url": str(request.url),
+            "headers": dict(request.headers),
+            "client_host": request.client.host if request.client else None,
+            "user_agent": request.headers.get("user-agent", "Unknown"),
+            "request_url": str(request.url),
+        }
+        response_data = {
+            "status_code": response.status_code,
+            "headers": dict(response.headers),
+            "response_size": int(response.headers.get("content-length", 0)),
+        }
+        submit_request_log(request_data, response_data, process_time)
+
+        return response
+
+
+def create_app(stack: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/empty")
+    async def empty():
+        return Response()
+
+    if stack == "legacy":
+        app.add_middleware(LegacyLoggingMiddleware)
+        app.add_middleware(GZipMiddleware, minimum_size=1000)
+        app.add_middleware(LegacyTimingMiddleware)
+    else:
+        app.add_middleware(GZipMiddleware, minimum_size=1000)
+        app.add_middleware(RequestTrackingMiddleware)
+
+    return app
+
+
+async def send_requests(app: FastAPI, requests: int) -> float:
+    """
+    Sends requests to the empty route.
+
+    Returns:
+        float: The elapsed time, in seconds.
+    """
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/empty",
+        "raw_path": b"/empty",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"benchmark"), (b"user-agent", b"benchmark")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("benchmark", 80),
+    }
+    request_message = {"type": "http.request", "body": b"", "more_body": False}
+    disconnected = asyncio.Event()
+
+    async def send(message):
+        pass
+
+    start = perf_counter()
+    for _ in range(requests):
+        received = False
+
+        async def receive():
+            nonlocal received
+            if not received:
+                received = True
+                return request_message
+            # The client stays connected until the response is sent
+            await disconnected.wait()
+
+        await app(dict(scope), receive, send)
+
+    return perf_counter() - start
+
+
+def run(requests: int, runs: int):
+    """
+    Run the benchmark.
+
+    Args:
+        requests (int): The number of requests per run.
+        runs (int): The number of runs per stack, the best is reported.
+    """
+    # Request logs are dropped instead of written to the audit database
+    logs.request_log_writer = BatchWriter("benchmark", lambda batch: None)
+    logs.request_log_writer.start()
+
+    results = {}
+    for stack in ("legacy", "fused"):
+        app = create_app(stack)
+        asyncio.run(send_requests(app, 100))
+
+        elapsed = min(asyncio.run(send_requests(app, requests)) for _ in range(runs))
+        results[stack] = requests / elapsed
+        print(f"{stack:>6} stack: {results[stack]:9.0f} requests/s")
+
+    logs.request_log_writer.stop()
+    print(f"speed-up {results['fused'] / results['legacy']:.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--requests", type=int, default=20000, help="Requests per run.")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per stack.")
+    args = parser.parse_args()
+
+    run(args.requests, args.runs)